@@ -0,0 +1,150 @@
+import sqlite3
+import time
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость, нужна только режиму analytics
+    np = None
+
+GENDERS = ('Female', 'Male')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+# Ключ initial_counts для пустого ФИО (код 0)
+EMPTY_INITIAL = '(empty)'
+
+# Даты переводятся в дни от 1970-01-01 на стороне SQLite; неверная дата -
+# минимальное int64 (NaT в datetime64). Для пустого ФИО unicode() дает NULL - код 0
+COLUMNS_QUERY = """
+    SELECT IFNULL(CAST(julianday(birth_date) - 2440587.5 AS INTEGER), -9223372036854775808),
+           gender = 'Male',
+           IFNULL(unicode(full_name), 0)
+    FROM employees
+"""
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class EmployeeColumns:
+    """Таблица employees в колоночных массивах NumPy.
+
+    birth_dates - datetime64[D] (NaT для неверных дат), genders - uint8
+    (1 - Male, 0 - Female), initials - uint32 с кодом первой буквы ФИО
+    (кодовая точка Unicode). Строки читаются порциями через fetchmany,
+    каждая порция сразу переводится в массив, поэтому объекты Employee
+    не создаются. Агрегаты считаются векторно (bincount/unique).
+    """
+
+    __slots__ = ('birth_dates', 'genders', 'initials', 'load_time')
+
+    def __init__(self, birth_dates, genders, initials, load_time=0.0):
+        self.birth_dates = birth_dates
+        self.genders = genders
+        self.initials = initials
+        self.load_time = load_time
+
+    @classmethod
+    def load(cls, db, chunk_size=100000):
+        """Читает таблицу порциями; None - нет NumPy или ошибка чтения"""
+        if np is None:
+            print("Error: NumPy is not installed (pip install numpy)")
+            return None
+        if not db.is_connected():
+            print("Error: No database connection")
+            return None
+
+        start_time = time.perf_counter()
+        chunks = []
+        cursor = None
+        try:
+            cursor = db.connection.cursor()
+            # Кортежи вместо sqlite3.Row: порция сразу становится массивом (n, 3)
+            cursor.row_factory = None
+            cursor.execute(COLUMNS_QUERY)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.int64))
+        except sqlite3.Error as e:
+            print(f"Error reading employees: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+        data = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+        return cls(
+            data[:, 0].astype('datetime64[D]'),
+            data[:, 1].astype(np.uint8),
+            data[:, 2].astype(np.uint32),
+            time.perf_counter() - start_time,
+        )
+
+    def __len__(self):
+        return len(self.genders)
+
+    def _valid(self):
+        return ~np.isnat(self.birth_dates)
+
+    def ages(self, today=None):
+        """Полный возраст на дату today (как employee.age_on), -1 для неверных дат.
+
+        Для дат рождения позже today возраст тоже отрицательный.
+        """
+        today = today or date.today()
+        dates = self.birth_dates
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        months = dates.astype('datetime64[M]')
+        # Месяц и день как число MMDD: день рождения в этом году еще не наступил, если MMDD больше
+        month_day = ((months.astype(np.int64) % 12 + 1) * 100 +
+                     (dates - months.astype('datetime64[D]')).astype(np.int64) + 1)
+        ages = today.year - years - (month_day > today.month * 100 + today.day)
+        return np.where(self._valid(), ages, -1)
+
+    def age_by_gender(self, today=None, bucket=10) -> dict:
+        """Гистограмма возрастов по полу: {'buckets': [(от, до)], 'Female': [...], 'Male': [...]}.
+
+        Строки с неверной датой и датой рождения в будущем в гистограмму не
+        входят, их число - в 'excluded' ({'invalid_date': N, 'future_date': N}).
+        """
+        ages = self.ages(today)
+        dates_valid = self._valid()
+        valid = dates_valid & (ages >= 0)
+        bucket_index = ages[valid] // bucket
+        # Корзины от самой младшей непустой до самой старшей
+        first = int(bucket_index.min()) if bucket_index.size else 0
+        buckets = int(bucket_index.max()) - first + 1 if bucket_index.size else 0
+        counts = np.bincount(self.genders[valid].astype(np.int64) * buckets + (bucket_index - first),
+                             minlength=2 * buckets).reshape(2, buckets)
+        return {
+            'buckets': [(index * bucket, index * bucket + bucket - 1) for index in range(first, first + buckets)],
+            'Female': counts[0].tolist(),
+            'Male': counts[1].tolist(),
+            'excluded': {
+                'invalid_date': int(len(ages) - np.count_nonzero(dates_valid)),
+                'future_date': int(np.count_nonzero(dates_valid) - np.count_nonzero(valid)),
+            },
+        }
+
+    def birth_months_by_gender(self) -> dict:
+        """Число рождений по месяцам и полу: {'Female': [12], 'Male': [12], 'excluded': {'invalid_date': N}}"""
+        valid = self._valid()
+        months = self.birth_dates[valid].astype('datetime64[M]').astype(np.int64) % 12
+        counts = np.bincount(self.genders[valid].astype(np.int64) * 12 + months, minlength=24).reshape(2, 12)
+        return {
+            'Female': counts[0].tolist(),
+            'Male': counts[1].tolist(),
+            'excluded': {'invalid_date': int(len(valid) - np.count_nonzero(valid))},
+        }
+
+    def initial_counts(self) -> dict:
+        """Число сотрудников по первой букве ФИО (фамилии); пустое ФИО - ключ EMPTY_INITIAL"""
+        codes, counts = np.unique(self.initials, return_counts=True)
+        return {chr(code) if code else EMPTY_INITIAL: int(count)
+                for code, count in zip(codes.tolist(), counts.tolist())}
+
+    def gender_counts(self) -> dict:
+        counts = np.bincount(self.genders, minlength=2)
+        return {gender: int(count) for gender, count in zip(GENDERS, counts.tolist())}
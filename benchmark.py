@@ -0,0 +1,503 @@
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from config import DatabaseConfig
+from database import EmployeeDatabase
+from employee import Employee
+from generator import TestDataGenerator
+
+
+def _percentile(values, percent):
+    """Перцентиль с линейной интерполяцией по отсортированному списку"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _summary(values):
+    return {
+        'min': min(values),
+        'mean': sum(values) / len(values),
+        'p50': _percentile(values, 50),
+        'p95': _percentile(values, 95),
+        'p99': _percentile(values, 99),
+        'max': max(values),
+    }
+
+
+class QueryBenchmark:
+    """Набор замеров для всех путей чтения EmployeeDatabase.
+
+    Каждый запрос выполняется warmup раз без учета, затем repeat раз с
+    замером фаз execute (cursor.execute), fetch (fetchall) и materialize
+    (создание объектов Employee) через time.perf_counter. Вариант cold
+    открывает новое соединение перед каждым прогоном (пустой кэш страниц
+    SQLite), вариант warm переиспользует одно прогретое соединение.
+    """
+
+    PHASES = ('execute', 'fetch', 'materialize', 'total')
+
+    def __init__(self, sizes=(10000, 100000, 1000000), repeat=5, warmup=1,
+                 data_dir="bench_data", seed=42, optimize=True):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.warmup = warmup
+        self.data_dir = data_dir
+        self.seed = seed
+        self.optimize = optimize
+
+    def query_cases(self, db):
+        """Запросы, соответствующие путям чтения EmployeeDatabase"""
+        # Подсчет строк не создает объекты Employee
+        return [(name, sql, params, name != 'table_count') for name, sql, params in db.known_queries()]
+
+    def prepare_database(self, size) -> str:
+        """Создает (или переиспользует) файл БД с size тестовыми записями"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        db_path = os.path.join(self.data_dir, f"employees_{size}.db")
+        if os.path.exists(db_path):
+            return db_path
+
+        print(f"Preparing benchmark database with {size:,} rows: {db_path}")
+        db = EmployeeDatabase(db_path)
+        try:
+            db.create_table()
+            generator = TestDataGenerator(record_count=size, seed=self.seed)
+            db.bulk_load_chunks(generator.iter_chunks())
+            if self.optimize:
+                db.create_indexes()
+                db.create_fulltext_index()
+        finally:
+            db.close()
+        return db_path
+
+    @staticmethod
+    def _connect(db_path):
+        return DatabaseConfig.create_connection(db_path, read_only=True)
+
+    @staticmethod
+    def _run_once(conn, sql, params, materialize):
+        """Один прогон запроса: возвращает длительности фаз и число строк"""
+        cursor = conn.cursor()
+        try:
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            executed = time.perf_counter()
+            rows = cursor.fetchall()
+            fetched = time.perf_counter()
+            if materialize:
+                [Employee.from_db_row(row) for row in rows]
+            finished = time.perf_counter()
+        finally:
+            cursor.close()
+        return {
+            'execute': executed - start,
+            'fetch': fetched - executed,
+            'materialize': finished - fetched,
+            'total': finished - start,
+        }, len(rows)
+
+    def measure(self, db_path, sql, params, materialize, cold):
+        timings = {phase: [] for phase in self.PHASES}
+        rows_count = 0
+
+        warm_conn = None if cold else self._connect(db_path)
+        try:
+            for run in range(self.warmup + self.repeat):
+                conn = self._connect(db_path) if cold else warm_conn
+                try:
+                    phases, rows_count = self._run_once(conn, sql, params, materialize)
+                finally:
+                    if cold:
+                        conn.close()
+                if run >= self.warmup:
+                    for phase, value in phases.items():
+                        timings[phase].append(value)
+        finally:
+            if warm_conn:
+                warm_conn.close()
+
+        return {phase: _summary(values) for phase, values in timings.items()}, rows_count
+
+    def run(self) -> dict:
+        results = []
+        for size in self.sizes:
+            db_path = self.prepare_database(size)
+            db = EmployeeDatabase(db_path)
+            try:
+                cases = self.query_cases(db)
+            finally:
+                db.close()
+
+            for name, sql, params, materialize in cases:
+                for cache in ('cold', 'warm'):
+                    phases, rows_count = self.measure(db_path, sql, params, materialize, cache == 'cold')
+                    results.append({
+                        'size': size,
+                        'query': name,
+                        'cache': cache,
+                        'rows': rows_count,
+                        'phases': phases,
+                    })
+                    print("{:>9,} {:<20} {:<5} rows={:<8} p50={:.4f}s p95={:.4f}s p99={:.4f}s".format(
+                        size, name, cache, rows_count,
+                        phases['total']['p50'], phases['total']['p95'], phases['total']['p99']
+                    ))
+
+        return {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'repeat': self.repeat,
+                'warmup': self.warmup,
+                'seed': self.seed,
+                'optimized_indexes': self.optimize,
+            },
+            'results': results,
+        }
+
+    @staticmethod
+    def save(report, output_path):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark results saved to {output_path}")
+
+
+class StartupBenchmark:
+    """Замер времени запуска CLI (python main.py ...).
+
+    Команда запускается repeat раз в отдельном процессе, замеряется полное
+    время до завершения; для сравнения так же замеряется пустой запуск
+    интерпретатора (python -c pass). Один дополнительный запуск с
+    -X importtime показывает, какие модули импортированы и сколько стоил
+    каждый импорт верхнего уровня.
+    """
+
+    def __init__(self, command=('help',), repeat=10, script=None):
+        self.command = list(command)
+        self.repeat = repeat
+        self.script = script or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+    def _time_runs(self, argv):
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            subprocess.run(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=False)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    @staticmethod
+    def parse_importtime(output):
+        """Разбирает вывод -X importtime: [(модуль, собственное мкс, накопленное мкс, уровень)]"""
+        imports = []
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'imported package' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            level = (len(name) - len(name.lstrip()) - 1) // 2
+            imports.append((name.strip(), int(self_us), int(cumulative_us), level))
+        return imports
+
+    def run(self, top=15) -> dict:
+        argv = [sys.executable, self.script] + self.command
+        command_times = self._time_runs(argv)
+        baseline_times = self._time_runs([sys.executable, '-c', 'pass'])
+
+        result = subprocess.run([sys.executable, '-X', 'importtime'] + argv[1:], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+        imports = self.parse_importtime(result.stderr)
+        top_level = sorted((item for item in imports if item[3] == 0), key=lambda item: item[2], reverse=True)
+
+        report = {
+            'command': ' '.join(self.command),
+            'repeat': self.repeat,
+            'startup': _summary(command_times),
+            'interpreter_baseline': _summary(baseline_times),
+            'modules_imported': len(imports),
+            'import_time_us': sum(item[2] for item in top_level),
+            'top_imports': [{'module': name, 'self_us': self_us, 'cumulative_us': cumulative_us}
+                            for name, self_us, cumulative_us, _ in top_level[:top]],
+        }
+
+        print(f"Command: python main.py {report['command']}")
+        print(f"Startup p50={report['startup']['p50'] * 1000:.1f}ms "
+              f"min={report['startup']['min'] * 1000:.1f}ms "
+              f"(interpreter alone p50={report['interpreter_baseline']['p50'] * 1000:.1f}ms)")
+        print(f"Modules imported: {report['modules_imported']}, "
+              f"total import time {report['import_time_us'] / 1000:.1f}ms")
+        print("\n{:<30} {:>12} {:>14}".format("Top-level import", "self, ms", "cumulative, ms"))
+        print("-" * 58)
+        for item in report['top_imports']:
+            print("{:<30} {:>12.2f} {:>14.2f}".format(item['module'], item['self_us'] / 1000,
+                                                      item['cumulative_us'] / 1000))
+        return report
+
+
+class ShardBenchmark:
+    """Замер масштабирования шардированной раскладки (sharding.py).
+
+    Для каждого размера набора и числа шардов данные генерируются и
+    загружаются параллельно (время загрузки), затем замеряются рассылка
+    поиска мужчин с фамилией на F (repeat прогонов) и полный упорядоченный
+    список через k-way слияние. Один шард - базовая линия с теми же
+    накладными расходами координатора (процессы, передача страниц).
+    """
+
+    def __init__(self, sizes=(1000000, 10000000), shard_counts=(1, 2, 4), partition=None,
+                 repeat=5, data_dir="bench_data", seed=42, workers=None):
+        self.sizes = sizes
+        self.shard_counts = shard_counts
+        self.partition = partition or DatabaseConfig.SHARD_PARTITION
+        self.repeat = repeat
+        self.data_dir = data_dir
+        self.seed = seed
+        self.workers = workers
+
+    def prepare(self, sharded, size) -> float:
+        """Загружает набор в шарды (или переиспользует готовый); время загрузки или None"""
+        if not sharded.check_layout() and sum(sharded.counts()) > 0:
+            return None
+        print(f"Loading {size:,} rows into {len(sharded.paths)} shards ({self.partition})")
+        for path in sharded.paths:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        sharded.create_tables()
+        generator = TestDataGenerator(record_count=size, seed=self.seed)
+        summary = sharded.bulk_load(generator.iter_chunks(), dedup=True)
+        return summary['load_time']
+
+    def run(self) -> dict:
+        from sharding import ShardedDatabase, shard_paths
+
+        results = []
+        for size in self.sizes:
+            for count in self.shard_counts:
+                directory = os.path.join(self.data_dir, f"shards_{size}_{count}_{self.partition}")
+                os.makedirs(directory, exist_ok=True)
+                sharded = ShardedDatabase(shard_paths(count, directory), self.partition, self.workers)
+                try:
+                    load_time = self.prepare(sharded, size)
+                    counts = sharded.counts()
+
+                    males_times = []
+                    males_rows = 0
+                    # Первый прогон прогревает процессы пула и их соединения
+                    for run in range(self.repeat + 1):
+                        employees, elapsed = sharded.get_males_with_f_surname()
+                        males_rows = len(employees)
+                        if run:
+                            males_times.append(elapsed)
+
+                    start = time.perf_counter()
+                    listing_rows = sum(1 for _ in sharded.iter_employees_sorted())
+                    listing_time = time.perf_counter() - start
+                finally:
+                    sharded.close()
+
+                result = {
+                    'size': size,
+                    'shards': count,
+                    'partition': self.partition,
+                    'rows': sum(counts),
+                    'shard_rows': counts,
+                    'load_time': load_time,
+                    'males_f': _summary(males_times),
+                    'males_f_rows': males_rows,
+                    'listing_time': listing_time,
+                    'listing_rows_per_sec': listing_rows / listing_time if listing_time > 0 else 0.0,
+                }
+                results.append(result)
+                load = f"{load_time:.1f}s" if load_time is not None else "reused"
+                print("{:>10,} shards={:<2} load={:<8} males_f p50={:.4f}s listing={:.2f}s ({:,.0f} rows/s)".format(
+                    size, count, load, result['males_f']['p50'], listing_time, result['listing_rows_per_sec']))
+
+        return {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'repeat': self.repeat,
+                'seed': self.seed,
+            },
+            'results': results,
+        }
+
+
+class SnapshotBenchmark:
+    """Сравнение копии в памяти (snapshot.py) с чтением из файла.
+
+    Запуск: время открытия EmployeeDatabase и SnapshotDatabase (вместе с
+    копированием файла) и первого запроса, repeat раз с новыми соединениями.
+    Задержка: каждый известный запрос (EmployeeDatabase.known_queries)
+    выполняется warmup + repeat раз на прогретом соединении с файлом и на
+    копии в памяти.
+    Потоки: CONCURRENT_QUERIES выполняются одновременно в N потоках (у
+    каждого свой экземпляр БД). Соединения с копией используют общий кэш
+    (cache=shared) с блокировками на уровне таблиц, поэтому задержка под
+    нагрузкой может расти быстрее, чем у соединений с файлом в WAL.
+    """
+
+    CONCURRENT_QUERIES = ('males_f_surname', 'search_gender_prefix', 'search_birth_range')
+
+    def __init__(self, db_path=None, repeat=20, warmup=2, threads=(1, 4, 8)):
+        self.db_path = db_path or DatabaseConfig.DB_PATH
+        self.repeat = repeat
+        self.warmup = warmup
+        self.threads = threads
+
+    def _startup(self, factory):
+        timings = []
+        for _ in range(max(1, self.repeat // 5)):
+            # Закрытие пулов: каждое открытие начинается с нового соединения
+            DatabaseConfig.close_pools()
+            start = time.perf_counter()
+            db = factory()
+            try:
+                db.get_males_with_f_surname(use_cache=False)
+                timings.append(time.perf_counter() - start)
+            finally:
+                db.close()
+        return _summary(timings)
+
+    def _latency(self, conn, sql, params, materialize):
+        timings = []
+        for run in range(self.warmup + self.repeat):
+            phases, rows_count = QueryBenchmark._run_once(conn, sql, params, materialize)
+            if run >= self.warmup:
+                timings.append(phases['total'])
+        return _summary(timings), rows_count
+
+    def _concurrent(self, factory, threads, queries):
+        """Задержка запросов в threads потоках одновременно; (сводка, запросов в секунду)"""
+        timings = [[] for _ in range(threads)]
+        errors = []
+        barrier = threading.Barrier(threads)
+
+        def worker(index):
+            db = factory()
+            try:
+                for run in range(self.warmup + self.repeat):
+                    if run == self.warmup:
+                        # Замер начинается во всех потоках одновременно
+                        barrier.wait()
+                    for sql, params in queries:
+                        start = time.perf_counter()
+                        # connection читается на каждом запросе: копия может быть перестроена
+                        conn = db.connection
+                        conn.execute(sql, params).fetchall()
+                        if run >= self.warmup:
+                            timings[index].append(time.perf_counter() - start)
+            except (sqlite3.Error, threading.BrokenBarrierError) as e:
+                errors.append(str(e))
+                barrier.abort()
+            finally:
+                db.close()
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        start_time = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        wall_time = time.perf_counter() - start_time
+        if errors:
+            print(f"Error in concurrent readers: {errors[0]}")
+            return None, 0.0
+        values = [value for thread_timings in timings for value in thread_timings]
+        return _summary(values), len(values) / wall_time
+
+    def run(self) -> dict:
+        from snapshot import SnapshotDatabase
+
+        startup = {
+            'disk': self._startup(lambda: EmployeeDatabase(self.db_path, read_only=True)),
+            'snapshot': self._startup(lambda: SnapshotDatabase(self.db_path)),
+        }
+        print(f"Startup p50: disk {startup['disk']['p50'] * 1000:.1f}ms, "
+              f"snapshot {startup['snapshot']['p50'] * 1000:.1f}ms (includes copying the file)")
+
+        disk = EmployeeDatabase(self.db_path, read_only=True)
+        snapshot = SnapshotDatabase(self.db_path)
+        results = []
+        try:
+            snapshot_bytes = snapshot.snapshot_bytes()
+            print(f"Snapshot: {snapshot_bytes / 1048576:.1f} MB loaded in {snapshot.load_time:.2f} seconds")
+            print("\n{:<22} {:>9} {:>12} {:>14} {:>8}".format("Query", "rows", "disk p50", "snapshot p50", "speedup"))
+            print("-" * 69)
+            for name, sql, params in disk.known_queries():
+                materialize = name != 'table_count'
+                disk_latency, rows_count = self._latency(disk.connection, sql, params, materialize)
+                snapshot_latency, _ = self._latency(snapshot.connection, sql, params, materialize)
+                speedup = disk_latency['p50'] / snapshot_latency['p50'] if snapshot_latency['p50'] > 0 else 0.0
+                results.append({
+                    'query': name,
+                    'rows': rows_count,
+                    'disk': disk_latency,
+                    'snapshot': snapshot_latency,
+                    'speedup_p50': speedup,
+                })
+                print("{:<22} {:>9,} {:>10.3f}ms {:>12.3f}ms {:>7.2f}x".format(
+                    name, rows_count, disk_latency['p50'] * 1000, snapshot_latency['p50'] * 1000, speedup))
+            queries = [(sql, params) for name, sql, params in disk.known_queries()
+                       if name in self.CONCURRENT_QUERIES]
+        finally:
+            snapshot.close()
+            disk.close()
+
+        concurrent = []
+        print(f"\nConcurrent readers ({', '.join(self.CONCURRENT_QUERIES)}):")
+        print("{:>8} {:>10} {:>10} {:>10} {:>14} {:>14} {:>10}".format(
+            "threads", "disk p50", "disk p95", "disk q/s", "snapshot p50", "snapshot p95", "snap q/s"))
+        print("-" * 82)
+        for threads in self.threads:
+            disk_latency, disk_rate = self._concurrent(
+                lambda: EmployeeDatabase(self.db_path, read_only=True), threads, queries)
+            snapshot_latency, snapshot_rate = self._concurrent(
+                lambda: SnapshotDatabase(self.db_path), threads, queries)
+            if disk_latency is None or snapshot_latency is None:
+                continue
+            concurrent.append({
+                'threads': threads,
+                'disk': disk_latency,
+                'disk_qps': disk_rate,
+                'snapshot': snapshot_latency,
+                'snapshot_qps': snapshot_rate,
+            })
+            print("{:>8} {:>8.3f}ms {:>8.3f}ms {:>10.0f} {:>12.3f}ms {:>12.3f}ms {:>10.0f}".format(
+                threads, disk_latency['p50'] * 1000, disk_latency['p95'] * 1000, disk_rate,
+                snapshot_latency['p50'] * 1000, snapshot_latency['p95'] * 1000, snapshot_rate))
+
+        return {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'db_path': self.db_path,
+                'db_bytes': os.path.getsize(self.db_path),
+                'snapshot_bytes': snapshot_bytes,
+                'journal_profile': DatabaseConfig.JOURNAL_PROFILE,
+                'repeat': self.repeat,
+                'warmup': self.warmup,
+            },
+            'startup': startup,
+            'results': results,
+            'concurrent': concurrent,
+        }
@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+from collections import OrderedDict
+
+# Число строк, по которым оценивается размер результата
+SIZE_SAMPLE = 100
+
+
+def _estimate_size(rows) -> int:
+    """Приблизительный объем памяти списка кортежей (по выборке строк)"""
+    size = sys.getsizeof(rows)
+    if not rows:
+        return size
+    sample = rows[:SIZE_SAMPLE]
+    sample_size = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in sample)
+    return size + sample_size * len(rows) // len(sample)
+
+
+def normalize_query(sql) -> str:
+    """Нормализует текст запроса для ключа кэша (схлопывает пробельные символы)"""
+    return ' '.join(sql.split())
+
+
+class QueryCache:
+    """LRU-кэш результатов запросов с ограничением по памяти.
+
+    Ключ - нормализованный текст запроса и параметры, значение - список
+    кортежей строк и версия данных, для которой он получен. Запись с другой
+    версией считается устаревшей и удаляется при обращении. При превышении
+    max_bytes вытесняются давно не использованные записи.
+
+    Если задан path, кэш можно сохранить в файл и загрузить в следующем
+    запуске; файл действителен только для того же значения счетчика
+    изменений БД (persistent_version). Файл - JSON (строки и параметры -
+    строки и числа), а не pickle: загрузка чужого файла не выполняет код.
+    """
+
+    def __init__(self, max_bytes, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(sql, params=()):
+        return normalize_query(sql), tuple(params)
+
+    @staticmethod
+    def estimate_size(rows) -> int:
+        """Приблизительный объем памяти порции строк (как при сохранении в кэш)"""
+        return _estimate_size(rows)
+
+    def get(self, key, version):
+        """Возвращает строки для ключа или None (промах или устаревшая запись)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != version:
+            self._remove(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, rows) -> bool:
+        """Сохраняет результат; слишком большой результат не кэшируется"""
+        size = _estimate_size(rows)
+        if not self.enabled or size > self.max_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (version, rows, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def load(self, persistent_version, version) -> int:
+        """Загружает записи из файла, если он сохранен для той же версии БД"""
+        if not self.path or persistent_version is None or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') != persistent_version:
+                return 0
+            # Ключи и строки в JSON - списки, в кэше - кортежи
+            entries = [((sql, tuple(params)), [tuple(row) for row in rows])
+                       for (sql, params), rows in saved['entries']]
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Error loading query cache: {e}")
+            return 0
+        loaded = 0
+        for key, rows in entries:
+            loaded += self.put(key, version, rows)
+        return loaded
+
+    def save(self, persistent_version, version) -> bool:
+        """Сохраняет в файл записи, актуальные для текущей версии данных"""
+        if not self.path or persistent_version is None:
+            return False
+        entries = [(key, rows) for key, (entry_version, rows, _) in self._entries.items()
+                   if entry_version == version]
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': persistent_version, 'entries': entries}, f, ensure_ascii=False)
+            # Атомарная замена: параллельный запуск не прочитает половину файла
+            os.replace(temp_path, self.path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving query cache: {e}")
+            return False
@@ -0,0 +1,241 @@
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from config import DatabaseConfig
+
+EPOCH = date(1970, 1, 1)
+
+
+def _split_name(full_name):
+    """Делит ФИО на фамилию, имя и отчество (отчество может быть пустым)"""
+    parts = full_name.split(' ', 2)
+    parts += [''] * (3 - len(parts))
+    return parts
+
+
+def _day_number(birth_date):
+    """YYYY-MM-DD -> число дней от 1970-01-01"""
+    return (date(int(birth_date[:4]), int(birth_date[5:7]), int(birth_date[8:10])) - EPOCH).days
+
+
+class CompactEmployeeDatabase:
+    """Компактная нормализованная схема хранения сотрудников.
+
+    Фамилия, имя и отчество хранятся ссылками на общую таблицу name_parts,
+    дата рождения - числом дней от 1970-01-01, пол - 1 (Male) / 0 (Female).
+    Ключ (surname_id, first_name_id, middle_name_id, birth_day) является
+    кластерным (WITHOUT ROWID), отдельных индексов нет.
+
+    Схема заполняется миграцией из обычной таблицы employees. Идентификаторы
+    частей имени выдаются в алфавитном порядке, поэтому порядок ключа
+    совпадает с сортировкой по ФИО и не требует сортировки при выводе.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or DatabaseConfig.COMPACT_DB_PATH
+        self.pool = DatabaseConfig.get_pool(self.db_path)
+        self.connection = self.pool.acquire()
+
+    def is_connected(self):
+        return self.connection is not None
+
+    def create_schema(self, without_rowid=True) -> bool:
+        """Создает (пересоздает) таблицы компактной схемы"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return False
+
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("DROP TABLE IF EXISTS employees_compact")
+            cursor.execute("DROP TABLE IF EXISTS name_parts")
+            cursor.execute("""
+                CREATE TABLE name_parts (
+                    id INTEGER PRIMARY KEY,
+                    value TEXT NOT NULL UNIQUE
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TABLE employees_compact (
+                    surname_id INTEGER NOT NULL,
+                    first_name_id INTEGER NOT NULL,
+                    middle_name_id INTEGER NOT NULL,
+                    birth_day INTEGER NOT NULL,
+                    gender INTEGER NOT NULL CHECK (gender IN (0, 1)),
+                    PRIMARY KEY (surname_id, first_name_id, middle_name_id, birth_day)
+                ){' WITHOUT ROWID' if without_rowid else ''}
+            """)
+            self.connection.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error creating compact schema: {e}")
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+
+    def migrate_from(self, source_path=None, chunk_size=50000, without_rowid=True) -> bool:
+        """Переносит данные из обычной схемы employees в компактную"""
+        if not self.create_schema(without_rowid):
+            return False
+
+        source = None
+        cursor = None
+        try:
+            source = DatabaseConfig.create_connection(source_path, read_only=True)
+            cursor = self.connection.cursor()
+            start_time = time.perf_counter()
+
+            # Словарь частей имени в алфавитном порядке
+            parts = set()
+            for (full_name,) in source.execute("SELECT DISTINCT full_name FROM employees"):
+                parts.update(_split_name(full_name))
+            part_ids = {value: index for index, value in enumerate(sorted(parts), start=1)}
+            cursor.executemany("INSERT INTO name_parts (id, value) VALUES (?, ?)",
+                               ((index, value) for value, index in part_ids.items()))
+            print(f"Interned {len(part_ids):,} distinct name parts")
+
+            # Строки читаются в порядке ключа, поэтому вставка идет в конец B-дерева
+            rows = source.execute("""
+                SELECT full_name, birth_date, gender FROM employees
+                ORDER BY full_name, birth_date
+            """)
+            days = {}
+            names = {}
+            total_rows = 0
+            while True:
+                chunk = rows.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                data = []
+                for full_name, birth_date, gender in chunk:
+                    name_key = names.get(full_name)
+                    if name_key is None:
+                        name_key = names[full_name] = tuple(part_ids[part] for part in _split_name(full_name))
+                    day = days.get(birth_date)
+                    if day is None:
+                        day = days[birth_date] = _day_number(birth_date)
+                    data.append(name_key + (day, 1 if gender == 'Male' else 0))
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO employees_compact
+                        (surname_id, first_name_id, middle_name_id, birth_day, gender)
+                    VALUES (?, ?, ?, ?, ?)
+                """, data)
+                self.connection.commit()
+                total_rows += len(chunk)
+                print(f"Migrated {total_rows:,} rows...")
+
+            cursor.execute("ANALYZE")
+            self.connection.commit()
+            print(f"Migration completed in {time.perf_counter() - start_time:.2f} seconds")
+            return True
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error migrating to compact schema: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            if source:
+                source.close()
+
+    def _part_range(self, prefix):
+        """Диапазон id частей имени, начинающихся с prefix"""
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        row = self.connection.execute(
+            "SELECT MIN(id), MAX(id) FROM name_parts WHERE value >= ? AND value < ?",
+            (prefix, upper)
+        ).fetchone()
+        return row[0], row[1]
+
+    def _row_converter(self):
+        """Функция преобразования строки компактной схемы в Employee"""
+        from employee import Employee
+
+        parts = dict(self.connection.execute("SELECT id, value FROM name_parts"))
+        dates = {}
+
+        def convert(surname_id, first_name_id, middle_name_id, day, gender):
+            birth_date = dates.get(day)
+            if birth_date is None:
+                birth_date = dates[day] = (EPOCH + timedelta(days=day)).isoformat()
+            full_name = ' '.join(part for part in (parts[surname_id], parts[first_name_id],
+                                                   parts[middle_name_id]) if part)
+            return Employee(full_name, birth_date, 'Male' if gender else 'Female')
+
+        return convert
+
+    def iter_employees_sorted(self, batch_size=1000):
+        """Все сотрудники в порядке ФИО (аналог режима 3)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return
+
+        cursor = None
+        try:
+            convert = self._row_converter()
+            cursor = self.connection.cursor()
+            # Порядок ключа совпадает с алфавитным - сортировка не нужна
+            cursor.execute("""
+                SELECT surname_id, first_name_id, middle_name_id, birth_day, gender
+                FROM employees_compact
+                ORDER BY surname_id, first_name_id, middle_name_id, birth_day
+            """)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield convert(*row)
+        except sqlite3.Error as e:
+            print(f"Error fetching employees: {e}")
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_males_with_f_surname(self) -> tuple:
+        """Мужчины с фамилией на 'F' и время выполнения (аналог режима 5)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return [], 0
+
+        try:
+            start_time = time.perf_counter()
+            # Id частей имени выданы по алфавиту: префикс фамилии - диапазон id
+            low, high = self._part_range('F')
+            employees = []
+            if low is not None:
+                convert = self._row_converter()
+                rows = self.connection.execute("""
+                    SELECT surname_id, first_name_id, middle_name_id, birth_day, gender
+                    FROM employees_compact
+                    WHERE surname_id BETWEEN ? AND ? AND gender = 1
+                """, (low, high)).fetchall()
+                employees = [convert(*row) for row in rows]
+            return employees, time.perf_counter() - start_time
+        except sqlite3.Error as e:
+            print(f"Error fetching employees: {e}")
+            return [], 0
+
+    def close(self):
+        if self.connection:
+            self.pool.release(self.connection)
+            self.connection = None
+
+
+def database_size(db_path) -> dict:
+    """Размер файла БД и объем занятых страниц (без свободных)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        'file_bytes': os.path.getsize(db_path),
+        'used_bytes': (page_count - freelist) * page_size,
+    }
@@ -1,30 +1,263 @@
 import sqlite3
 import os
+import threading
+from metrics import InstrumentedConnection, SlowStatementLog
+
+
+class ConnectionPool:
+    """Пул прогретых соединений с одной базой данных.
+
+    Соединения создаются один раз (с уже примененными PRAGMA) и
+    переиспользуются: acquire() берет свободное соединение, release()
+    возвращает его в пул. thread_connection() отдает отдельное соединение
+    для каждого потока - для параллельных читателей.
+    """
+
+    def __init__(self, db_path, size, read_only=False):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only
+        self._idle = []
+        self._thread_connections = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _create(self):
+        conn = DatabaseConfig.create_connection(self.db_path, self.read_only, check_same_thread=False)
+        mode = " (read-only)" if self.read_only else ""
+        print(f"SQLite database connection established: {self.db_path}{mode}")
+        return conn
+
+    def acquire(self):
+        """Возвращает свободное соединение из пула или создает новое"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return self._create()
+        except sqlite3.Error as e:
+            print(f"Database connection error: {e}")
+            return None
+
+    def release(self, conn):
+        """Возвращает соединение в пул (лишние соединения закрываются)"""
+        if conn is None:
+            return
+        try:
+            # Незавершенная транзакция не должна попасть к следующему владельцу
+            conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def thread_connection(self):
+        """Соединение, закрепленное за текущим потоком"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            try:
+                conn = self._create()
+            except sqlite3.Error as e:
+                print(f"Database connection error: {e}")
+                return None
+            self._local.connection = conn
+            with self._lock:
+                self._thread_connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """Закрывает все соединения пула"""
+        with self._lock:
+            connections = self._idle + self._thread_connections
+            self._idle = []
+            self._thread_connections = []
+        for conn in connections:
+            conn.close()
+
 
 class DatabaseConfig:
     DB_PATH = "employees.db"
+    # Файл компактной нормализованной схемы (см. compact.py)
+    COMPACT_DB_PATH = "employees_compact.db"
+
+    # Пул соединений и PRAGMA, применяемые один раз при открытии соединения
+    POOL_SIZE = 4
+    CONNECTION_PRAGMAS = {
+        'cache_size': -16384,  # 16 МБ
+        'temp_store': 'MEMORY',
+    }
+
+    # Профили журналирования и блокировок. WAL позволяет читателям работать
+    # параллельно с загрузкой: писатель не блокирует чтение.
+    JOURNAL_PROFILE = 'wal'
+    JOURNAL_PROFILES = {
+        'wal': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,  # мс ожидания блокировки вместо "database is locked"
+            'wal_autocheckpoint': 1000,  # страниц
+            'mmap_size': 268435456,  # 256 МБ
+        },
+        'rollback': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'busy_timeout': 5000,
+        },
+    }
+    # Режим PRAGMA wal_checkpoint после пакетной загрузки (None - не выполнять)
+    CHECKPOINT_AFTER_LOAD = 'TRUNCATE'
+
+    # Обновление статистики планировщика (ANALYZE) после пакетной загрузки;
+    # analysis_limit - число строк выборки на индекс (0 - без ограничения)
+    ANALYZE_AFTER_LOAD = True
+    ANALYSIS_LIMIT = 1000
+    
+    # Параметры пакетной загрузки (режим 4)
+    BULK_CHUNK_SIZE = 50000
+    # Удалять вторичные индексы на время загрузки: True/False или None -
+    # только вне WAL. В WAL читатели работают параллельно с загрузкой, и без
+    # индексов их запросы перешли бы на полный просмотр таблицы; загрузка с
+    # индексами медленнее (каждая вставка обновляет все B-деревья)
+    BULK_DROP_INDEXES = None
+    BULK_LOAD_PRAGMAS = {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'cache_size': -65536,  # 64 МБ
+        'temp_store': 'MEMORY',
+    }
+
+    # PRAGMA на время вывода полного списка (режим 3) для хостов с малым
+    # объемом памяти: небольшой кэш страниц, временные структуры на диске,
+    # без отображения файла в память. Сортировку обслуживает покрывающий
+    # индекс, поэтому временное B-дерево не строится
+    LISTING_PRAGMAS = {
+        'cache_size': -2048,  # 2 МБ
+        'temp_store': 'FILE',
+        'mmap_size': 0,
+    }
+    # Число строк вывода, записываемых в stdout одним вызовом
+    OUTPUT_BUFFER_LINES = 5000
     
+    # Кэш результатов запросов: ограничение памяти (0 - кэш выключен) и
+    # необязательный файл для сохранения кэша между запусками
+    QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    QUERY_CACHE_PATH = os.environ.get('EMPLOYEE_QUERY_CACHE')
+    
+    # Сервис HTTP/JSON (service.py): адрес, число потоков работы с БД,
+    # размер страницы потоковой выдачи и максимальный limit для поиска
+    SERVICE_HOST = '127.0.0.1'
+    SERVICE_PORT = 8080
+    SERVICE_WORKERS = 4
+    SERVICE_PAGE_SIZE = 1000
+    SERVICE_MAX_LIMIT = 10000
+    
+    # Шардированная раскладка (sharding.py): число файлов, шаблон имени,
+    # способ разбиения ('hash' - по хешу (ФИО, дата рождения), 'initial' -
+    # по диапазонам первой буквы ФИО) и число процессов координатора
+    SHARD_COUNT = 4
+    SHARD_PATH_TEMPLATE = "employees_shard{index}.db"
+    SHARD_PARTITION = 'hash'
+    SHARD_WORKERS = None  # None - по числу шардов, но не больше числа CPU
+    SHARD_PAGE_SIZE = 10000
+    
+    # Режим копии в памяти (snapshot.py): все чтения идут из копии БД в
+    # :memory:, копия перестраивается при изменении файла (PRAGMA data_version),
+    # файл проверяется не чаще раза в SNAPSHOT_CHECK_INTERVAL секунд
+    SNAPSHOT = os.environ.get('EMPLOYEE_SNAPSHOT', '').lower() in ('1', 'yes', 'true')
+    SNAPSHOT_CHECK_INTERVAL = 1.0
+    
+    # Журнал медленных запросов (metrics.py): порог в секундах, None - выключен.
+    # Трассировка вызывается для каждого выполнения запроса, поэтому по умолчанию выключена
+    SLOW_STATEMENT_SECONDS = float(os.environ['EMPLOYEE_SLOW_SQL']) if os.environ.get('EMPLOYEE_SLOW_SQL') else None
+    
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     @classmethod
-    def get_connection(cls):
+    def create_connection(cls, db_path=None, read_only=False, check_same_thread=True):
+        """Открывает новое соединение с примененными PRAGMA (ошибки не перехватываются)"""
+        db_path = db_path or cls.DB_PATH
+        if read_only:
+            # urllib.request дорог при импорте - загружается только здесь
+            from urllib.request import pathname2url
+            
+            # URI-соединение только для чтения: запись в файл невозможна
+            uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread,
+                                   factory=InstrumentedConnection)
+        else:
+            conn = sqlite3.connect(db_path, check_same_thread=check_same_thread,
+                                   factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row  # Чтобы получать результаты как словари
+
+        pragmas = dict(cls.JOURNAL_PROFILES.get(cls.JOURNAL_PROFILE, {}))
+        if read_only:
+            # Режим журнала хранится в файле БД и меняется только на запись
+            pragmas.pop('journal_mode', None)
+        pragmas.update(cls.CONNECTION_PRAGMAS)
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if cls.SLOW_STATEMENT_SECONDS is not None:
+            SlowStatementLog(cls.SLOW_STATEMENT_SECONDS).attach(conn)
+        return conn
+
+    @classmethod
+    def get_connection(cls, db_path=None, read_only=False):
+        db_path = db_path or cls.DB_PATH
         try:
-            conn = sqlite3.connect(cls.DB_PATH)
-            conn.row_factory = sqlite3.Row  # Чтобы получать результаты как словари
-            print(f"SQLite database connection established: {cls.DB_PATH}")
+            conn = cls.create_connection(db_path, read_only)
+            print(f"SQLite database connection established: {db_path}")
             return conn
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             return None
-    
+
+    @classmethod
+    def get_pool(cls, db_path=None, read_only=False):
+        """Возвращает общий пул соединений для базы данных"""
+        key = (os.path.abspath(db_path or cls.DB_PATH), read_only)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = ConnectionPool(db_path or cls.DB_PATH, cls.POOL_SIZE, read_only)
+            return pool
+
+    @classmethod
+    def close_pools(cls):
+        """Закрывает все соединения во всех пулах"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools = {}
+        for pool in pools:
+            pool.close_all()
+
+    @staticmethod
+    def check_connection(conn) -> bool:
+        """Дешевая проверка живого соединения (SELECT 1 без переподключения)"""
+        if conn is None:
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
     @classmethod
     def test_connection(cls):
         """Тестирует подключение к базе данных"""
         try:
-            conn = cls.get_connection()
-            if conn:
-                conn.close()
+            # Соединение остается в пуле и переиспользуется EmployeeDatabase
+            pool = cls.get_pool()
+            conn = pool.acquire()
+            if cls.check_connection(conn):
+                pool.release(conn)
                 print("Database connection test successful!")
                 return True
             return False
         except sqlite3.Error as e:
             print(f"Database setup error: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -1,15 +1,232 @@
 import sqlite3
 import time
+from contextlib import contextmanager
+from datetime import date
+from cache import QueryCache
 from config import DatabaseConfig
+from metrics import METRICS, timed
+
+
+def _years_before(day, years):
+    """Дата на years лет раньше day (29 февраля -> 28 февраля)"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
 
 class EmployeeDatabase:
-    def __init__(self):
-        self.connection = DatabaseConfig.get_connection()
+    # Диапазон вместо LIKE 'F%': регистронезависимый LIKE не может
+    # использовать BINARY-индексы, а диапазон - может
+    MALES_F_SURNAME_QUERY = """
+        SELECT full_name, birth_date, gender
+        FROM employees
+        WHERE gender = 'Male' AND full_name >= 'F' AND full_name < 'G'
+    """
+    
+    # Вставка с пропуском повторов и вставка с обновлением (upsert) для
+    # повторных загрузок: у существующего сотрудника обновляется пол
+    INSERT_QUERY = """
+        INSERT OR IGNORE INTO employees (full_name, birth_date, gender)
+        VALUES (?, ?, ?)
+    """
+    UPSERT_QUERY = """
+        INSERT INTO employees (full_name, birth_date, gender)
+        VALUES (?, ?, ?)
+        ON CONFLICT (full_name, birth_date) DO UPDATE SET gender = excluded.gender
+        WHERE gender != excluded.gender
+    """
+    # Уже существующие ключи порции - один запрос по индексу UNIQUE
+    EXISTING_KEYS_QUERY = """
+        SELECT e.full_name, e.birth_date
+        FROM json_each(?) AS k
+        JOIN employees AS e
+            ON e.full_name = json_extract(k.value, '$[0]')
+            AND e.birth_date = json_extract(k.value, '$[1]')
+    """
+    
+    # Объявленные вторичные индексы (см. indexes.py). Покрывающий индекс
+    # (full_name, birth_date, gender) отдает упорядоченный список (режим 3)
+    # и поиск по префиксу фамилии без обращений к таблице и временного
+    # B-дерева сортировки; (gender, full_name, birth_date) так же отдает
+    # поиск по полу (с префиксом фамилии или без); индекс ограничения
+    # UNIQUE(full_name, birth_date) остается для проверки уникальности.
+    # Покрывающий индекс повторяет ключи индекса ограничения (index status
+    # отмечает это как overlaps) и занимает столько же места, но без него
+    # каждая строка списка читается из таблицы: на 318 тыс. записей полный
+    # список 0.50 с против 1.16 с, поиск по префиксу 38 мс против 118 мс
+    INDEXES = {
+        'idx_full_name_covering': ('full_name', 'birth_date', 'gender'),
+        'idx_gender_name_covering': ('gender', 'full_name', 'birth_date'),
+        'idx_gender_birth_date': ('gender', 'birth_date'),
+        'idx_birth_date': ('birth_date',),
+    }
+    
+    # Рекомендуемые составные индексы для комбинаций фильтров search()
+    COVERING_INDEX = 'idx_full_name_covering'
+    GENDER_COVERING_INDEX = 'idx_gender_name_covering'
+    SEARCH_INDEXES = {
+        frozenset(['surname_prefix']): (COVERING_INDEX, '(full_name, birth_date, gender)'),
+        frozenset(['gender']): (GENDER_COVERING_INDEX, '(gender, full_name, birth_date)'),
+        frozenset(['gender', 'surname_prefix']): (GENDER_COVERING_INDEX, '(gender, full_name, birth_date)'),
+        frozenset(['birth_date']): ('idx_birth_date', '(birth_date)'),
+        frozenset(['gender', 'birth_date']): ('idx_gender_birth_date', '(gender, birth_date)'),
+        frozenset(['surname_prefix', 'birth_date']): (COVERING_INDEX, '(full_name, birth_date, gender)'),
+        frozenset(['gender', 'surname_prefix', 'birth_date']): (GENDER_COVERING_INDEX, '(gender, full_name, birth_date)'),
+    }
+    
+    # Полнотекстовый индекс по ФИО (FTS5) и триггеры его синхронизации
+    FTS_TABLE = 'employees_fts'
+    FTS_TRIGGERS = {
+        'employees_fts_insert': """
+            CREATE TRIGGER employees_fts_insert AFTER INSERT ON employees BEGIN
+                INSERT INTO employees_fts (rowid, full_name) VALUES (new.id, new.full_name);
+            END
+        """,
+        'employees_fts_delete': """
+            CREATE TRIGGER employees_fts_delete AFTER DELETE ON employees BEGIN
+                INSERT INTO employees_fts (employees_fts, rowid, full_name)
+                VALUES ('delete', old.id, old.full_name);
+            END
+        """,
+        'employees_fts_update': """
+            CREATE TRIGGER employees_fts_update AFTER UPDATE OF full_name ON employees BEGIN
+                INSERT INTO employees_fts (employees_fts, rowid, full_name)
+                VALUES ('delete', old.id, old.full_name);
+                INSERT INTO employees_fts (rowid, full_name) VALUES (new.id, new.full_name);
+            END
+        """,
+    }
+    
+    # Счетчик изменений таблицы: сохраняется в БД и увеличивается триггерами
+    # при любой записи, в том числе из других процессов
+    CHANGE_COUNTER_TRIGGERS = {
+        f'employee_version_{event.lower()}': f"""
+            CREATE TRIGGER employee_version_{event.lower()} AFTER {event} ON employees BEGIN
+                UPDATE employee_version SET version = version + 1;
+            END
+        """
+        for event in ('INSERT', 'DELETE', 'UPDATE')
+    }
+    
+    # Счетчики статистики по измерениям и триггеры их поддержания
+    STATS_DIMENSIONS = {
+        'total': "''",
+        'gender': "{row}.gender",
+        'initial': "substr({row}.full_name, 1, 1)",
+        'birth_date': "{row}.birth_date",
+    }
+    
+    @classmethod
+    def _stats_trigger_body(cls, row, delta):
+        statements = []
+        for dimension, key_sql in cls.STATS_DIMENSIONS.items():
+            statements.append(f"""
+                INSERT INTO employee_stats (dimension, key, count)
+                VALUES ('{dimension}', {key_sql.format(row=row)}, {delta})
+                ON CONFLICT (dimension, key) DO UPDATE SET count = count + ({delta});""")
+        return ''.join(statements)
+    
+    @classmethod
+    def _stats_triggers(cls):
+        return {
+            'employee_stats_insert': f"""
+                CREATE TRIGGER employee_stats_insert AFTER INSERT ON employees BEGIN
+                    {cls._stats_trigger_body('new', 1)}
+                END
+            """,
+            'employee_stats_delete': f"""
+                CREATE TRIGGER employee_stats_delete AFTER DELETE ON employees BEGIN
+                    {cls._stats_trigger_body('old', -1)}
+                END
+            """,
+            'employee_stats_update': f"""
+                CREATE TRIGGER employee_stats_update
+                AFTER UPDATE OF full_name, birth_date, gender ON employees BEGIN
+                    {cls._stats_trigger_body('old', -1)}
+                    {cls._stats_trigger_body('new', 1)}
+                END
+            """,
+        }
+    
+    def __init__(self, db_path=None, read_only=False):
+        # Соединение берется из общего пула и возвращается в него в close()
+        self.pool = DatabaseConfig.get_pool(db_path, read_only)
+        self.connection = self.pool.acquire()
+        
+        # Кэш результатов: записи действительны, пока не изменилась версия
+        # данных (собственный счетчик записей + PRAGMA data_version)
+        self.cache = QueryCache(DatabaseConfig.QUERY_CACHE_MAX_BYTES, DatabaseConfig.QUERY_CACHE_PATH)
+        self.write_version = 0
+        if self.is_connected() and self.cache.path:
+            self.cache.load(self.get_change_counter(), self.data_version())
     
     def is_connected(self):
         """Проверяет, установлено ли соединение с БД"""
         return self.connection is not None
     
+    def ping(self) -> bool:
+        """Проверяет, что соединение живо (SELECT 1 на текущем соединении)"""
+        return DatabaseConfig.check_connection(self.connection)
+    
+    def data_version(self):
+        """Версия данных для кэша результатов.
+        
+        PRAGMA data_version меняется при фиксации транзакций другими
+        соединениями и процессами, собственные записи учитывает write_version.
+        """
+        try:
+            return self.write_version, self.connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return self.write_version, None
+    
+    def invalidate_cache(self):
+        """Отмечает изменение данных этим соединением"""
+        self.write_version += 1
+    
+    def cached_rows(self, sql, params=(), use_cache=True, batch_size=1000):
+        """Потоково отдает строки запроса (кортежи) из кэша или из БД.
+        
+        При промахе строки читаются через fetchmany и сохраняются в кэш, если
+        результат прочитан полностью и помещается в ограничение памяти; как
+        только накопленные строки превышают ограничение, накопление
+        прекращается (большой результат не удваивает пиковую память).
+        """
+        if not use_cache or not self.cache.enabled:
+            key = None
+        else:
+            key = self.cache.make_key(sql, params)
+            version = self.data_version()
+            rows = self.cache.get(key, version)
+            if rows is not None:
+                yield from rows
+                return
+        
+        cursor = self.connection.cursor()
+        rows_read = 0
+        try:
+            cursor.execute(sql, params)
+            collected = [] if key is not None else None
+            collected_bytes = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                rows_read += len(rows)
+                rows = [tuple(row) for row in rows]
+                if collected is not None:
+                    collected_bytes += self.cache.estimate_size(rows)
+                    if collected_bytes > self.cache.max_bytes:
+                        collected = None
+                    else:
+                        collected.extend(rows)
+                yield from rows
+            if collected is not None:
+                self.cache.put(key, version, collected)
+        finally:
+            METRICS.inc('rows_read', rows_read)
+            cursor.close()
+    
+    @timed
     def create_table(self) -> bool:
         """Создает таблицу сотрудников"""
         if not self.is_connected():
@@ -30,19 +247,18 @@ class EmployeeDatabase:
                 )
             """)
             
-            # Создаем индексы для улучшения производительности
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_full_name ON employees (full_name)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_gender ON employees (gender)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_birth_date ON employees (birth_date)
-            """)
+            # Создаем объявленные индексы для улучшения производительности
+            for index_name, columns in self.INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON employees ({', '.join(columns)})")
             
             self.connection.commit()
             print("Table 'employees' created successfully with indexes")
+            
+            # Статистика и счетчик изменений поддерживаются триггерами с момента создания таблицы
+            if not self.has_stats():
+                self.create_stats()
+            if self.get_change_counter() is None:
+                self.create_change_counter()
             return True
         except sqlite3.Error as e:
             print(f"Error creating table: {e}")
@@ -51,23 +267,33 @@ class EmployeeDatabase:
             if cursor:
                 cursor.close()
     
+    @timed
     def insert_employee(self, employee) -> bool:
         """Вставляет одного сотрудника в базу данных"""
+        from validation import validate_row
+        
         if not self.is_connected():
             print("Error: No database connection")
             return False
             
+        employee_data, errors = validate_row(employee.full_name, employee.birth_date, employee.gender)
+        if errors:
+            for error in errors:
+                print(f"Error: {error.message}")
+            return False
+            
         cursor = None
         try:
             cursor = self.connection.cursor()
             
-            employee_data = employee.to_tuple()
             cursor.execute("""
                 INSERT INTO employees (full_name, birth_date, gender)
                 VALUES (?, ?, ?)
             """, employee_data)
             
             self.connection.commit()
+            self.invalidate_cache()
+            METRICS.inc('rows_written')
             print(f"Employee '{employee.full_name}' added successfully")
             return True
         except sqlite3.IntegrityError:
@@ -80,99 +306,530 @@ class EmployeeDatabase:
             if cursor:
                 cursor.close()
     
-    def bulk_insert_employees(self, employees: list) -> bool:
-        """Пакетная вставка сотрудников"""
+    def _dedup_chunk(self, cursor, chunk, seen, upsert, probe):
+        """Предварительная дедупликация порции по ключу (full_name, birth_date).
+        
+        Повторы отбрасываются по множеству seen (при upsert - внутри порции,
+        побеждает последняя запись). С probe ключи порции проверяются одним
+        запросом к БД. Возвращает (новые строки, строки с существующим ключом).
+        """
+        if upsert:
+            unique = list({(row[0], row[1]): row for row in chunk}.values())
+        else:
+            unique = []
+            append = unique.append
+            add = seen.add
+            for row in chunk:
+                key = (row[0], row[1])
+                if key not in seen:
+                    add(key)
+                    append(row)
+        if not probe or not unique:
+            return unique, []
+        
+        import json
+        
+        keys = json.dumps([[row[0], row[1]] for row in unique], ensure_ascii=False)
+        existing = {tuple(row) for row in cursor.execute(self.EXISTING_KEYS_QUERY, (keys,))}
+        if not existing:
+            return unique, []
+        fresh = [row for row in unique if (row[0], row[1]) not in existing]
+        known = [row for row in unique if (row[0], row[1]) in existing]
+        return fresh, known
+    
+    def _write_chunk(self, cursor, chunk, seen, upsert, probe, counts):
+        """Записывает порцию и обновляет счетчики rows/inserted/updated/duplicates.
+        
+        rowcount INSERT OR IGNORE равен числу вставленных строк, а при upsert
+        включает и обновления, поэтому в режиме upsert новые и существующие
+        ключи (по проверке probe) пишутся отдельными вызовами.
+        """
+        fresh, known = self._dedup_chunk(cursor, chunk, seen, upsert, probe or upsert)
+        inserted = updated = 0
+        if fresh:
+            cursor.executemany(self.UPSERT_QUERY if upsert else self.INSERT_QUERY, fresh)
+            inserted = cursor.rowcount
+        if known and upsert:
+            cursor.executemany(self.UPSERT_QUERY, known)
+            updated = cursor.rowcount
+        counts['rows'] += len(chunk)
+        counts['inserted'] += inserted
+        counts['updated'] += updated
+        counts['duplicates'] += len(chunk) - inserted - updated
+        METRICS.inc('rows_written', inserted + updated)
+    
+    @timed
+    def bulk_insert_employees(self, employees, upsert=False, probe=False, stats=None) -> bool:
+        """Пакетная вставка сотрудников одной транзакцией.
+        
+        employees - объекты Employee или кортежи (full_name, birth_date, gender).
+        Повторы ключа отбрасываются до обращения к БД; upsert обновляет пол
+        существующих сотрудников. Счетчики rows/inserted/updated/duplicates/
+        rejected записываются в stats.
+        """
+        from validation import validate_rows
+        
         if not self.is_connected():
             print("Error: No database connection")
             return False
             
+        counts = stats if stats is not None else {}
+        counts.update({'rows': 0, 'inserted': 0, 'updated': 0, 'duplicates': 0, 'rejected': 0})
         cursor = None
         try:
             cursor = self.connection.cursor()
             
-            # Преобразуем объекты Employee в кортежи
-            data = [emp.to_tuple() for emp in employees]
-            
-            cursor.executemany("""
-                INSERT OR IGNORE INTO employees (full_name, birth_date, gender)
-                VALUES (?, ?, ?)
-            """, data)
+            # Проверяем и нормализуем всю порцию, некорректные записи пропускаем
+            data, errors = validate_rows(
+                (emp.full_name, emp.birth_date, emp.gender) if hasattr(emp, 'to_tuple') else emp
+                for emp in employees
+            )
+            counts['rejected'] = len(errors)
+            if errors:
+                print(f"Skipped {len(errors)} invalid employees")
             
+            self._write_chunk(cursor, data, set(), upsert, probe, counts)
             self.connection.commit()
-            inserted_count = cursor.rowcount
-            print(f"Successfully inserted {inserted_count} employees")
+            self.invalidate_cache()
+            message = f"Successfully inserted {counts['inserted']} employees"
+            if upsert:
+                message += f", updated {counts['updated']}"
+            print(f"{message}, skipped {counts['duplicates']} duplicates")
             return True
         except sqlite3.Error as e:
             print(f"Error in bulk insert: {e}")
+            self.connection.rollback()
             return False
         finally:
             if cursor:
                 cursor.close()
     
-    def get_all_employees_sorted(self) -> list:
-        """Получает всех сотрудников, отсортированных по ФИО"""
+    @timed
+    def bulk_load_chunks(self, chunks, drop_indexes=None, pragmas=None,
+                         dedup=False, upsert=False, probe=False, stats=None) -> bool:
+        """Пакетная загрузка готовых порций кортежей (full_name, birth_date, gender).
+        
+        Каждая порция фиксируется отдельной транзакцией. На время загрузки
+        применяются PRAGMA из DatabaseConfig.BULK_LOAD_PRAGMAS. С drop_indexes
+        вторичные индексы удаляются и перестраиваются после загрузки; None -
+        DatabaseConfig.BULK_DROP_INDEXES (по умолчанию индексы остаются в WAL,
+        где их используют параллельные читатели).
+        
+        Повторы ключа внутри порции отбрасываются в памяти; dedup - по всей
+        загрузке (множество ключей растет с объемом данных), probe - ключи,
+        уже имеющиеся в БД, проверяются одним запросом на порцию, upsert -
+        обновление пола существующих сотрудников. Счетчики rows/inserted/
+        updated/duplicates записываются в stats.
+        """
         if not self.is_connected():
             print("Error: No database connection")
-            return []
-            
+            return False
+        
+        pragmas = DatabaseConfig.BULK_LOAD_PRAGMAS if pragmas is None else pragmas
+        
         cursor = None
+        saved_pragmas = {}
+        dropped_indexes = []
+        dropped_derived = []
         try:
             cursor = self.connection.cursor()
-            cursor.execute("""
-                SELECT DISTINCT full_name, birth_date, gender
-                FROM employees 
-                ORDER BY full_name
-            """)
+            self.connection.commit()
             
-            from employee import Employee
-            employees = []
-            for row in cursor.fetchall():
-                emp = Employee.from_db_row(row)
-                employees.append(emp)
+            # Запоминаем текущие значения PRAGMA и применяем параметры загрузки
+            wal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+            for name, value in pragmas.items():
+                if name == 'journal_mode' and wal_mode:
+                    # В WAL читатели работают параллельно с загрузкой - режим не меняем
+                    continue
+                saved_pragmas[name] = cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                cursor.execute(f"PRAGMA {name} = {value}")
+            
+            if drop_indexes is None:
+                drop_indexes = DatabaseConfig.BULK_DROP_INDEXES
+            if drop_indexes is None:
+                drop_indexes = not wal_mode
+            
+            # Удаляем вторичные индексы (индекс UNIQUE остается для INSERT OR IGNORE)
+            if drop_indexes:
+                cursor.execute("""
+                    SELECT name, sql FROM sqlite_master
+                    WHERE type = 'index' AND tbl_name = 'employees' AND sql IS NOT NULL
+                """)
+                dropped_indexes = [(row['name'], row['sql']) for row in cursor.fetchall()]
+                for index_name, _ in dropped_indexes:
+                    cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+                
+                # Производные структуры (полнотекстовый индекс, статистика)
+                # не обновляются триггерами построчно, а пересчитываются после загрузки
+                dropped_derived = self._derived_structures()
+                for _, triggers, _ in dropped_derived:
+                    for trigger_name in triggers:
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                self.connection.commit()
+            
+            start_time = time.perf_counter()
+            counts = stats if stats is not None else {}
+            counts.update({'rows': 0, 'inserted': 0, 'updated': 0, 'duplicates': 0})
+            seen = set()
+            for chunk in chunks:
+                self._write_chunk(cursor, chunk, seen if dedup else set(), upsert, probe, counts)
+                self.connection.commit()
+                
+                total_rows = counts['rows']
+                elapsed = time.perf_counter() - start_time
+                print(f"Loaded {total_rows:,} rows ({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+            
+            load_time = time.perf_counter() - start_time
+            
+            # Перестраиваем удаленные индексы
+            if dropped_indexes:
+                print("Rebuilding indexes...")
+                index_start = time.perf_counter()
+                for _, create_sql in dropped_indexes:
+                    cursor.execute(create_sql)
+                self.connection.commit()
+                dropped_indexes = []
+                print(f"Indexes rebuilt in {time.perf_counter() - index_start:.2f} seconds")
+            
+            while dropped_derived:
+                title, _, restore = dropped_derived.pop()
+                print(f"Rebuilding {title}...")
+                restore(cursor)
             
-            return employees
+            # После загрузки распределение данных изменилось - обновляем статистику планировщика
+            if DatabaseConfig.ANALYZE_AFTER_LOAD and counts['inserted'] + counts['updated']:
+                self.analyze()
+            
+            if wal_mode and DatabaseConfig.CHECKPOINT_AFTER_LOAD:
+                self.checkpoint(DatabaseConfig.CHECKPOINT_AFTER_LOAD)
+            
+            total_time = time.perf_counter() - start_time
+            rate = counts['rows'] / load_time if load_time > 0 else 0
+            updated = f", updated {counts['updated']:,}" if upsert else ""
+            print(f"Successfully inserted {counts['inserted']:,} of {counts['rows']:,} employees"
+                  f"{updated}, skipped {counts['duplicates']:,} duplicates")
+            print(f"Load time: {load_time:.2f} seconds ({rate:,.0f} rows/sec), total: {total_time:.2f} seconds")
+            return True
         except sqlite3.Error as e:
-            print(f"Error fetching employees: {e}")
-            return []
+            print(f"Error in bulk load: {e}")
+            self.connection.rollback()
+            return False
         finally:
+            self.invalidate_cache()
             if cursor:
+                try:
+                    # Восстанавливаем индексы, если загрузка прервалась
+                    for _, create_sql in dropped_indexes:
+                        cursor.execute(create_sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+                    for _, _, restore in dropped_derived:
+                        restore(cursor)
+                    self.connection.commit()
+                    # Возвращаем исходные значения PRAGMA
+                    for name, value in saved_pragmas.items():
+                        cursor.execute(f"PRAGMA {name} = {value}")
+                except sqlite3.Error as e:
+                    print(f"Error restoring database settings: {e}")
                 cursor.close()
     
-    def get_males_with_f_surname(self) -> tuple:
-        """Получает мужчин с фамилией на 'F'"""
+    @contextmanager
+    def temporary_pragmas(self, pragmas):
+        """Применяет PRAGMA на время блока with и затем возвращает прежние значения"""
+        saved = {}
+        try:
+            for name, value in pragmas.items():
+                saved[name] = self.connection.execute(f"PRAGMA {name}").fetchone()[0]
+                self.connection.execute(f"PRAGMA {name} = {value}")
+            yield
+        finally:
+            for name, value in saved.items():
+                self.connection.execute(f"PRAGMA {name} = {value}")
+    
+    @timed
+    def iter_row_chunks(self, chunk_size=10000, order='id'):
+        """Потоково отдает таблицу порциями кортежей (full_name, birth_date, gender).
+        
+        order - 'id' (порядок добавления) или 'name' (по ФИО и дате рождения).
+        Ошибки sqlite3.Error передаются вызывающему: прерванное чтение не
+        должно выглядеть как полная выгрузка.
+        """
+        order_by = {'id': 'id', 'name': 'full_name, birth_date'}[order]
         if not self.is_connected():
             print("Error: No database connection")
-            return [], 0
-            
+            return
+        
         cursor = None
         try:
             cursor = self.connection.cursor()
-            start_time = time.time()
-            
-            cursor.execute("""
-                SELECT full_name, birth_date, gender 
-                FROM employees 
-                WHERE gender = 'Male' AND full_name LIKE 'F%'
+            # Кортежи вместо sqlite3.Row: меньше накладных расходов на строку
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT full_name, birth_date, gender
+                FROM employees
+                ORDER BY {order_by}
             """)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                METRICS.inc('rows_read', len(rows))
+                yield rows
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @timed
+    def get_all_employees_sorted(self, chunk_size=10000):
+        """Получает всех сотрудников, отсортированных по ФИО, в колоночном EmployeeBatch.
+        
+        Порции fetchmany сразу раскладываются по столбцам, без объекта на
+        строку; при ошибке возвращается пустой пакет.
+        """
+        from employee import EmployeeBatch
+        
+        batch = EmployeeBatch()
+        try:
+            for rows in self.iter_row_chunks(chunk_size, order='name'):
+                batch.extend(rows)
+        except sqlite3.Error as e:
+            print(f"Error fetching employees: {e}")
+            return EmployeeBatch()
+        return batch
+    
+    @staticmethod
+    def sorted_page_query(last_key, limit, offset=0):
+        """Запрос страницы keyset-пагинации по (full_name, birth_date).
+        
+        last_key - None, (ФИО, None) или (ФИО, дата рождения) последней
+        строки предыдущей страницы.
+        """
+        if last_key is None:
+            where, params = "", []
+        elif last_key[1] is None:
+            where, params = "WHERE full_name > ?", [last_key[0]]
+        else:
+            where, params = "WHERE (full_name, birth_date) > (?, ?)", list(last_key)
+        return f"""
+            SELECT full_name, birth_date, gender
+            FROM employees
+            {where}
+            ORDER BY full_name, birth_date
+            LIMIT ? OFFSET ?
+        """, params + [limit, offset]
+    
+    @timed
+    def sorted_page(self, after=None, limit=10000) -> list:
+        """Одна страница упорядоченного списка в виде кортежей (без кэша).
+        
+        Ошибки sqlite3.Error передаются вызывающему: неполная страница
+        означает конец данных, и пустой список вместо ошибки молча обрезал
+        бы слияние шардов.
+        """
+        if not self.is_connected():
+            raise sqlite3.OperationalError("No database connection")
+        return list(self.cached_rows(*self.sorted_page_query(after, limit), use_cache=False))
+    
+    @timed
+    def iter_employees_sorted(self, limit=None, offset=0, after=None,
+                              page_size=10000, batch_size=1000, use_cache=True):
+        """Потоково отдает сотрудников, отсортированных по ФИО и дате рождения.
+        
+        Использует keyset-пагинацию по (full_name, birth_date): каждая страница
+        запрашивается отдельным запросом, продолжая с последнего ключа, а строки
+        читаются через fetchmany, поэтому память не растет с размером таблицы.
+        Страницы кэшируются в кэше результатов (use_cache).
+        after - ФИО или кортеж (ФИО, дата рождения), после которого начинать вывод.
+        """
+        if not self.is_connected():
+            print("Error: No database connection")
+            return
+        
+        from employee import Employee
+        
+        # Начальный ключ для keyset-пагинации
+        if isinstance(after, (tuple, list)):
+            last_key = tuple(after)
+        elif after is not None:
+            last_key = (after, None)
+        else:
+            last_key = None
+        
+        remaining = limit
+        skip = offset or 0
+        
+        try:
+            while remaining is None or remaining > 0:
+                page_limit = page_size if remaining is None else min(page_size, remaining)
+                sql, params = self.sorted_page_query(last_key, page_limit, skip)
+                rows = self.cached_rows(sql, params, use_cache=use_cache, batch_size=batch_size)
+                # OFFSET применяется только к первой странице
+                skip = 0
+                
+                fetched = 0
+                row = None
+                for row in rows:
+                    yield Employee(*row)
+                    fetched += 1
+                if row is not None:
+                    last_key = (row[0], row[1])
+                
+                if remaining is not None:
+                    remaining -= fetched
+                if fetched < page_limit:
+                    break
+        except sqlite3.Error as e:
+            print(f"Error fetching employees: {e}")
+    
+    @timed
+    def get_males_with_f_surname(self, use_cache=True) -> tuple:
+        """Получает мужчин с фамилией на 'F'"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return [], 0
             
-            execution_time = time.time() - start_time
-            
+        try:
             from employee import Employee
-            employees = []
-            for row in cursor.fetchall():
-                emp = Employee.from_db_row(row)
-                employees.append(emp)
+            
+            # Время включает выполнение (или чтение из кэша), выборку строк и создание объектов
+            start_time = time.perf_counter()
+            rows = self.cached_rows(self.MALES_F_SURNAME_QUERY, use_cache=use_cache)
+            employees = [Employee(*row) for row in rows]
+            execution_time = time.perf_counter() - start_time
             
             return employees, execution_time
         except sqlite3.Error as e:
             print(f"Error fetching employees: {e}")
             return [], 0
+    
+    def build_search_query(self, surname_prefix=None, gender=None, born_from=None, born_to=None,
+                           age_min=None, age_max=None, limit=None) -> tuple:
+        """Строит параметризованный запрос поиска сотрудников.
+        
+        Префикс фамилии превращается в диапазон full_name >= X AND full_name < Y,
+        а диапазон возраста - в диапазон дат рождения, поэтому все условия
+        могут обслуживаться индексами. Даты передаются в формате YYYY-MM-DD.
+        """
+        conditions = []
+        params = []
+        
+        if surname_prefix:
+            upper = surname_prefix[:-1] + chr(ord(surname_prefix[-1]) + 1)
+            conditions.append("full_name >= ? AND full_name < ?")
+            params += [surname_prefix, upper]
+        
+        if gender:
+            conditions.append("gender = ?")
+            params.append(gender)
+        
+        # Возраст >= age_min, если родился не позже, чем age_min лет назад;
+        # возраст <= age_max, если родился позже, чем (age_max + 1) лет назад
+        today = date.today()
+        if age_min is not None:
+            bound = _years_before(today, age_min).isoformat()
+            born_to = min(born_to, bound) if born_to else bound
+        if age_max is not None:
+            conditions.append("birth_date > ?")
+            params.append(_years_before(today, age_max + 1).isoformat())
+        
+        if born_from:
+            conditions.append("birth_date >= ?")
+            params.append(born_from)
+        if born_to:
+            conditions.append("birth_date <= ?")
+            params.append(born_to)
+        
+        sql = "SELECT full_name, birth_date, gender FROM employees"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY full_name, birth_date"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return sql, tuple(params)
+    
+    def recommend_search_index(self, **filters):
+        """Возвращает (имя, столбцы) рекомендуемого индекса для набора фильтров"""
+        used = set()
+        if filters.get('surname_prefix'):
+            used.add('surname_prefix')
+        if filters.get('gender'):
+            used.add('gender')
+        if any(filters.get(name) is not None for name in ('born_from', 'born_to', 'age_min', 'age_max')):
+            used.add('birth_date')
+        return self.SEARCH_INDEXES.get(frozenset(used))
+    
+    @timed
+    def search(self, stats=None, batch_size=1000, **filters):
+        """Потоково отдает сотрудников, подходящих под фильтры (см. build_search_query).
+        
+        Если передан словарь stats, в него записываются время выполнения запроса
+        (execute_time), общее время (total_time) и число строк (rows).
+        """
+        if not self.is_connected():
+            print("Error: No database connection")
+            return
+        
+        from employee import Employee
+        
+        sql, params = self.build_search_query(**filters)
+        
+        cursor = None
+        rows_count = 0
+        start_time = time.perf_counter()
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(sql, params)
+            if stats is not None:
+                stats['execute_time'] = time.perf_counter() - start_time
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Employee.from_db_row(row)
+                rows_count += len(rows)
+        except sqlite3.Error as e:
+            print(f"Error searching employees: {e}")
         finally:
+            METRICS.inc('rows_read', rows_count)
+            if stats is not None:
+                stats['total_time'] = time.perf_counter() - start_time
+                stats['rows'] = rows_count
             if cursor:
                 cursor.close()
     
-    def create_indexes(self) -> bool:
-        """Создает индексы для оптимизации запросов"""
+    def has_fulltext_index(self) -> bool:
+        """Проверяет, создана ли таблица полнотекстового индекса"""
+        if not self.is_connected():
+            return False
+        row = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.FTS_TABLE,)
+        ).fetchone()
+        return row is not None
+    
+    def _fulltext_tokenizer(self):
+        row = self.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self.FTS_TABLE,)
+        ).fetchone()
+        if row is None:
+            return None
+        return 'trigram' if 'trigram' in row['sql'] else 'unicode61'
+    
+    def _restore_fulltext_triggers(self, cursor):
+        cursor.execute(f"INSERT INTO {self.FTS_TABLE} ({self.FTS_TABLE}) VALUES ('rebuild')")
+        for trigger_name, create_sql in self.FTS_TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(create_sql)
+        self.connection.commit()
+    
+    @timed
+    def create_fulltext_index(self) -> bool:
+        """Создает полнотекстовый индекс FTS5 по ФИО и триггеры синхронизации.
+        
+        Используется токенизатор trigram (поиск по любой подстроке от 3 символов),
+        если он поддерживается SQLite, иначе unicode61 (поиск по началу слов).
+        """
         if not self.is_connected():
             print("Error: No database connection")
             return False
@@ -180,33 +837,371 @@ class EmployeeDatabase:
         cursor = None
         try:
             cursor = self.connection.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {self.FTS_TABLE}")
             
-            # Удаляем существующие индексы, если они есть
-            indexes_to_create = [
-                ("idx_gender_surname", "CREATE INDEX idx_gender_surname ON employees (gender, substr(full_name, 1, 1))"),
-                ("idx_full_name_birth_date", "CREATE INDEX idx_full_name_birth_date ON employees (full_name, birth_date)"),
-                ("idx_gender_full_name", "CREATE INDEX idx_gender_full_name ON employees (gender, full_name)")
-            ]
+            tokenizer = 'trigram'
+            try:
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE {self.FTS_TABLE} USING fts5(
+                        full_name, content='employees', content_rowid='id', tokenize='trigram'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                tokenizer = 'unicode61'
+                print("Trigram tokenizer is not available, using unicode61 (word prefix search)")
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE {self.FTS_TABLE} USING fts5(
+                        full_name, content='employees', content_rowid='id'
+                    )
+                """)
             
-            for index_name, create_sql in indexes_to_create:
-                try:
-                    cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
-                except sqlite3.Error:
-                    pass
-                
-                cursor.execute(create_sql)
-                print(f"Created index: {index_name}")
+            start_time = time.perf_counter()
+            self._restore_fulltext_triggers(cursor)
+            print(f"Full-text index ({tokenizer}) built in {time.perf_counter() - start_time:.2f} seconds")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error creating full-text index: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+    
+    def build_name_query(self, query, use_fulltext=True, limit=None) -> tuple:
+        """Строит запрос поиска по любой части ФИО (FTS5 или LIKE '%query%')"""
+        tokenizer = self._fulltext_tokenizer() if use_fulltext else None
+        
+        if tokenizer == 'trigram' and len(query) >= 3:
+            # Фраза в кавычках: trigram находит ее как подстроку
+            match = '"' + query.replace('"', '""') + '"'
+        elif tokenizer == 'unicode61' and query.strip():
+            match = '"' + query.replace('"', '""') + '" *'
+        else:
+            match = None
+        
+        if match is not None:
+            sql = f"""
+                SELECT e.full_name, e.birth_date, e.gender
+                FROM {self.FTS_TABLE}
+                JOIN employees e ON e.id = {self.FTS_TABLE}.rowid
+                WHERE {self.FTS_TABLE} MATCH ?
+            """
+            params = [match]
+        else:
+            # Без индекса (или для запросов короче 3 символов) - полный просмотр
+            sql = """
+                SELECT full_name, birth_date, gender
+                FROM employees
+                WHERE full_name LIKE ? ESCAPE '\\'
+            """
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params = [f"%{escaped}%"]
+        
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, tuple(params)
+    
+    @timed
+    def search_name(self, query, stats=None, limit=None, use_fulltext=True, batch_size=1000):
+        """Потоково отдает сотрудников, в ФИО которых встречается query.
+        
+        Если передан словарь stats, в него записываются время выполнения запроса
+        (execute_time), общее время (total_time) и число строк (rows).
+        """
+        if not self.is_connected():
+            print("Error: No database connection")
+            return
+        
+        from employee import Employee
+        
+        cursor = None
+        rows_count = 0
+        start_time = time.perf_counter()
+        try:
+            sql, params = self.build_name_query(query, use_fulltext, limit)
+            cursor = self.connection.cursor()
+            cursor.execute(sql, params)
+            if stats is not None:
+                stats['execute_time'] = time.perf_counter() - start_time
             
-            self.connection.commit()
-            print("All indexes created successfully")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Employee.from_db_row(row)
+                rows_count += len(rows)
+        except sqlite3.Error as e:
+            print(f"Error searching employees by name: {e}")
+        finally:
+            METRICS.inc('rows_read', rows_count)
+            if stats is not None:
+                stats['total_time'] = time.perf_counter() - start_time
+                stats['rows'] = rows_count
+            if cursor:
+                cursor.close()
+    
+    def _derived_structures(self):
+        """Существующие производные структуры: (название, триггеры, функция пересчета)"""
+        structures = []
+        if self.has_fulltext_index():
+            structures.append(('full-text index', self.FTS_TRIGGERS, self._restore_fulltext_triggers))
+        if self.has_stats():
+            structures.append(('statistics', self._stats_triggers(), self._restore_stats_triggers))
+        if self.get_change_counter() is not None:
+            structures.append(('change counter', self.CHANGE_COUNTER_TRIGGERS, self._restore_change_counter))
+        return structures
+    
+    def get_change_counter(self):
+        """Сохраненный в БД счетчик изменений таблицы (None, если не создан)"""
+        if not self.is_connected():
+            return None
+        try:
+            row = self.connection.execute("SELECT version FROM employee_version").fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+    
+    def _restore_change_counter(self, cursor):
+        cursor.execute("UPDATE employee_version SET version = version + 1")
+        for trigger_name, create_sql in self.CHANGE_COUNTER_TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(create_sql)
+        self.connection.commit()
+    
+    def create_change_counter(self) -> bool:
+        """Создает счетчик изменений (используется сохраняемым кэшем результатов)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return False
+            
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS employee_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO employee_version (id, version) VALUES (1, 0)")
+            self._restore_change_counter(cursor)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error creating change counter: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+    
+    def has_stats(self) -> bool:
+        """Проверяет, создана ли таблица статистики"""
+        if not self.is_connected():
+            return False
+        row = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employee_stats'"
+        ).fetchone()
+        return row is not None
+    
+    def _compute_stats_sql(self):
+        """Запрос полного пересчета статистики по таблице employees"""
+        return " UNION ALL ".join(
+            f"SELECT '{dimension}' AS dimension, {key_sql.format(row='employees')} AS key, COUNT(*) AS count "
+            f"FROM employees GROUP BY 2"
+            for dimension, key_sql in self.STATS_DIMENSIONS.items()
+        )
+    
+    def _restore_stats_triggers(self, cursor):
+        cursor.execute("DELETE FROM employee_stats")
+        cursor.execute(f"INSERT INTO employee_stats (dimension, key, count) {self._compute_stats_sql()}")
+        for trigger_name, create_sql in self._stats_triggers().items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(create_sql)
+        self.connection.commit()
+    
+    @timed
+    def create_stats(self) -> bool:
+        """Создает таблицу статистики, заполняет ее и включает триггеры поддержания"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return False
+            
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS employee_stats (
+                    dimension TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, key)
+                ) WITHOUT ROWID
+            """)
+            self._restore_stats_triggers(cursor)
             return True
         except sqlite3.Error as e:
-            print(f"Error creating indexes: {e}")
+            print(f"Error creating statistics: {e}")
+            self.connection.rollback()
             return False
         finally:
             if cursor:
                 cursor.close()
     
+    def get_stats(self) -> dict:
+        """Возвращает счетчики статистики: {измерение: {ключ: количество}}"""
+        stats = {dimension: {} for dimension in self.STATS_DIMENSIONS}
+        if not self.is_connected() or not self.has_stats():
+            return stats
+        try:
+            for row in self.connection.execute("SELECT dimension, key, count FROM employee_stats WHERE count != 0"):
+                stats.setdefault(row['dimension'], {})[row['key']] = row['count']
+        except sqlite3.Error as e:
+            print(f"Error reading statistics: {e}")
+        return stats
+    
+    @timed
+    def stats_summary(self, today=None, age_bucket=10) -> dict:
+        """Сводка по счетчикам статистики без обращения к таблице employees.
+        
+        Годы и десятилетия рождения, а также гистограмма возрастов (интервалы
+        по age_bucket лет) выводятся из счетчиков по датам рождения.
+        """
+        from employee import age_on
+        
+        today = today or date.today()
+        stats = self.get_stats()
+        by_year = {}
+        by_decade = {}
+        by_age = {}
+        for birth_date, count in stats['birth_date'].items():
+            year = int(birth_date[:4])
+            by_year[year] = by_year.get(year, 0) + count
+            by_decade[year // 10 * 10] = by_decade.get(year // 10 * 10, 0) + count
+            bucket = age_on(birth_date, today) // age_bucket * age_bucket
+            by_age[bucket] = by_age.get(bucket, 0) + count
+        return {
+            'total': stats['total'].get('', 0),
+            'gender': dict(sorted(stats['gender'].items())),
+            'initial': dict(sorted(stats['initial'].items())),
+            'birth_year': dict(sorted(by_year.items())),
+            'birth_decade': dict(sorted(by_decade.items())),
+            'age': dict(sorted(by_age.items())),
+        }
+    
+    @timed
+    def check_stats(self) -> list:
+        """Пересчитывает статистику с нуля и возвращает расхождения (измерение, ключ, хранимое, фактическое)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return []
+        
+        stored = self.get_stats()
+        actual = {dimension: {} for dimension in self.STATS_DIMENSIONS}
+        try:
+            for row in self.connection.execute(self._compute_stats_sql()):
+                actual[row['dimension']][row['key']] = row['count']
+        except sqlite3.Error as e:
+            print(f"Error recomputing statistics: {e}")
+            return []
+        
+        mismatches = []
+        for dimension in self.STATS_DIMENSIONS:
+            keys = set(stored.get(dimension, {})) | set(actual[dimension])
+            for key in sorted(keys):
+                stored_count = stored.get(dimension, {}).get(key, 0)
+                actual_count = actual[dimension].get(key, 0)
+                if stored_count != actual_count:
+                    mismatches.append((dimension, key, stored_count, actual_count))
+        return mismatches
+    
+    def explain_query_plan(self, sql, params=()) -> list:
+        """Возвращает план выполнения запроса (EXPLAIN QUERY PLAN)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return []
+            
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row['detail'] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error explaining query: {e}")
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+    
+    def create_indexes(self) -> bool:
+        """Приводит индексы к объявленному списку INDEXES (см. IndexAdvisor.apply)"""
+        from indexes import IndexAdvisor
+        
+        return IndexAdvisor(self).apply()
+    
+    @timed
+    def analyze(self) -> bool:
+        """Обновляет статистику планировщика запросов (ANALYZE с ограничением выборки)"""
+        if not self.is_connected():
+            return False
+        try:
+            start_time = time.perf_counter()
+            self.connection.execute(f"PRAGMA analysis_limit = {DatabaseConfig.ANALYSIS_LIMIT}")
+            self.connection.execute("ANALYZE employees")
+            self.connection.commit()
+            print(f"Planner statistics updated in {time.perf_counter() - start_time:.2f} seconds")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error analyzing table: {e}")
+            return False
+    
+    def known_queries(self) -> list:
+        """Запросы всех путей чтения: [(имя, sql, параметры)] - для замеров и анализа индексов"""
+        queries = [
+            ('sorted_listing', self.build_search_query()),
+            ('males_f_surname', (self.MALES_F_SURNAME_QUERY, ())),
+            ('search_prefix', self.build_search_query(surname_prefix='Sm')),
+            ('search_gender_prefix', self.build_search_query(surname_prefix='Sm', gender='Male')),
+            ('search_gender_age', self.build_search_query(gender='Female', age_min=30, age_max=40)),
+            ('search_birth_range', self.build_search_query(born_from='1980-01-01', born_to='1980-12-31')),
+            ('search_prefix_birth', self.build_search_query(surname_prefix='Sm', born_from='1980-01-01')),
+            ('table_count', ("SELECT COUNT(*) AS count FROM employees", ())),
+        ]
+        if self.has_fulltext_index():
+            queries += [
+                ('name_fulltext', self.build_name_query('ohn Al')),
+                ('name_like_scan', self.build_name_query('ohn Al', use_fulltext=False)),
+            ]
+        return [(name, sql, params) for name, (sql, params) in queries]
+    
+    def checkpoint(self, mode='PASSIVE') -> bool:
+        """Переносит изменения из WAL-файла в базу (PRAGMA wal_checkpoint)"""
+        if not self.is_connected():
+            print("Error: No database connection")
+            return False
+            
+        try:
+            busy, log_pages, checkpointed = self.connection.execute(
+                f"PRAGMA wal_checkpoint({mode})"
+            ).fetchone()
+            if busy:
+                print("WAL checkpoint could not complete: database is busy")
+            else:
+                print(f"WAL checkpoint ({mode}): {checkpointed} of {log_pages} pages")
+            return not busy
+        except sqlite3.Error as e:
+            print(f"Error running WAL checkpoint: {e}")
+            return False
+    
+    def count_employees(self) -> int:
+        """Число записей: из статистики (если включена), без полного просмотра таблицы"""
+        if self.has_stats():
+            row = self.connection.execute(
+                "SELECT count FROM employee_stats WHERE dimension = 'total' AND key = ''").fetchone()
+            return row[0] if row else 0
+        return self.connection.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+    
     def get_table_info(self):
         """Получает информацию о таблице"""
         if not self.is_connected():
@@ -216,9 +1211,7 @@ class EmployeeDatabase:
         try:
             cursor = self.connection.cursor()
             
-            # Информация о таблице
-            cursor.execute("SELECT COUNT(*) as count FROM employees")
-            count = cursor.fetchone()[0]
+            count = self.count_employees()
             
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='employees'")
             table_exists = cursor.fetchone() is not None
@@ -233,7 +1226,10 @@ class EmployeeDatabase:
                 cursor.close()
     
     def close(self):
-        """Закрывает соединение с базой данных"""
+        """Возвращает соединение в пул (и сохраняет кэш результатов, если задан файл)"""
         if self.connection:
-            self.connection.close()
+            if self.cache.path:
+                self.cache.save(self.get_change_counter(), self.data_version())
+            self.pool.release(self.connection)
+            self.connection = None
             print("Database connection closed")
\ No newline at end of file
@@ -1,56 +1,150 @@
 from datetime import datetime, date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def age_on(birth_date: str, today: date) -> int:
+    """Полный возраст на дату today для даты рождения в формате YYYY-MM-DD.
+    
+    Дата разбирается срезами фиксированной ширины без strptime; результат
+    кэшируется, так как различных дат рождения немного. При неверном
+    формате возбуждает ValueError.
+    """
+    if len(birth_date) != 10 or birth_date[4] != '-' or birth_date[7] != '-':
+        # Нестандартная запись - разбираем strptime (ValueError при ошибке)
+        parsed = datetime.strptime(birth_date, '%Y-%m-%d').date()
+        year, month, day = parsed.year, parsed.month, parsed.day
+    else:
+        year, month, day = int(birth_date[:4]), int(birth_date[5:7]), int(birth_date[8:])
+    
+    age = today.year - year
+    # Проверяем, был ли уже день рождения в этом году
+    if (today.month, today.day) < (month, day):
+        age -= 1
+    return age
+
+
+def calculate_ages(birth_dates, today=None, memo=None) -> list:
+    """Рассчитывает возраст для столбца дат рождения.
+    
+    today вычисляется один раз, возраст кэшируется по дате рождения в memo
+    (словарь можно передавать между вызовами). Для неверной даты - 0, как
+    в Employee.calculate_age; ошибка печатается один раз на дату.
+    """
+    today = today or date.today()
+    ages = {} if memo is None else memo
+    result = []
+    append = result.append
+    for birth_date in birth_dates:
+        age = ages.get(birth_date)
+        if age is None:
+            try:
+                age = age_on(birth_date, today)
+            except ValueError as e:
+                print(f"Error calculating age: {e}")
+                age = 0
+            ages[birth_date] = age
+        append(age)
+    return result
+
 
 class Employee:
+    # Без __dict__ у каждого экземпляра: заметно меньше памяти на больших выборках
+    __slots__ = ('full_name', 'birth_date', 'gender')
+    
     def __init__(self, full_name: str, birth_date: str, gender: str):
         self.full_name = full_name
         self.birth_date = birth_date
         self.gender = gender
         
-    def calculate_age(self) -> int:
+    def calculate_age(self, today=None) -> int:
         """Рассчитывает полный возраст сотрудника"""
         try:
-            birth_date = datetime.strptime(self.birth_date, '%Y-%m-%d').date()
-            today = date.today()
-            age = today.year - birth_date.year
-            
-            # Проверяем, был ли уже день рождения в этом году
-            if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-                age -= 1
-                
-            return age
+            return age_on(self.birth_date, today or date.today())
         except ValueError as e:
             print(f"Error calculating age: {e}")
             return 0
     
+    def validation_errors(self) -> list:
+        """Возвращает список ошибок валидации (ValidationError) без печати"""
+        from validation import validate_row
+        
+        _, errors = validate_row(self.full_name, self.birth_date, self.gender)
+        return errors
+    
     def validate(self) -> bool:
         """Валидация данных сотрудника"""
-        if not self.full_name or len(self.full_name.strip()) == 0:
-            print("Error: Full name cannot be empty")
-            return False
-            
-        try:
-            datetime.strptime(self.birth_date, '%Y-%m-%d')
-        except ValueError:
-            print("Error: Invalid birth date format. Use YYYY-MM-DD")
-            return False
-            
-        if self.gender.lower() not in ['male', 'female', 'мужской', 'женский']:
-            print("Error: Gender must be 'male' or 'female'")
-            return False
-            
-        return True
+        errors = self.validation_errors()
+        for error in errors:
+            print(f"Error: {error.message}")
+        return not errors
     
     def to_tuple(self):
         """Преобразует сотрудника в кортеж для вставки в БД"""
-        gender = 'Male' if self.gender.lower() in ['male', 'мужской'] else 'Female'
+        from validation import normalize_gender
+        
+        gender = normalize_gender(self.gender) or 'Female'
         return (self.full_name, self.birth_date, gender)
     
     @staticmethod
     def from_db_row(row):
         """Создает объект Employee из строки БД"""
-        birth_date_str = row['birth_date'] if isinstance(row['birth_date'], str) else row['birth_date']
-        return Employee(row['full_name'], birth_date_str, row['gender'])
+        return Employee(row['full_name'], row['birth_date'], row['gender'])
     
     def __str__(self):
         age = self.calculate_age()
-        return f"{self.full_name} | {self.birth_date} | {self.gender} | {age} years"
\ No newline at end of file
+        return f"{self.full_name} | {self.birth_date} | {self.gender} | {age} years"
+
+
+class EmployeeBatch:
+    """Колоночное хранилище сотрудников для больших выборок.
+    
+    Строки раскладываются по столбцам порциями (extend из fetchmany): ФИО и
+    даты - списки строк, пол - bytearray (1 - Male, 0 - Female). Объекты
+    Employee на строку не создаются, только при обращении к строке.
+    Различных дат рождения мало, поэтому одинаковые даты хранятся одной
+    строкой.
+    """
+    __slots__ = ('full_names', 'birth_dates', 'genders', '_dates')
+    
+    def __init__(self):
+        self.full_names = []
+        self.birth_dates = []
+        self.genders = bytearray()
+        self._dates = {}
+    
+    def extend(self, rows):
+        """Добавляет порцию кортежей (full_name, birth_date, gender)"""
+        if not rows:
+            return
+        full_names, birth_dates, genders = zip(*rows)
+        self.full_names.extend(full_names)
+        dates = self._dates
+        self.birth_dates.extend([dates.setdefault(birth_date, birth_date) for birth_date in birth_dates])
+        self.genders.extend(map('Male'.__eq__, genders))
+    
+    @classmethod
+    def from_rows(cls, rows):
+        batch = cls()
+        batch.extend(rows)
+        return batch
+    
+    def __len__(self):
+        return len(self.full_names)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Employee(
+            self.full_names[index],
+            self.birth_dates[index],
+            'Male' if self.genders[index] else 'Female'
+        )
+    
+    def __iter__(self):
+        for full_name, birth_date, is_male in zip(self.full_names, self.birth_dates, self.genders):
+            yield Employee(full_name, birth_date, 'Male' if is_male else 'Female')
+    
+    def ages(self, today=None) -> list:
+        """Возраст всех сотрудников пакета"""
+        return calculate_ages(self.birth_dates, today)
@@ -0,0 +1,131 @@
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+# Генератор, переданный в процесс-воркер при его запуске
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _generate_chunk(spec):
+    return _worker_generator.generate_chunk(spec)
+
+
+class TestDataGenerator:
+    """Генератор тестовых сотрудников, выдающий данные порциями (chunk).
+
+    Каждая порция строится целиком: даты рождения выбираются из заранее
+    рассчитанного списка ISO-строк, ФИО - по индексу из готовых комбинаций
+    имен, пол - из вектора. Каждая порция получает собственный генератор
+    случайных чисел, производный от seed и номера порции, поэтому результат
+    воспроизводим и не зависит от порядка генерации порций.
+    """
+
+    FIRST_NAMES = ['John', 'Michael', 'David', 'James', 'Robert', 'Mary', 'Jennifer', 'Linda', 'Patricia', 'Elizabeth']
+    LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Garcia', 'Rodriguez', 'Wilson']
+    MIDDLE_NAMES = ['Alexander', 'Thomas', 'Charles', 'Christopher', 'Matthew']
+
+    # Специальные записи: мужчины с фамилией на F
+    F_SURNAMES = ['Fisher', 'Fletcher', 'Ford', 'Foster', 'Fox', 'Franklin', 'Frazier', 'Freeman', 'French', 'Fuller']
+    F_MIDDLE_NAMES = ['Andrew', 'Benjamin', 'Daniel', 'Edward', 'George']
+
+    START_DATE = date(1950, 1, 1)
+    END_DATE = date(2005, 12, 31)
+
+    def __init__(self, record_count=1000000, f_surname_count=100, seed=None,
+                 chunk_size=50000, start_date=None, end_date=None, male_ratio=None,
+                 first_names=None, last_names=None, middle_names=None,
+                 f_surnames=None, f_middle_names=None):
+        self.record_count = record_count
+        self.f_surname_count = f_surname_count
+        # Без явного seed выбираем случайный, чтобы прогон можно было повторить
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.chunk_size = chunk_size
+        # None - чередование Male/Female, иначе доля мужчин (0.0 - 1.0)
+        self.male_ratio = male_ratio
+
+        first_names = first_names or self.FIRST_NAMES
+        f_middle_names = f_middle_names or self.F_MIDDLE_NAMES
+
+        # Все комбинации ФИО: равномерный выбор комбинации эквивалентен
+        # независимому выбору фамилии, имени и отчества
+        self.name_pool = self._build_name_pool(
+            last_names or self.LAST_NAMES, first_names, middle_names or self.MIDDLE_NAMES
+        )
+        self.f_name_pool = self._build_name_pool(
+            f_surnames or self.F_SURNAMES, first_names, f_middle_names
+        )
+
+        # Смещение в днях -> дата в формате ISO
+        start_date = start_date or self.START_DATE
+        end_date = end_date or self.END_DATE
+        days = (end_date - start_date).days + 1
+        self.date_pool = [(start_date + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    @staticmethod
+    def _build_name_pool(last_names, first_names, middle_names):
+        return [f"{last} {first} {middle}"
+                for last in last_names for first in first_names for middle in middle_names]
+
+    @property
+    def total_count(self):
+        return self.record_count + self.f_surname_count
+
+    def chunk_specs(self):
+        """Возвращает план порций: (номер, первая строка, количество, специальная ли порция)"""
+        specs = []
+        for count, special in ((self.record_count, False), (self.f_surname_count, True)):
+            for start in range(0, count, self.chunk_size):
+                specs.append((len(specs), start, min(self.chunk_size, count - start), special))
+        return specs
+
+    def generate_chunk(self, spec) -> list:
+        """Строит одну порцию кортежей (full_name, birth_date, gender)"""
+        index, start, count, special = spec
+        rng = random.Random(f"{self.seed}:{index}")
+
+        names = rng.choices(self.f_name_pool if special else self.name_pool, k=count)
+        dates = rng.choices(self.date_pool, k=count)
+
+        if special:
+            genders = ['Male'] * count
+        elif self.male_ratio is None:
+            # Равномерное чередование пола по сквозному номеру строки
+            pattern = ['Male', 'Female'] if start % 2 == 0 else ['Female', 'Male']
+            genders = (pattern * (count // 2 + 1))[:count]
+        else:
+            genders = ['Male' if value < self.male_ratio else 'Female'
+                       for value in (rng.random() for _ in range(count))]
+
+        return list(zip(names, dates, genders))
+
+    def iter_chunks(self):
+        """Последовательно отдает все порции тестовых данных"""
+        for spec in self.chunk_specs():
+            yield self.generate_chunk(spec)
+
+    def iter_chunks_parallel(self, workers=None, queue_size=None):
+        """Генерирует порции в пуле процессов и отдает их в исходном порядке.
+
+        Одновременно в работе находится не более queue_size порций, поэтому
+        потребитель (единственный писатель в БД) вставляет очередную порцию,
+        пока воркеры строят следующие. Так как у каждой порции свой seed,
+        результат не зависит от числа воркеров.
+        """
+        workers = workers or os.cpu_count() or 1
+        queue_size = queue_size or workers * 2
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            pending = deque()
+            for spec in self.chunk_specs():
+                if len(pending) >= queue_size:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(_generate_chunk, spec))
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,232 @@
+import random
+import re
+import sqlite3
+import time
+
+_USING_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+# Столбец-выражение индекса: PRAGMA index_info отдает для него name = NULL
+# (например, substr(full_name, 1, 1) в idx_gender_surname старых баз)
+EXPRESSION = '<expr>'
+
+
+class IndexAdvisor:
+    """Управление индексами таблицы employees.
+
+    Нужные индексы объявлены в EmployeeDatabase.INDEXES. Advisor сравнивает
+    их с фактическими индексами (PRAGMA index_list/index_info), находит
+    избыточные (столбцы индекса - префикс другого индекса) и неиспользуемые
+    (не встречаются в EXPLAIN QUERY PLAN известных запросов), отмечает
+    пересечения с индексами ограничений UNIQUE, которые нельзя удалить
+    (столбцы ограничения - префикс объявленного индекса), оценивает
+    размер (dbstat) и стоимость записи каждого индекса. apply() создает
+    недостающие индексы, удаляет лишние и обновляет статистику ANALYZE.
+    """
+
+    def __init__(self, db, sample_size=20000, seed=0):
+        self.db = db
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def existing_indexes(self) -> dict:
+        """{имя: {'columns': (...), 'unique': bool, 'origin': 'c'|'u'|'pk'}}; выражения - EXPRESSION"""
+        indexes = {}
+        for row in self.db.connection.execute("PRAGMA index_list(employees)").fetchall():
+            columns = tuple(info['name'] or EXPRESSION for info in
+                            self.db.connection.execute(f"PRAGMA index_info({row['name']})").fetchall())
+            indexes[row['name']] = {'columns': columns, 'unique': bool(row['unique']), 'origin': row['origin']}
+        return indexes
+
+    @staticmethod
+    def redundant_with(name, indexes):
+        """Индекс, который делает name избыточным (столбцы name - его префикс), или None"""
+        index = indexes[name]
+        # Выражения не сравниваются между собой: индекс с выражением не считается избыточным
+        if index['unique'] or EXPRESSION in index['columns']:
+            return None
+        columns = index['columns']
+        for other_name, other in indexes.items():
+            if other_name == name or other['columns'][:len(columns)] != columns:
+                continue
+            # Из двух индексов с одинаковыми столбцами остается уникальный или первый по имени
+            if other['columns'] == columns and not other['unique'] and other_name > name:
+                continue
+            return other_name
+        return None
+
+    @staticmethod
+    def overlaps_with(name, indexes):
+        """Индексы, пересекающиеся с name через индекс ограничения.
+
+        Для индекса CREATE INDEX - индексы ограничений, столбцы которых -
+        строгий префикс его столбцов; для индекса ограничения - индексы,
+        расширяющие его столбцы. Такой индекс не избыточен (ограничение
+        не удалить, а расширенный индекс покрывает запросы), но хранит
+        те же ключи второй раз.
+        """
+        index = indexes[name]
+        if EXPRESSION in index['columns']:
+            return []
+        overlaps = []
+        for other_name, other in indexes.items():
+            # Пара: один индекс ограничения и один CREATE INDEX
+            if other_name == name or EXPRESSION in other['columns']:
+                continue
+            if (index['origin'] == 'c') == (other['origin'] == 'c'):
+                continue
+            constraint, extended = (other, index) if index['origin'] == 'c' else (index, other)
+            columns = constraint['columns']
+            if len(columns) < len(extended['columns']) and extended['columns'][:len(columns)] == columns:
+                overlaps.append(other_name)
+        return sorted(overlaps)
+
+    def index_usage(self) -> dict:
+        """{имя индекса: [имена запросов, в плане которых он используется]}"""
+        usage = {}
+        for query_name, sql, params in self.db.known_queries():
+            for detail in self.db.explain_query_plan(sql, params):
+                for index_name in _USING_INDEX_RE.findall(detail):
+                    usage.setdefault(index_name, []).append(query_name)
+        return usage
+
+    def index_sizes(self) -> dict:
+        """Размер индексов в байтах (пустой словарь, если SQLite собран без dbstat)"""
+        try:
+            return {row[0]: row[1] for row in self.db.connection.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")}
+        except sqlite3.Error:
+            return {}
+
+    def _time_insert(self, cursor, rows):
+        cursor.execute("DELETE FROM index_cost")
+        start = time.perf_counter()
+        cursor.executemany("INSERT INTO index_cost (full_name, birth_date, gender) VALUES (?, ?, ?)", rows)
+        return time.perf_counter() - start
+
+    def write_costs(self, indexes, repeat=3) -> dict:
+        """Стоимость записи индексов, мкс на вставленную строку.
+
+        Выборка строк таблицы вставляется в случайном порядке во временную
+        таблицу без индексов и с каждым индексом по отдельности; стоимость -
+        разница лучших из repeat времен. Оценка относительная: временная
+        таблица находится в памяти (temp_store) и меньше основной. Индексы
+        с выражениями пропускаются: по столбцам их нельзя воссоздать.
+        """
+        rows = [tuple(row) for row in self.db.connection.execute(
+            "SELECT full_name, birth_date, gender FROM employees LIMIT ?", (self.sample_size,))]
+        if not rows:
+            return {}
+        random.Random(self.seed).shuffle(rows)
+
+        costs = {}
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute("DROP TABLE IF EXISTS temp.index_cost")
+            cursor.execute("""
+                CREATE TEMP TABLE index_cost (
+                    id INTEGER PRIMARY KEY,
+                    full_name TEXT NOT NULL,
+                    birth_date TEXT NOT NULL,
+                    gender TEXT NOT NULL
+                )
+            """)
+            baseline = min(self._time_insert(cursor, rows) for _ in range(repeat))
+            for name, index in indexes.items():
+                if EXPRESSION in index['columns']:
+                    continue
+                unique = 'UNIQUE ' if index['unique'] else ''
+                cursor.execute(f"CREATE {unique}INDEX temp.index_cost_idx ON index_cost ({', '.join(index['columns'])})")
+                elapsed = min(self._time_insert(cursor, rows) for _ in range(repeat))
+                cursor.execute("DROP INDEX temp.index_cost_idx")
+                costs[name] = max(elapsed - baseline, 0.0) / len(rows) * 1e6
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS temp.index_cost")
+            self.db.connection.commit()
+            cursor.close()
+        return costs
+
+    def status(self, measure=True) -> list:
+        """Состояние объявленных и фактических индексов"""
+        wanted = self.db.INDEXES
+        existing = self.existing_indexes()
+        usage = self.index_usage()
+        sizes = self.index_sizes() if measure else {}
+
+        report = []
+        for name in sorted(set(existing) | set(wanted)):
+            if name in existing:
+                index = existing[name]
+                redundant = self.redundant_with(name, existing)
+                overlaps = self.overlaps_with(name, existing)
+                if name not in wanted and index['origin'] == 'c':
+                    state = 'redundant' if redundant else 'extra'
+                elif redundant:
+                    state = 'redundant'
+                elif not usage.get(name):
+                    # Индекс ограничения UNIQUE нужен для проверки уникальности, даже если не используется в запросах
+                    state = 'unused' if index['origin'] == 'c' else 'constraint'
+                else:
+                    state = 'ok'
+            else:
+                index = {'columns': wanted[name], 'unique': False, 'origin': 'c'}
+                redundant = None
+                overlaps = []
+                state = 'missing'
+            report.append({
+                'name': name,
+                'columns': index['columns'],
+                'unique': index['unique'],
+                'declared': name in wanted or index['origin'] != 'c',
+                'constraint': index['origin'] != 'c',
+                'state': state,
+                'redundant_with': redundant,
+                'overlaps_with': overlaps,
+                'used_by': usage.get(name, []),
+                'size': sizes.get(name),
+                'write_cost_us': None,
+            })
+
+        if measure:
+            costs = self.write_costs({item['name']: item for item in report})
+            for item in report:
+                item['write_cost_us'] = costs.get(item['name'])
+        return report
+
+    def apply(self) -> bool:
+        """Приводит индексы к объявленному списку и обновляет статистику планировщика"""
+        if not self.db.is_connected():
+            print("Error: No database connection")
+            return False
+
+        cursor = None
+        try:
+            cursor = self.db.connection.cursor()
+            # Одна транзакция: DROP/CREATE INDEX иначе фиксируются по одному,
+            # и при ошибке схема осталась бы изменена наполовину
+            if not self.db.connection.in_transaction:
+                cursor.execute("BEGIN")
+            existing = self.existing_indexes()
+
+            # Удаляются только созданные CREATE INDEX индексы, которых нет в списке
+            for name, index in existing.items():
+                if index['origin'] == 'c' and name not in self.db.INDEXES:
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                    print(f"Dropped index: {name} ({', '.join(index['columns'])})")
+
+            for name, columns in self.db.INDEXES.items():
+                if name not in existing:
+                    start_time = time.perf_counter()
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON employees ({', '.join(columns)})")
+                    print(f"Created index: {name} ({', '.join(columns)}) "
+                          f"in {time.perf_counter() - start_time:.2f} seconds")
+            self.db.connection.commit()
+
+            self.db.analyze()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error applying indexes: {e}")
+            self.db.connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
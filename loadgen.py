@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+
+from benchmark import _summary
+from config import DatabaseConfig
+
+
+class LoadGenerator:
+    """Генератор нагрузки для сервиса service.py.
+
+    concurrency клиентов с постоянными (keep-alive) соединениями по очереди
+    запрашивают пути из paths, пока не будет выполнено requests запросов.
+    Замеряются запросы в секунду и перцентили задержки (от отправки запроса
+    до чтения последнего байта ответа).
+    """
+
+    def __init__(self, paths, requests=1000, concurrency=10, host=None, port=None, socket_path=None):
+        self.paths = paths
+        self.requests = requests
+        self.concurrency = concurrency
+        self.host = host or DatabaseConfig.SERVICE_HOST
+        self.port = port or DatabaseConfig.SERVICE_PORT
+        self.socket_path = socket_path
+
+    async def _connect(self):
+        if self.socket_path:
+            return await asyncio.open_unix_connection(self.socket_path)
+        return await asyncio.open_connection(self.host, self.port)
+
+    @staticmethod
+    async def _read_response(reader):
+        """Читает ответ целиком: возвращает код статуса и размер тела"""
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode('latin-1').split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            size = 0
+            while True:
+                chunk_size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+                await reader.readexactly(chunk_size + 2)
+                if chunk_size == 0:
+                    break
+                size += chunk_size
+            return status, size
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, len(body)
+
+    async def _client(self, counter, latencies, stats):
+        reader, writer = await self._connect()
+        try:
+            while counter[0] < self.requests:
+                index = counter[0]
+                counter[0] += 1
+                path = self.paths[index % len(self.paths)]
+                start = time.perf_counter()
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode('latin-1'))
+                await writer.drain()
+                status, size = await self._read_response(reader)
+                latencies.append(time.perf_counter() - start)
+                stats['bytes'] += size
+                if status != 200:
+                    stats['errors'] += 1
+        finally:
+            writer.close()
+
+    async def _run(self):
+        counter = [0]
+        latencies = []
+        stats = {'errors': 0, 'bytes': 0}
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client(counter, latencies, stats) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+        return {
+            'paths': self.paths,
+            'concurrency': self.concurrency,
+            'requests': len(latencies),
+            'errors': stats['errors'],
+            'bytes': stats['bytes'],
+            'elapsed': elapsed,
+            'requests_per_sec': len(latencies) / elapsed if elapsed > 0 else 0.0,
+            'latency': _summary(latencies) if latencies else None,
+        }
+
+    def run(self) -> dict:
+        try:
+            report = asyncio.run(self._run())
+        except (OSError, asyncio.IncompleteReadError) as e:
+            print(f"Error connecting to service: {e}")
+            return {}
+
+        print(f"Completed {report['requests']:,} requests in {report['elapsed']:.2f} seconds "
+              f"({report['requests_per_sec']:,.0f} requests/sec), errors: {report['errors']}")
+        if report['latency']:
+            latency = report['latency']
+            print(f"Latency p50={latency['p50'] * 1000:.2f}ms p95={latency['p95'] * 1000:.2f}ms "
+                  f"p99={latency['p99'] * 1000:.2f}ms max={latency['max'] * 1000:.2f}ms")
+        return report
+
+    @staticmethod
+    def save(report, output_path):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Load test results saved to {output_path}")
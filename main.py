@@ -1,17 +1,47 @@
+import os
 import sys
-import random
-from datetime import datetime, timedelta
-from database import EmployeeDatabase
-from employee import Employee
-from config import DatabaseConfig
+import time
+
+# Модули работы с БД (database, config, metrics, validation, cache)
+# импортируются внутри режимов: справка и режимы без БД их не загружают
 
 class EmployeeManager:
     def __init__(self):
-        self.db = EmployeeDatabase()
+        self._db = None
+    
+    @property
+    def db(self):
+        """Соединение режима; открывается при первом обращении"""
+        if self._db is None:
+            self._db = self.open_database()
+        return self._db
+    
+    @db.setter
+    def db(self, value):
+        self._db = value
+    
+    def close_database(self):
+        """Закрывает соединение режима, если оно было открыто"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    @staticmethod
+    def open_database():
+        """EmployeeDatabase или ее копия в памяти (--snapshot yes, только чтение)"""
+        from config import DatabaseConfig
+        
+        if DatabaseConfig.SNAPSHOT:
+            from snapshot import SnapshotDatabase
+            return SnapshotDatabase()
+        from database import EmployeeDatabase
+        return EmployeeDatabase()
     
     def check_database_connection(self):
         """Проверяет подключение к базе данных"""
-        if not self.db.is_connected():
+        from config import DatabaseConfig
+        
+        if not self.db.ping():
             print("\n" + "="*60)
             print("DATABASE CONNECTION ERROR")
             print("="*60)
@@ -20,13 +50,15 @@ class EmployeeManager:
             print("\nTesting connection...")
             if DatabaseConfig.test_connection():
                 print("Connection test successful! Reinitializing...")
-                self.db = EmployeeDatabase()
+                self.db.close()
+                self.db = self.open_database()
                 return self.db.is_connected()
             else:
                 return False
         return True
     
-    def show_help(self):
+    @staticmethod
+    def show_help():
         """Показывает справку по использованию программы"""
         help_text = """
 Employee Management System (SQLite Version)
@@ -37,19 +69,93 @@ Usage:
 Modes:
     1 - Create employees table
     2 - Add new employee: python main.py 2 "Full Name" "YYYY-MM-DD" "Gender"
+        Batch from stdin (CSV lines, one transaction): python main.py 2 - [--upsert yes|no] [--probe yes|no]
     3 - Show all employees sorted by name
+        Options: --limit N, --offset N, --after "Full Name[|YYYY-MM-DD]"
     4 - Generate test data (1,000,000 + 100 special records)
+        Options: --count N, --f-count N, --seed N, --chunk-size N, --male-ratio X,
+                 --workers N (parallel generation processes), --dedup yes|no,
+                 --drop-indexes yes|no (default: keep indexes in WAL mode for concurrent readers)
     5 - Search males with 'F' surname (with timing)
-    6 - Optimize database indexes
+    6 - Optimize database indexes (create declared indexes, drop extra ones, ANALYZE)
+    search - Search employees by surname prefix, gender, birth date and age
+        Options: --prefix X, --gender Male|Female, --born-from YYYY-MM-DD,
+                 --born-to YYYY-MM-DD, --age-min N, --age-max N, --limit N
+    fts - Build full-text (FTS5 trigram) index on employee names
+    name - Search by any part of the name: python main.py name "query" [--limit N]
+    import - Import employees from CSV/JSONL: python main.py import FILE
+        Options: --format csv|jsonl, --rejects FILE, --chunk-size N, --drop-indexes yes|no,
+                 --upsert yes|no (update gender of existing employees)
+    export - Export employees to CSV/JSONL: python main.py export FILE
+        Options: --format csv|jsonl, --order id|name
+    compact - Normalized compact schema: python main.py compact migrate|compare
+        Options: --target FILE, --without-rowid yes|no
+    bench - Benchmark all queries (warm-up, repetitions, p50/p95/p99, JSON report)
+        Options: --sizes 10000,100000,1000000, --repeat N, --warmup N,
+                 --output FILE, --data-dir DIR, --optimize yes|no
+    stats - Show precomputed statistics: python main.py stats [check|rebuild]
+        Options: --age-bucket N
+    analytics - Distributions computed with NumPy over the whole table (requires numpy):
+            python main.py analytics [age|months|initials|all]
+        Options: --age-bucket N, --chunk-size N, --output FILE
+    serve - Run HTTP/JSON service: /employees, /males-f, /search, /name, /stats, /metrics
+        Options: --host HOST, --port N, --socket PATH, --workers N, --page-size N
+    loadgen - Load test a running service (requests/sec, latency percentiles)
+        Options: --paths /males-f,/stats, --requests N, --concurrency N,
+                 --host HOST, --port N, --socket PATH, --output FILE
+    index - Index status (size, write cost, usage in query plans) or apply declared list:
+            python main.py index status|apply
+        Options: --sample N (rows for write cost), --measure yes|no
+    shard - Sharded layout (N database files): python main.py shard load|info|males|list|bench
+        Options: --shards N, --partition hash|initial, --dir DIR, --workers N, --count N, --seed N,
+                 --limit N (list), --sizes N,N and --shards N,N (bench), --repeat N, --output FILE
+    snapshot - Compare the in-memory snapshot with the disk-backed path (startup, query latency
+               and latency with N concurrent reader threads)
+        Options: --repeat N, --threads N,N, --output FILE
+    startup - Measure CLI startup time and import costs (python -X importtime)
+        Options: --command "MODE ARGS", --repeat N
     help - Show this help message
 
+Global options (any mode):
+    --profile cpu|memory|all   Profile the mode with cProfile/tracemalloc (env EMPLOYEE_PROFILE)
+    --profile-output FILE      Save cProfile statistics (.prof) to FILE
+    --metrics-output FILE      Save counters and latency histograms on exit, JSON or
+                               Prometheus text for .prom/.txt (env EMPLOYEE_METRICS)
+    --slow-sql SECONDS         Log statements running longer than SECONDS to stderr (env EMPLOYEE_SLOW_SQL)
+    --snapshot yes|no          Serve reads from an in-memory copy of the database, reloaded when
+                               the file changes (read-only, env EMPLOYEE_SNAPSHOT)
+
 Examples:
     python main.py 1
     python main.py 2 "Ivanov Petr Sergeevich" "1990-05-15" "Male"
+    python main.py 2 - < employees.csv
     python main.py 3
+    python main.py 3 --limit 50 --after "Smith John Alexander|1990-05-15"
     python main.py 4
+    python main.py 4 --count 100000 --seed 42
     python main.py 5
     python main.py 6
+    python main.py search --prefix Sm --gender male --age-min 30 --age-max 40 --limit 20
+    python main.py fts
+    python main.py name "ohn Alex" --limit 20
+    python main.py import employees.csv --rejects rejected.csv
+    python main.py export employees.jsonl --order name
+    python main.py compact migrate
+    python main.py compact compare
+    python main.py index status
+    python main.py stats
+    python main.py stats check
+    python main.py analytics age --age-bucket 5
+    python main.py bench --sizes 10000,100000 --repeat 10 --output bench.json
+    python main.py serve --port 8080 --workers 4
+    python main.py loadgen --paths /males-f,/stats --requests 10000 --concurrency 50
+    python main.py shard load --count 1000000 --shards 4
+    python main.py shard list --shards 4 --limit 100
+    python main.py shard bench --sizes 1000000,10000000 --shards 1,2,4 --output shard_bench.json
+    python main.py snapshot --repeat 20 --threads 1,4,8 --output snapshot.json
+    python main.py serve --snapshot yes
+    python main.py 5 --profile cpu --profile-output mode5.prof
+    python main.py 4 --count 100000 --metrics-output metrics.prom --slow-sql 0.5
 
 Interactive mode:
     Run without arguments to use interactive menu
@@ -73,143 +179,240 @@ Note: Uses SQLite database (employees.db) - no server setup required!
     
     def run_mode_2(self, args):
         """Режим 2: Добавление сотрудника"""
+        from employee import Employee
+        from validation import normalize_gender
+        
         if not self.check_database_connection():
             return
+        
+        if args and args[0] == '-':
+            self.run_mode_2_batch(args[1:])
+            return
             
         if len(args) < 3:
             print("Error: Insufficient arguments for mode 2")
             print("Usage: python main.py 2 \"Full Name\" \"YYYY-MM-DD\" \"Gender\"")
             return
         
-        full_name = args[0]
-        birth_date = args[1]
-        gender = args[2]
+        # Сокращения пола (m/f, муж/жен) принимает только ввод режима 2;
+        # остальная проверка записи выполняется в insert_employee
+        gender = normalize_gender(args[2], abbreviations=True)
+        if gender is None:
+            print("Error: Gender must be 'Male' or 'Female'")
+            return
         
-        # Нормализация пола
-        if gender.lower() in ['m', 'male', 'муж', 'мужской']:
-            gender = 'Male'
-        elif gender.lower() in ['f', 'female', 'жен', 'женский']:
-            gender = 'Female'
+        employee = Employee(args[0], args[1], gender)
+        if self.db.insert_employee(employee):
+            print("Employee added successfully!")
         else:
-            print("Error: Gender must be 'Male' or 'Female'")
+            print("Failed to add employee!")
+    
+    def run_mode_2_batch(self, args):
+        """Режим 2 с "-": добавление сотрудников из stdin одной транзакцией.
+        
+        Каждая строка stdin - CSV: "Full Name",YYYY-MM-DD,Gender
+        (строка заголовка full_name,birth_date,gender пропускается).
+        """
+        import csv
+        from validation import normalize_gender
+        
+        options = self.parse_options(args, ['upsert', 'probe'])
+        if options is None:
             return
         
-        employee = Employee(full_name, birth_date, gender)
+        # Как и в режиме 2 с аргументами, пол можно указать сокращением (m/f, муж/жен)
+        rows = [(record[0], record[1], normalize_gender(record[2], abbreviations=True) or record[2])
+                if len(record) == 3 else None
+                for record in csv.reader(sys.stdin) if record and record[0] != 'full_name']
+        if not rows:
+            print("No employees read from stdin")
+            return
         
-        if employee.validate():
-            if self.db.insert_employee(employee):
-                print("Employee added successfully!")
-            else:
-                print("Failed to add employee!")
+        stats = {}
+        if self.db.bulk_insert_employees(
+            rows,
+            upsert=options.get('upsert', 'no').lower() in ['yes', 'true', '1'],
+            probe=options.get('probe', 'no').lower() in ['yes', 'true', '1'],
+            stats=stats,
+        ):
+            print(f"Read {len(rows)} employees: inserted {stats['inserted']}, updated {stats['updated']}, "
+                  f"duplicates {stats['duplicates']}, rejected {stats['rejected']}")
         else:
-            print("Invalid employee data!")
+            print("Failed to add employees!")
     
-    def run_mode_3(self):
+    def parse_options(self, args, allowed):
+        """Разбирает опции вида --name value из аргументов командной строки"""
+        options = {}
+        i = 0
+        while i < len(args):
+            name = args[i]
+            if not name.startswith('--') or name[2:] not in allowed:
+                print(f"Error: Unknown option '{name}'")
+                return None
+            if i + 1 >= len(args):
+                print(f"Error: Option '{name}' requires a value")
+                return None
+            options[name[2:]] = args[i + 1]
+            i += 2
+        return options
+    
+    def run_mode_3(self, args=None):
         """Режим 3: Показать всех сотрудников"""
+        from config import DatabaseConfig
+        
         if not self.check_database_connection():
             return
+        
+        options = self.parse_options(args or [], ['limit', 'offset', 'after'])
+        if options is None:
+            return
+        
+        try:
+            limit = int(options['limit']) if 'limit' in options else None
+            offset = int(options.get('offset', 0))
+        except ValueError:
+            print("Error: --limit and --offset must be integers")
+            return
+        
+        # --after "Full Name" или --after "Full Name|YYYY-MM-DD"
+        after = options.get('after')
+        if after and '|' in after:
+            after = tuple(after.split('|', 1))
             
         print("Fetching all employees...")
-        employees = self.db.get_all_employees_sorted()
+        # Полный список не кэшируется: результат неограничен и читается один раз
+        employees = self.db.iter_employees_sorted(limit=limit, offset=offset, after=after,
+                                                  use_cache=limit is not None)
+        
+        with self.db.temporary_pragmas(DatabaseConfig.LISTING_PRAGMAS):
+            total = self.print_employee_listing(employees)
         
-        if not employees:
+        if total == 0:
             print("No employees found!")
             return
         
-        print("\n{:<40} {:<12} {:<8} {:<8}".format(
-            "Full Name", "Birth Date", "Gender", "Age"
-        ))
-        print("-" * 80)
+        print(f"\nTotal employees: {total}")
+        self.print_cache_metrics()
+    
+    @staticmethod
+    def print_employee_listing(employees) -> int:
+        """Печатает таблицу сотрудников с возрастом; возвращает число строк.
         
-        for emp in employees:
-            age = emp.calculate_age()
-            print("{:<40} {:<12} {:<8} {:<8}".format(
-                emp.full_name, emp.birth_date, emp.gender, age
-            ))
+        Возраст считается столбцом для каждой пачки строк (calculate_ages:
+        дата вычисляется один раз, возраст кэшируется по дате рождения).
+        Строки записываются в stdout пачками вместо print на каждую строку.
+        """
+        from datetime import date
+        from config import DatabaseConfig
+        from employee import calculate_ages
+        
+        today = date.today()
+        memo = {}
+        total = 0
+        line_format = "{:<40} {:<12} {:<8} {:<8}".format
+        write = sys.stdout.write
         
-        print(f"\nTotal employees: {len(employees)}")
+        def flush(pending):
+            ages = calculate_ages([emp.birth_date for emp in pending], today, memo)
+            lines = [line_format(emp.full_name, emp.birth_date, emp.gender, age)
+                     for emp, age in zip(pending, ages)]
+            lines.append('')
+            write('\n'.join(lines))
+        
+        pending = []
+        for emp in employees:
+            if total == 0:
+                print("\n" + line_format("Full Name", "Birth Date", "Gender", "Age"))
+                print("-" * 80)
+            
+            pending.append(emp)
+            total += 1
+            if len(pending) >= DatabaseConfig.OUTPUT_BUFFER_LINES:
+                flush(pending)
+                pending = []
+        if pending:
+            flush(pending)
+        return total
     
-    def run_mode_4(self):
+    def run_mode_4(self, args=None):
         """Режим 4: Генерация тестовых данных"""
+        from config import DatabaseConfig
+        from generator import TestDataGenerator
+        
         if not self.check_database_connection():
             return
-            
-        print("Generating test data...")
-        print("Note: This may take a while for 1,000,000 records...")
-        
-        # Списки для генерации имен
-        first_names = ['John', 'Michael', 'David', 'James', 'Robert', 'Mary', 'Jennifer', 'Linda', 'Patricia', 'Elizabeth']
-        last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Garcia', 'Rodriguez', 'Wilson']
         
-        employees = []
-        
-        # Генерируем 1,000,000 записей (для теста можно уменьшить количество)
-        record_count = 1000000
-        print(f"Generating {record_count:,} random employees...")
+        options = self.parse_options(args or [], ['count', 'f-count', 'seed', 'chunk-size', 'male-ratio', 'workers',
+                                                  'dedup', 'drop-indexes'])
+        if options is None:
+            return
         
-        for i in range(record_count):
-            first_name = random.choice(first_names)
-            last_name = random.choice(last_names)
-            middle_name = random.choice(['Alexander', 'Thomas', 'Charles', 'Christopher', 'Matthew'])
-            
-            full_name = f"{last_name} {first_name} {middle_name}"
-            
-            # Случайная дата рождения от 1950 до 2005
-            start_date = datetime(1950, 1, 1)
-            end_date = datetime(2005, 12, 31)
-            random_date = start_date + timedelta(
-                seconds=random.randint(0, int((end_date - start_date).total_seconds()))
-            )
-            birth_date = random_date.strftime('%Y-%m-%d')
-            
-            # Равномерное распределение пола
-            gender = 'Male' if i % 2 == 0 else 'Female'
-            
-            employees.append(Employee(full_name, birth_date, gender))
-            
-            # Прогресс
-            if (i + 1) % 100000 == 0:
-                print(f"Generated {i + 1:,} employees...")
-        
-        # Добавляем 100 мужчин с фамилией на F
-        print("Generating 100 male employees with 'F' surname...")
-        f_surnames = ['Fisher', 'Fletcher', 'Ford', 'Foster', 'Fox', 'Franklin', 'Frazier', 'Freeman', 'French', 'Fuller']
-        
-        for i in range(100):
-            first_name = random.choice(first_names)
-            last_name = random.choice(f_surnames)
-            middle_name = random.choice(['Andrew', 'Benjamin', 'Daniel', 'Edward', 'George'])
-            
-            full_name = f"{last_name} {first_name} {middle_name}"
-            
-            start_date = datetime(1950, 1, 1)
-            end_date = datetime(2005, 12, 31)
-            random_date = start_date + timedelta(
-                seconds=random.randint(0, int((end_date - start_date).total_seconds()))
+        try:
+            generator = TestDataGenerator(
+                record_count=int(options.get('count', 1000000)),
+                f_surname_count=int(options.get('f-count', 100)),
+                seed=int(options['seed']) if 'seed' in options else None,
+                chunk_size=int(options.get('chunk-size', DatabaseConfig.BULK_CHUNK_SIZE)),
+                male_ratio=float(options['male-ratio']) if 'male-ratio' in options else None,
             )
-            birth_date = random_date.strftime('%Y-%m-%d')
+            workers = int(options.get('workers', 1))
+        except ValueError:
+            print("Error: Invalid numeric option for mode 4")
+            return
             
-            employees.append(Employee(full_name, birth_date, 'Male'))
+        print("Generating test data...")
+        print(f"Generating {generator.record_count:,} random employees "
+              f"+ {generator.f_surname_count:,} males with 'F' surname (seed {generator.seed})...")
+        
+        # Генерация и вставка идут потоком, порциями по chunk_size строк.
+        # С --workers N порции строятся в N процессах, пока основной поток пишет в БД
+        if workers > 1:
+            print(f"Using {workers} generator processes")
+            chunks = generator.iter_chunks_parallel(workers=workers)
+        else:
+            chunks = generator.iter_chunks()
+        
+        # Повторы (ФИО, дата) в синтетических данных отбрасываются в памяти,
+        # до вставки, без обращения к индексу UNIQUE
+        dedup = options.get('dedup', 'yes').lower() in ['yes', 'true', '1']
+        # Без --drop-indexes - DatabaseConfig.BULK_DROP_INDEXES (в WAL индексы остаются для читателей)
+        drop_indexes = None
+        if 'drop-indexes' in options:
+            drop_indexes = options['drop-indexes'].lower() in ['yes', 'true', '1']
         
-        # Пакетная вставка
         print("Inserting data into database...")
-        if self.db.bulk_insert_employees(employees):
+        if self.db.bulk_load_chunks(chunks, dedup=dedup, drop_indexes=drop_indexes):
             print("Test data generated successfully!")
             self.db.get_table_info()
         else:
             print("Failed to generate test data!")
     
+    def print_query_plan(self, sql, params=()):
+        """Печатает план выполнения запроса"""
+        print("Query plan:")
+        for detail in self.db.explain_query_plan(sql, params):
+            print(f"  {detail}")
+    
+    def print_cache_metrics(self):
+        """Печатает статистику кэша результатов запросов"""
+        metrics = self.db.cache.metrics()
+        if metrics['max_bytes'] > 0:
+            print(f"Query cache: {metrics['hits']} hits, {metrics['misses']} misses, "
+                  f"{metrics['entries']} entries, {metrics['bytes'] / 1048576:.1f} MB")
+    
     def run_mode_5(self):
         """Режим 5: Поиск мужчин с фамилией на F с замером времени"""
         if not self.check_database_connection():
             return
             
         print("Searching for males with 'F' surname...")
+        self.print_query_plan(self.db.MALES_F_SURNAME_QUERY)
         
         employees, execution_time = self.db.get_males_with_f_surname()
         
         print(f"\nSearch executed in {execution_time:.4f} seconds")
         print(f"Found {len(employees)} employees")
+        self.print_cache_metrics()
         
         # Показываем первые 10 результатов
         if employees:
@@ -229,14 +432,16 @@ Note: Uses SQLite database (employees.db) - no server setup required!
         
         # Сначала замеряем производительность до оптимизации
         print("\nPerformance before optimization:")
-        employees, time_before = self.db.get_males_with_f_surname()
+        self.print_query_plan(self.db.MALES_F_SURNAME_QUERY)
+        employees, time_before = self.db.get_males_with_f_surname(use_cache=False)
         print(f"Search time: {time_before:.4f} seconds")
         print(f"Records found: {len(employees)}")
         
         # Создаем индексы
         if self.db.create_indexes():
             print("\nPerformance after optimization:")
-            employees, time_after = self.db.get_males_with_f_surname()
+            self.print_query_plan(self.db.MALES_F_SURNAME_QUERY)
+            employees, time_after = self.db.get_males_with_f_surname(use_cache=False)
             print(f"Search time: {time_after:.4f} seconds")
             print(f"Records found: {len(employees)}")
             
@@ -246,6 +451,669 @@ Note: Uses SQLite database (employees.db) - no server setup required!
         else:
             print("Failed to optimize database!")
     
+    def run_search_mode(self, args):
+        """Режим search: поиск по префиксу фамилии, полу, датам рождения и возрасту"""
+        from validation import normalize_gender
+        
+        if not self.check_database_connection():
+            return
+        
+        options = self.parse_options(args, ['prefix', 'gender', 'born-from', 'born-to',
+                                            'age-min', 'age-max', 'limit'])
+        if options is None:
+            return
+        
+        gender = options.get('gender')
+        if gender:
+            gender = normalize_gender(gender, abbreviations=True)
+            if gender is None:
+                print("Error: Gender must be 'Male' or 'Female'")
+                return
+        
+        try:
+            filters = {
+                'surname_prefix': options.get('prefix'),
+                'gender': gender,
+                'born_from': options.get('born-from'),
+                'born_to': options.get('born-to'),
+                'age_min': int(options['age-min']) if 'age-min' in options else None,
+                'age_max': int(options['age-max']) if 'age-max' in options else None,
+                'limit': int(options['limit']) if 'limit' in options else None,
+            }
+        except ValueError:
+            print("Error: --age-min, --age-max and --limit must be integers")
+            return
+        
+        sql, params = self.db.build_search_query(**filters)
+        self.print_query_plan(sql, params)
+        
+        recommended = self.db.recommend_search_index(**filters)
+        if recommended:
+            print(f"Recommended index: {recommended[0]} ON employees {recommended[1]}")
+        
+        stats = {}
+        print("\n{:<40} {:<12} {:<8}".format("Full Name", "Birth Date", "Gender"))
+        print("-" * 60)
+        for emp in self.db.search(stats=stats, **filters):
+            print("{:<40} {:<12} {:<8}".format(emp.full_name, emp.birth_date, emp.gender))
+        
+        print(f"\nFound {stats.get('rows', 0)} employees")
+        print(f"Query executed in {stats.get('execute_time', 0):.4f} seconds, "
+              f"total {stats.get('total_time', 0):.4f} seconds")
+    
+    def run_fulltext_mode(self):
+        """Режим fts: создание полнотекстового индекса по ФИО"""
+        if not self.check_database_connection():
+            return
+        
+        print("Building full-text name index...")
+        if self.db.create_fulltext_index():
+            print("Full-text index is kept in sync with the employees table by triggers")
+        else:
+            print("Failed to create full-text index!")
+    
+    def run_name_search_mode(self, args):
+        """Режим name: поиск по любой части ФИО со сравнением с LIKE-сканом"""
+        if not self.check_database_connection():
+            return
+        
+        if not args:
+            print("Error: Search query is required")
+            print("Usage: python main.py name \"query\" [--limit N]")
+            return
+        
+        query = args[0]
+        options = self.parse_options(args[1:], ['limit'])
+        if options is None:
+            return
+        
+        try:
+            limit = int(options['limit']) if 'limit' in options else None
+        except ValueError:
+            print("Error: --limit must be an integer")
+            return
+        
+        if not self.db.has_fulltext_index():
+            print("Full-text index not found, using LIKE scan (run 'python main.py fts' to build it)")
+        
+        sql, params = self.db.build_name_query(query, limit=limit)
+        self.print_query_plan(sql, params)
+        
+        stats = {}
+        print("\n{:<40} {:<12} {:<8}".format("Full Name", "Birth Date", "Gender"))
+        print("-" * 60)
+        for emp in self.db.search_name(query, stats=stats, limit=limit):
+            print("{:<40} {:<12} {:<8}".format(emp.full_name, emp.birth_date, emp.gender))
+        
+        print(f"\nFound {stats.get('rows', 0)} employees in {stats.get('total_time', 0):.4f} seconds")
+        
+        if self.db.has_fulltext_index():
+            # Тот же поиск полным просмотром таблицы для сравнения
+            like_stats = {}
+            for _ in self.db.search_name(query, stats=like_stats, limit=limit, use_fulltext=False):
+                pass
+            print(f"LIKE '%{query}%' scan: {like_stats.get('rows', 0)} employees "
+                  f"in {like_stats.get('total_time', 0):.4f} seconds")
+    
+    def run_import_mode(self, args):
+        """Режим import: потоковая загрузка сотрудников из CSV/JSONL"""
+        from config import DatabaseConfig
+        from transfer import EmployeeImporter
+        
+        if not self.check_database_connection():
+            return
+        
+        if not args:
+            print("Usage: python main.py import FILE [--format csv|jsonl] [--rejects FILE] "
+                  "[--chunk-size N] [--drop-indexes yes|no] [--upsert yes|no]")
+            return
+        
+        options = self.parse_options(args[1:], ['format', 'rejects', 'chunk-size', 'drop-indexes', 'upsert'])
+        if options is None:
+            return
+        
+        try:
+            chunk_size = int(options.get('chunk-size', DatabaseConfig.BULK_CHUNK_SIZE))
+        except ValueError:
+            print("Error: --chunk-size must be an integer")
+            return
+        
+        importer = EmployeeImporter(
+            self.db,
+            chunk_size=chunk_size,
+            rejects_path=options.get('rejects', args[0] + '.rejects.csv'),
+            drop_indexes=options.get('drop-indexes', 'no').lower() in ['yes', 'true', '1'],
+            upsert=options.get('upsert', 'no').lower() in ['yes', 'true', '1'],
+        )
+        print(f"Importing employees from {args[0]}...")
+        if importer.import_file(args[0], options.get('format')):
+            print("Import completed successfully!")
+            self.db.get_table_info()
+        else:
+            print("Import failed!")
+    
+    def run_export_mode(self, args):
+        """Режим export: потоковая выгрузка сотрудников в CSV/JSONL"""
+        from transfer import EmployeeExporter
+        
+        if not self.check_database_connection():
+            return
+        
+        if not args:
+            print("Usage: python main.py export FILE [--format csv|jsonl] [--order id|name]")
+            return
+        
+        options = self.parse_options(args[1:], ['format', 'order'])
+        if options is None:
+            return
+        
+        order = options.get('order', 'id')
+        if order not in ['id', 'name']:
+            print("Error: --order must be 'id' or 'name'")
+            return
+        
+        print(f"Exporting employees to {args[0]}...")
+        if not EmployeeExporter(self.db, order=order).export_file(args[0], options.get('format')):
+            print("Export failed!")
+    
+    def run_compact_mode(self, args):
+        """Режим compact: миграция в компактную схему и сравнение с обычной"""
+        from config import DatabaseConfig
+        from compact import CompactEmployeeDatabase, database_size
+        
+        if not args or args[0] not in ['migrate', 'compare']:
+            print("Usage: python main.py compact migrate|compare [--target FILE] [--without-rowid yes|no]")
+            return
+        
+        options = self.parse_options(args[1:], ['target', 'without-rowid'])
+        if options is None:
+            return
+        target = options.get('target', DatabaseConfig.COMPACT_DB_PATH)
+        
+        if args[0] == 'migrate':
+            without_rowid = options.get('without-rowid', 'yes').lower() in ['yes', 'true', '1']
+            print(f"Migrating {DatabaseConfig.DB_PATH} to compact schema in {target}...")
+            compact_db = CompactEmployeeDatabase(target)
+            try:
+                if compact_db.migrate_from(DatabaseConfig.DB_PATH, without_rowid=without_rowid):
+                    print("Migration completed successfully!")
+                else:
+                    print("Migration failed!")
+            finally:
+                compact_db.close()
+            return
+        
+        if not self.check_database_connection():
+            return
+        
+        if not os.path.exists(target):
+            print(f"Error: Compact database '{target}' not found, run 'python main.py compact migrate' first")
+            return
+        
+        # Контрольная точка, чтобы размер файла отражал все данные
+        self.db.checkpoint('TRUNCATE')
+        compact_db = CompactEmployeeDatabase(target)
+        try:
+            print("\n{:<22} {:>16} {:>16}".format("", "Current schema", "Compact schema"))
+            print("-" * 56)
+            
+            regular_size = database_size(DatabaseConfig.DB_PATH)
+            compact_size = database_size(target)
+            for key, title in [('file_bytes', 'File size, MB'), ('used_bytes', 'Used pages, MB')]:
+                print("{:<22} {:>16.2f} {:>16.2f}".format(
+                    title, regular_size[key] / 1048576, compact_size[key] / 1048576
+                ))
+            
+            # Режим 3: полный упорядоченный вывод (без печати строк)
+            timings = []
+            # Генераторы ленивые: запросы выполняются только при переборе
+            for employees in (self.db.iter_employees_sorted(use_cache=False), compact_db.iter_employees_sorted()):
+                start_time = time.perf_counter()
+                count = sum(1 for _ in employees)
+                timings.append((time.perf_counter() - start_time, count))
+            print("{:<22} {:>15.3f}s {:>15.3f}s".format("Mode 3 listing", timings[0][0], timings[1][0]))
+            print("{:<22} {:>16,} {:>16,}".format("Mode 3 rows", timings[0][1], timings[1][1]))
+            
+            # Режим 5: мужчины с фамилией на F
+            regular_found, regular_time = self.db.get_males_with_f_surname(use_cache=False)
+            compact_found, compact_time = compact_db.get_males_with_f_surname()
+            print("{:<22} {:>15.4f}s {:>15.4f}s".format("Mode 5 search", regular_time, compact_time))
+            print("{:<22} {:>16,} {:>16,}".format("Mode 5 rows", len(regular_found), len(compact_found)))
+        finally:
+            compact_db.close()
+    
+    def run_stats_mode(self, args):
+        """Режим stats: сводка по счетчикам, проверка и пересчет статистики"""
+        if not self.check_database_connection():
+            return
+        
+        action = 'show'
+        if args and not args[0].startswith('--'):
+            action, args = args[0], args[1:]
+        if action not in ['show', 'check', 'rebuild']:
+            print("Usage: python main.py stats [check|rebuild] [--age-bucket N]")
+            return
+        options = self.parse_options(args, ['age-bucket'])
+        if options is None:
+            return
+        
+        try:
+            age_bucket = int(options.get('age-bucket', 10))
+        except ValueError:
+            print("Error: --age-bucket must be an integer")
+            return
+        if age_bucket < 1:
+            print("Error: --age-bucket must be at least 1")
+            return
+        
+        if action == 'rebuild' or not self.db.has_stats():
+            print("Building statistics...")
+            if not self.db.create_stats():
+                print("Failed to build statistics!")
+                return
+        
+        if action == 'check':
+            start_time = time.perf_counter()
+            mismatches = self.db.check_stats()
+            elapsed = time.perf_counter() - start_time
+            for dimension, key, stored, actual in mismatches[:20]:
+                print(f"Mismatch {dimension}[{key!r}]: stored {stored:,}, actual {actual:,}")
+            if mismatches:
+                print(f"Statistics are inconsistent: {len(mismatches):,} mismatches "
+                      f"(run 'python main.py stats rebuild')")
+            else:
+                print(f"Statistics are consistent with the employees table (checked in {elapsed:.2f} seconds)")
+            return
+        
+        start_time = time.perf_counter()
+        summary = self.db.stats_summary(age_bucket=age_bucket)
+        elapsed = time.perf_counter() - start_time
+        
+        print(f"\nTotal employees: {summary['total']:,}")
+        sections = [
+            ("By gender", summary['gender']),
+            ("By surname initial", summary['initial']),
+            ("By birth decade", {f"{decade}s": count for decade, count in summary['birth_decade'].items()}),
+            ("By birth year", summary['birth_year']),
+            ("By age", {f"{age}-{age + age_bucket - 1}": count for age, count in summary['age'].items()}),
+        ]
+        for title, counts in sections:
+            print(f"\n{title}:")
+            for key, count in counts.items():
+                print("    {:<12} {:>12,}".format(str(key), count))
+        print(f"\nStatistics read in {elapsed:.4f} seconds")
+    
+    def run_analytics_mode(self, args):
+        """Режим analytics: распределения по таблице в массивах NumPy"""
+        import json
+        from analytics import MONTHS, EmployeeColumns, numpy_available
+        
+        if not numpy_available():
+            print("Error: analytics mode requires NumPy (pip install numpy)")
+            return
+        if not self.check_database_connection():
+            return
+        
+        report_names = ['age', 'months', 'initials', 'all']
+        report_name = 'all'
+        if args and not args[0].startswith('--'):
+            report_name, args = args[0], args[1:]
+        if report_name not in report_names:
+            print("Usage: python main.py analytics [age|months|initials|all] "
+                  "[--age-bucket N] [--chunk-size N] [--output FILE]")
+            return
+        options = self.parse_options(args, ['age-bucket', 'chunk-size', 'output'])
+        if options is None:
+            return
+        
+        try:
+            age_bucket = int(options.get('age-bucket', 10))
+            chunk_size = int(options.get('chunk-size', 100000))
+        except ValueError:
+            print("Error: --age-bucket and --chunk-size must be integers")
+            return
+        if age_bucket < 1 or chunk_size < 1:
+            print("Error: --age-bucket and --chunk-size must be at least 1")
+            return
+        
+        columns = EmployeeColumns.load(self.db, chunk_size=chunk_size)
+        if columns is None:
+            return
+        
+        # Чтение таблицы (I/O) и векторные вычисления замеряются отдельно
+        start_time = time.perf_counter()
+        report = {'total': len(columns), 'gender': columns.gender_counts()}
+        if report_name in ['age', 'all']:
+            report['age_by_gender'] = columns.age_by_gender(bucket=age_bucket)
+        if report_name in ['months', 'all']:
+            report['birth_months_by_gender'] = columns.birth_months_by_gender()
+        if report_name in ['initials', 'all']:
+            report['initials'] = columns.initial_counts()
+        compute_time = time.perf_counter() - start_time
+        
+        print(f"\nTotal employees: {report['total']:,} "
+              f"(Female {report['gender']['Female']:,}, Male {report['gender']['Male']:,})")
+        if 'age_by_gender' in report:
+            ages = report['age_by_gender']
+            print("\nAge by gender:")
+            print("    {:<12} {:>12} {:>12}".format('Age', 'Female', 'Male'))
+            for index, (low, high) in enumerate(ages['buckets']):
+                print("    {:<12} {:>12,} {:>12,}".format(f"{low}-{high}", ages['Female'][index], ages['Male'][index]))
+            excluded = ages['excluded']
+            if excluded['invalid_date'] or excluded['future_date']:
+                print(f"    Excluded: {excluded['invalid_date']:,} with invalid birth date, "
+                      f"{excluded['future_date']:,} with birth date in the future")
+        if 'birth_months_by_gender' in report:
+            months = report['birth_months_by_gender']
+            print("\nBirth month by gender:")
+            print("    {:<12} {:>12} {:>12}".format('Month', 'Female', 'Male'))
+            for index, month in enumerate(MONTHS):
+                print("    {:<12} {:>12,} {:>12,}".format(month, months['Female'][index], months['Male'][index]))
+            if months['excluded']['invalid_date']:
+                print(f"    Excluded: {months['excluded']['invalid_date']:,} with invalid birth date")
+        if 'initials' in report:
+            print("\nBy surname initial:")
+            for initial, count in report['initials'].items():
+                print("    {:<12} {:>12,}".format(initial, count))
+        
+        print(f"\nTable read into arrays in {columns.load_time:.4f} seconds, "
+              f"aggregates computed in {compute_time:.4f} seconds")
+        if 'output' in options:
+            report['load_time'] = columns.load_time
+            report['compute_time'] = compute_time
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"Report saved to {options['output']}")
+    
+    def run_shard_mode(self, args):
+        """Режим shard: шардированная раскладка - загрузка, запросы, замер масштабирования"""
+        from config import DatabaseConfig
+        from sharding import PARTITIONS, ShardedDatabase, shard_paths
+        
+        action = args[0] if args else 'info'
+        if action not in ['load', 'info', 'males', 'list', 'bench']:
+            print("Error: Usage: python main.py shard load|info|males|list|bench [options]")
+            return
+        
+        options = self.parse_options(args[1:], ['shards', 'partition', 'dir', 'workers', 'count', 'seed',
+                                                'chunk-size', 'dedup', 'limit', 'sizes', 'repeat', 'output'])
+        if options is None:
+            return
+        
+        partition = options.get('partition', DatabaseConfig.SHARD_PARTITION)
+        if partition not in PARTITIONS:
+            print(f"Error: --partition must be one of: {', '.join(PARTITIONS)}")
+            return
+        try:
+            workers = int(options['workers']) if 'workers' in options else None
+            limit = int(options['limit']) if 'limit' in options else None
+        except ValueError:
+            print("Error: --workers and --limit must be integers")
+            return
+        
+        if action == 'bench':
+            from benchmark import QueryBenchmark, ShardBenchmark
+            
+            try:
+                benchmark = ShardBenchmark(
+                    sizes=[int(size) for size in options.get('sizes', '1000000,10000000').split(',')],
+                    shard_counts=[int(count) for count in options.get('shards', '1,2,4').split(',')],
+                    partition=partition,
+                    repeat=int(options.get('repeat', 5)),
+                    data_dir=options.get('dir', 'bench_data'),
+                    workers=workers,
+                )
+            except ValueError:
+                print("Error: --sizes, --shards and --repeat must be comma-separated integers")
+                return
+            report = benchmark.run()
+            QueryBenchmark.save(report, options.get('output', 'shard_benchmark.json'))
+            return
+        
+        try:
+            shards = int(options.get('shards', DatabaseConfig.SHARD_COUNT))
+        except ValueError:
+            print("Error: --shards must be an integer")
+            return
+        if shards < 1:
+            print("Error: --shards must be at least 1")
+            return
+        
+        sharded = ShardedDatabase(shard_paths(shards, options.get('dir')), partition, workers)
+        try:
+            if action == 'load':
+                from generator import TestDataGenerator
+                
+                try:
+                    generator = TestDataGenerator(
+                        record_count=int(options.get('count', 1000000)),
+                        seed=int(options['seed']) if 'seed' in options else None,
+                        chunk_size=int(options.get('chunk-size', DatabaseConfig.BULK_CHUNK_SIZE)),
+                    )
+                except ValueError:
+                    print("Error: --count, --seed and --chunk-size must be integers")
+                    return
+                if not sharded.create_tables():
+                    print("Failed to create shard tables!")
+                    return
+                print(f"Loading {generator.total_count:,} employees into {shards} shards "
+                      f"({partition}, seed {generator.seed})...")
+                summary = sharded.bulk_load(generator.iter_chunks(),
+                                            dedup=options.get('dedup', 'yes').lower() in ['yes', 'true', '1'])
+                print(f"Sharded load {'completed' if summary['ok'] else 'FAILED'} in {summary['load_time']:.2f} seconds: "
+                      f"inserted {summary['inserted']:,} of {summary['rows']:,}, "
+                      f"skipped {summary['duplicates']:,} duplicates")
+                return
+            
+            errors = sharded.check_layout()
+            if errors:
+                for error in errors:
+                    print(f"Error: {error}")
+                print("Run 'python main.py shard load' with the same --shards/--partition/--dir first")
+                return
+            
+            if action == 'info':
+                counts = sharded.counts()
+                for path, count in zip(sharded.paths, counts):
+                    print(f"{path:<40} {count:>12,}")
+                print(f"Total: {sum(counts):,} employees in {shards} shards ({partition})")
+            elif action == 'males':
+                employees, execution_time = sharded.get_males_with_f_surname()
+                print(f"Search executed in {execution_time:.4f} seconds across "
+                      f"{len(sharded.router.shards_for_prefix('F'))} shards")
+                print(f"Found {len(employees)} employees")
+            else:
+                import sqlite3
+                
+                try:
+                    total = self.print_employee_listing(sharded.iter_employees_sorted(limit=limit))
+                except sqlite3.Error as e:
+                    print(f"\nError fetching employees: {e}")
+                    print("Sharded listing FAILED: output is incomplete")
+                    return
+                print(f"\nTotal employees: {total}")
+        finally:
+            sharded.close()
+    
+    def run_snapshot_mode(self, args):
+        """Режим snapshot: копия БД в памяти против чтения из файла"""
+        from benchmark import QueryBenchmark, SnapshotBenchmark
+        
+        options = self.parse_options(args, ['repeat', 'threads', 'output'])
+        if options is None:
+            return
+        try:
+            benchmark = SnapshotBenchmark(
+                repeat=int(options.get('repeat', 20)),
+                threads=[int(count) for count in options.get('threads', '1,4,8').split(',')],
+            )
+        except ValueError:
+            print("Error: --repeat and --threads must be integers")
+            return
+        if benchmark.repeat < 1 or min(benchmark.threads) < 1:
+            print("Error: --repeat and --threads must be at least 1")
+            return
+        
+        report = benchmark.run()
+        if 'output' in options:
+            QueryBenchmark.save(report, options['output'])
+    
+    def run_benchmark_mode(self, args):
+        """Режим bench: замер всех запросов на наборах разного размера"""
+        from benchmark import QueryBenchmark
+        
+        options = self.parse_options(args, ['sizes', 'repeat', 'warmup', 'output', 'data-dir', 'optimize'])
+        if options is None:
+            return
+        
+        try:
+            benchmark = QueryBenchmark(
+                sizes=[int(size) for size in options.get('sizes', '10000,100000,1000000').split(',')],
+                repeat=int(options.get('repeat', 5)),
+                warmup=int(options.get('warmup', 1)),
+                data_dir=options.get('data-dir', 'bench_data'),
+                optimize=options.get('optimize', 'yes').lower() in ['yes', 'true', '1'],
+            )
+        except ValueError:
+            print("Error: --sizes, --repeat and --warmup must be integers")
+            return
+        
+        if benchmark.repeat < 1:
+            print("Error: --repeat must be at least 1")
+            return
+        
+        print("Running query benchmark...")
+        report = benchmark.run()
+        benchmark.save(report, options.get('output', 'benchmark_results.json'))
+    
+    def run_serve_mode(self, args):
+        """Режим serve: HTTP/JSON-сервис поверх EmployeeDatabase"""
+        from config import DatabaseConfig
+        from service import EmployeeService
+        
+        options = self.parse_options(args, ['host', 'port', 'socket', 'workers', 'page-size'])
+        if options is None:
+            return
+        
+        try:
+            port = int(options['port']) if 'port' in options else None
+            service = EmployeeService(
+                workers=int(options.get('workers', DatabaseConfig.SERVICE_WORKERS)),
+                page_size=int(options.get('page-size', DatabaseConfig.SERVICE_PAGE_SIZE)),
+            )
+        except ValueError:
+            print("Error: --port, --workers and --page-size must be integers")
+            return
+        
+        # Соединение режима сервису не нужно (и не открывается): у каждого потока пула свое
+        service.run(options.get('host'), port, options.get('socket'))
+    
+    def run_loadgen_mode(self, args):
+        """Режим loadgen: нагрузочный тест запущенного сервиса"""
+        from loadgen import LoadGenerator
+        
+        options = self.parse_options(args, ['paths', 'requests', 'concurrency', 'host', 'port',
+                                            'socket', 'output'])
+        if options is None:
+            return
+        
+        try:
+            generator = LoadGenerator(
+                paths=options.get('paths', '/males-f').split(','),
+                requests=int(options.get('requests', 1000)),
+                concurrency=int(options.get('concurrency', 10)),
+                host=options.get('host'),
+                port=int(options['port']) if 'port' in options else None,
+                socket_path=options.get('socket'),
+            )
+        except ValueError:
+            print("Error: --requests, --concurrency and --port must be integers")
+            return
+        
+        print(f"Sending {generator.requests:,} requests with {generator.concurrency} concurrent clients...")
+        report = generator.run()
+        if report and 'output' in options:
+            generator.save(report, options['output'])
+    
+    def run_index_mode(self, args):
+        """Режим index: состояние индексов и приведение к объявленному списку"""
+        from indexes import IndexAdvisor
+        
+        if not self.check_database_connection():
+            return
+        
+        if not args or args[0] not in ['status', 'apply']:
+            print("Usage: python main.py index status|apply [--sample N] [--measure yes|no]")
+            return
+        
+        options = self.parse_options(args[1:], ['sample', 'measure'])
+        if options is None:
+            return
+        
+        try:
+            advisor = IndexAdvisor(self.db, sample_size=int(options.get('sample', 20000)))
+        except ValueError:
+            print("Error: --sample must be an integer")
+            return
+        
+        if args[0] == 'apply':
+            if not advisor.apply():
+                print("Failed to apply indexes!")
+                return
+            print("Indexes match the declared list")
+        
+        measure = options.get('measure', 'yes').lower() in ['yes', 'true', '1']
+        report = advisor.status(measure=measure)
+        print("\n{:<30} {:<24} {:<10} {:>10} {:>12}  {}".format(
+            "Index", "Columns", "State", "Size, KB", "Write, us", "Used by"))
+        print("-" * 110)
+        for item in report:
+            size = f"{item['size'] / 1024:,.0f}" if item['size'] is not None else "n/a"
+            cost = f"{item['write_cost_us']:.2f}" if item['write_cost_us'] is not None else "n/a"
+            print("{:<30} {:<24} {:<10} {:>10} {:>12}  {}".format(
+                item['name'], ', '.join(item['columns']), item['state'], size, cost,
+                ', '.join(item['used_by']) or '-'))
+            if item['redundant_with']:
+                print(f"    redundant: columns are a prefix of {item['redundant_with']}")
+            if item['overlaps_with'] and not item['constraint']:
+                print(f"    overlaps: extends constraint index {', '.join(item['overlaps_with'])} "
+                      f"(same leading keys stored twice; kept if queries use it)")
+            elif item['overlaps_with']:
+                print(f"    overlaps: columns are a prefix of {', '.join(item['overlaps_with'])} "
+                      f"(kept to enforce the constraint)")
+        
+        pending = [item['name'] for item in report if item['state'] in ('missing', 'extra', 'redundant')]
+        if pending and args[0] == 'status':
+            print(f"\n{len(pending)} indexes differ from the declared list (run 'python main.py index apply')")
+    
+    def run_startup_mode(self, args):
+        """Режим startup: замер времени запуска CLI и стоимости импортов"""
+        import json
+        import shlex
+        from benchmark import StartupBenchmark
+        
+        options = self.parse_options(args, ['command', 'repeat', 'output'])
+        if options is None:
+            return
+        
+        try:
+            benchmark = StartupBenchmark(
+                command=shlex.split(options.get('command', 'help')),
+                repeat=int(options.get('repeat', 10)),
+            )
+        except ValueError:
+            print("Error: --repeat must be an integer and --command a valid command line")
+            return
+        if benchmark.repeat < 1:
+            print("Error: --repeat must be at least 1")
+            return
+        
+        report = benchmark.run()
+        if 'output' in options:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Startup report saved to {options['output']}")
+    
     def interactive_mode(self):
         """Интерактивный режим"""
         while True:
@@ -289,6 +1157,9 @@ Note: Uses SQLite database (employees.db) - no server setup required!
     
     def add_employee_interactive(self):
         """Интерактивное добавление сотрудника"""
+        from employee import Employee
+        from validation import normalize_gender
+        
         if not self.check_database_connection():
             return
             
@@ -299,70 +1170,130 @@ Note: Uses SQLite database (employees.db) - no server setup required!
         birth_date = input("Birth Date (YYYY-MM-DD): ").strip()
         gender = input("Gender (Male/Female): ").strip()
         
-        # Нормализация пола
-        if gender.lower() in ['m', 'male', 'муж', 'мужской']:
-            gender = 'Male'
-        elif gender.lower() in ['f', 'female', 'жен', 'женский']:
-            gender = 'Female'
-        else:
+        gender = normalize_gender(gender, abbreviations=True)
+        if gender is None:
             print("Error: Gender must be 'Male' or 'Female'")
             return
         
         employee = Employee(full_name, birth_date, gender)
-        
-        if employee.validate():
-            if self.db.insert_employee(employee):
-                print("Employee added successfully!")
-            else:
-                print("Failed to add employee!")
+        if self.db.insert_employee(employee):
+            print("Employee added successfully!")
+        else:
+            print("Failed to add employee!")
+
+# Режимы командной строки: режим -> метод EmployeeManager. Модули режимов
+# (генератор, замеры, импорт, сервис и т.д.) импортируются внутри методов,
+# поэтому запуск режима загружает только нужный ему код
+MODES = {
+    '1': 'run_mode_1',
+    '2': 'run_mode_2',
+    '3': 'run_mode_3',
+    '4': 'run_mode_4',
+    '5': 'run_mode_5',
+    '6': 'run_mode_6',
+    'search': 'run_search_mode',
+    'fts': 'run_fulltext_mode',
+    'name': 'run_name_search_mode',
+    'import': 'run_import_mode',
+    'export': 'run_export_mode',
+    'compact': 'run_compact_mode',
+    'stats': 'run_stats_mode',
+    'serve': 'run_serve_mode',
+    'loadgen': 'run_loadgen_mode',
+    'bench': 'run_benchmark_mode',
+    'startup': 'run_startup_mode',
+    'index': 'run_index_mode',
+    'shard': 'run_shard_mode',
+    'snapshot': 'run_snapshot_mode',
+    'analytics': 'run_analytics_mode',
+}
+# Режимы без аргументов командной строки
+NO_ARGS_MODES = {'1', '5', '6', 'fts'}
+
+# Общие опции любого режима (см. metrics.py)
+GLOBAL_OPTIONS = ('profile', 'profile-output', 'metrics-output', 'slow-sql', 'snapshot')
+PROFILE_KINDS = ('cpu', 'memory', 'all')
+
+def pop_global_options(argv) -> dict:
+    """Извлекает из argv общие опции вида --name value (остальные аргументы не меняются)"""
+    options = {}
+    i = 1
+    while i < len(argv):
+        if argv[i].startswith('--') and argv[i][2:] in GLOBAL_OPTIONS and i + 1 < len(argv):
+            options[argv[i][2:]] = argv[i + 1]
+            del argv[i:i + 2]
+        else:
+            i += 1
+    return options
+
+def dispatch(manager, mode):
+    """Запускает режим mode (None - интерактивный режим)"""
+    if mode is None:
+        # Интерактивный режим
+        manager.interactive_mode()
+    elif mode in MODES:
+        # Режим с аргументами командной строки
+        method = getattr(manager, MODES[mode])
+        if mode in NO_ARGS_MODES:
+            method()
         else:
-            print("Invalid employee data!")
+            method(sys.argv[2:])
+    else:
+        print(f"Error: Unknown mode '{mode}'")
+        manager.show_help()
 
 def main():
+    options = pop_global_options(sys.argv)
+    mode = sys.argv[1] if len(sys.argv) > 1 else None
+    if mode in ['help', '--help', '-h']:
+        EmployeeManager.show_help()
+        return
+    
+    profile = options.get('profile', os.environ.get('EMPLOYEE_PROFILE'))
+    metrics_output = options.get('metrics-output', os.environ.get('EMPLOYEE_METRICS'))
+    if profile and profile not in PROFILE_KINDS:
+        print(f"Error: --profile must be one of: {', '.join(PROFILE_KINDS)}")
+        return
+    if 'snapshot' in options or 'slow-sql' in options:
+        from config import DatabaseConfig
+        
+        if 'snapshot' in options:
+            DatabaseConfig.SNAPSHOT = options['snapshot'].lower() in ['yes', 'true', '1']
+        if 'slow-sql' in options:
+            try:
+                DatabaseConfig.SLOW_STATEMENT_SECONDS = float(options['slow-sql'])
+            except ValueError:
+                print("Error: --slow-sql must be a number of seconds")
+                return
+    
     print("Employee Management System (SQLite)")
     print("Initializing...")
     
-    # тестируем подключение к базе данных
-    if not DatabaseConfig.test_connection():
+    # Соединение открывается один раз, при первом обращении режима к manager.db;
+    # режимы без БД (bench, loadgen, startup, shard, snapshot...) его не открывают
+    manager = EmployeeManager()
+    if mode is None and not manager.db.is_connected():
         print("\nFailed to initialize database connection.")
         return
     
-    manager = EmployeeManager()
-    
-    if len(sys.argv) == 1:
-        # Интерактивный режим
-        manager.interactive_mode()
-    elif len(sys.argv) >= 2:
-        # Режим с аргументами командной строки
-        mode = sys.argv[1]
-        
-        if mode == '1':
-            manager.run_mode_1()
-        elif mode == '2':
-            if len(sys.argv) >= 5:
-                manager.run_mode_2(sys.argv[2:5])
-            else:
-                print("Error: Insufficient arguments for mode 2")
-                print("Usage: python main.py 2 \"Full Name\" \"YYYY-MM-DD\" \"Gender\"")
-        elif mode == '3':
-            manager.run_mode_3()
-        elif mode == '4':
-            manager.run_mode_4()
-        elif mode == '5':
-            manager.run_mode_5()
-        elif mode == '6':
-            manager.run_mode_6()
-        elif mode in ['help', '--help', '-h']:
-            manager.show_help()
-        else:
-            print(f"Error: Unknown mode '{mode}'")
-            manager.show_help()
+    if profile:
+        from metrics import profiling
         
-        # Закрываем соединение с БД
-        manager.db.close()
+        with profiling(profile, options.get('profile-output')):
+            dispatch(manager, mode)
     else:
-        manager.show_help()
-        manager.db.close()
+        dispatch(manager, mode)
+    
+    # Закрываем соединение с БД и пулы (если режим загружал модуль config)
+    manager.close_database()
+    config = sys.modules.get('config')
+    if config is not None:
+        config.DatabaseConfig.close_pools()
+    
+    if metrics_output:
+        from metrics import METRICS
+        
+        METRICS.dump(metrics_output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
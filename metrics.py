@@ -0,0 +1,239 @@
+import functools
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Границы корзин гистограмм задержки, секунды
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# Флаг CO_GENERATOR объекта кода (без импорта inspect)
+_CO_GENERATOR = 0x20
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными корзинами"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        for bound in LATENCY_BUCKETS:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Счетчики и гистограммы задержек процесса (потокобезопасно).
+
+    Счетчики - rows_read, rows_written, commits, lock_errors,
+    slow_statements, service_* и т.д.; гистограммы - длительность методов
+    EmployeeDatabase и фиксаций транзакций по имени операции.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, operation, seconds):
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def snapshot(self) -> dict:
+        """Метрики в виде словаря для JSON"""
+        with self._lock:
+            return {
+                'counters': dict(sorted(self.counters.items())),
+                'operations': {
+                    operation: {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                        'buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'],
+                                            histogram.counts)),
+                    }
+                    for operation, histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def to_prometheus(self, prefix='employee_') -> str:
+        """Метрики в текстовом формате Prometheus"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}{name}_total counter")
+                lines.append(f"{prefix}{name}_total {value}")
+            family = f"{prefix}operation_seconds"
+            if self.histograms:
+                lines.append(f"# TYPE {family} histogram")
+            for operation, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{family}_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+                lines.append(f'{family}_sum{{operation="{operation}"}} {histogram.sum}')
+                lines.append(f'{family}_count{{operation="{operation}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Сохраняет метрики в файл: Prometheus для .prom/.txt, иначе JSON"""
+        import json
+
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+        print(f"Metrics saved to {path}")
+
+
+METRICS = MetricsRegistry()
+
+
+def timed(func):
+    """Декоратор: длительность вызова метода в гистограмму с его именем.
+
+    Для генераторов замеряется время от первого next() до исчерпания или
+    закрытия генератора.
+    """
+    operation = func.__name__
+
+    if func.__code__.co_flags & _CO_GENERATOR:
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from func(*args, **kwargs)
+            finally:
+                METRICS.observe(operation, time.perf_counter() - start)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            METRICS.observe(operation, time.perf_counter() - start)
+    return wrapper
+
+
+def _is_lock_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Соединение SQLite, учитывающее фиксации транзакций и ошибки блокировки"""
+
+    def commit(self):
+        if not self.in_transaction:
+            return super().commit()
+        start = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.OperationalError as e:
+            if _is_lock_error(e):
+                METRICS.inc('lock_errors')
+            raise
+        finally:
+            METRICS.observe('commit', time.perf_counter() - start)
+        METRICS.inc('commits')
+
+
+class SlowStatementLog:
+    """Журнал медленных SQL-запросов соединения.
+
+    trace callback запоминает текст и время начала каждого выполняемого
+    запроса, обработчик прогресса (каждые steps инструкций VM) сообщает о
+    запросе, который выполняется дольше threshold секунд (один раз на запрос).
+    """
+
+    def __init__(self, threshold, steps=100000, output=None):
+        self.threshold = threshold
+        self.steps = steps
+        self.output = output
+        self._sql = None
+        self._start = 0.0
+        self._reported = True
+
+    def attach(self, conn):
+        conn.set_trace_callback(self._trace)
+        conn.set_progress_handler(self._progress, self.steps)
+
+    def _trace(self, sql):
+        self._sql = sql
+        self._start = time.perf_counter()
+        self._reported = False
+
+    def _progress(self):
+        if not self._reported:
+            elapsed = time.perf_counter() - self._start
+            if elapsed > self.threshold:
+                self._reported = True
+                METRICS.inc('slow_statements')
+                print(f"Slow statement ({elapsed:.2f}s and running): {' '.join(self._sql.split())}",
+                      file=self.output or sys.stderr)
+        # 0 - продолжить выполнение запроса
+        return 0
+
+
+@contextmanager
+def profiling(kind, output=None, top=25):
+    """Профилирование блока: cpu (cProfile), memory (tracemalloc) или all.
+
+    По завершении печатает самые дорогие функции и места выделения памяти;
+    output - файл для статистики cProfile (.prof, для pstats/snakeviz).
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile() if kind in ('cpu', 'all') else None
+    trace_memory = kind in ('memory', 'all')
+    if trace_memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            print(f"\nCPU profile (top {top} by cumulative time):", file=sys.stderr)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats('cumulative').print_stats(top)
+            if output:
+                stats.dump_stats(output)
+                print(f"CPU profile saved to {output}", file=sys.stderr)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"\nMemory: current {current / 1048576:.1f} MB, peak {peak / 1048576:.1f} MB", file=sys.stderr)
+            print(f"Top {top // 2} allocation sites:", file=sys.stderr)
+            for stat in snapshot.statistics('lineno')[:top // 2]:
+                print(f"  {stat}", file=sys.stderr)
@@ -0,0 +1,358 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from config import DatabaseConfig
+from database import EmployeeDatabase
+from metrics import METRICS
+from validation import normalize_gender
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+# Максимальный размер строки запроса и заголовков
+MAX_HEADER_BYTES = 16384
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _employee_dict(emp):
+    return {'full_name': emp.full_name, 'birth_date': emp.birth_date, 'gender': emp.gender}
+
+
+class RequestError(Exception):
+    """Ошибка в параметрах запроса (ответ 400/404/405)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseAborted(Exception):
+    """Ошибка после отправки заголовков ответа: соединение уже оборвано"""
+
+
+class EmployeeService:
+    """Локальный HTTP/JSON-сервис поверх EmployeeDatabase на asyncio.
+
+    Обращения к SQLite выполняются в ограниченном пуле потоков, у каждого
+    потока свое соединение только для чтения. Одинаковые запросы, пришедшие
+    одновременно, выполняются один раз, и результат получают все ожидающие.
+    Полный список сотрудников отдается потоково (NDJSON, chunked) страницами
+    keyset-пагинации, поэтому память не зависит от размера таблицы.
+
+    Счетчики сервиса и метрики EmployeeDatabase собираются в общий реестр
+    metrics.METRICS: /metrics отдает JSON, /metrics?format=prometheus -
+    текстовый формат Prometheus.
+
+    GET /health, /metrics?format=json|prometheus, /stats, /males-f,
+        /employees?limit=&offset=&after=ФИО|дата,
+        /search?prefix=&gender=&born_from=&born_to=&age_min=&age_max=&limit=,
+        /name?q=&limit=
+    """
+
+    def __init__(self, db_path=None, workers=None, page_size=None, max_limit=None):
+        self.db_path = db_path
+        self.workers = workers or DatabaseConfig.SERVICE_WORKERS
+        self.page_size = page_size or DatabaseConfig.SERVICE_PAGE_SIZE
+        self.max_limit = max_limit or DatabaseConfig.SERVICE_MAX_LIMIT
+        self.executor = None
+        self._local = threading.local()
+        self._databases = []
+        self._databases_lock = threading.Lock()
+        self._inflight = {}
+        self.routes = {
+            '/health': self._health,
+            '/metrics': self._metrics,
+            '/stats': self._stats,
+            '/males-f': self._males_f,
+            '/search': self._search,
+            '/name': self._name,
+        }
+
+    # --- Пул потоков и соединения ---
+
+    def _thread_db(self):
+        """EmployeeDatabase, закрепленная за текущим потоком пула"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            if DatabaseConfig.SNAPSHOT:
+                from snapshot import SnapshotDatabase
+                db = SnapshotDatabase(self.db_path)
+            else:
+                db = EmployeeDatabase(self.db_path, read_only=True)
+            self._local.db = db
+            with self._databases_lock:
+                self._databases.append(db)
+        return db
+
+    async def run_query(self, key, func, *args):
+        """Выполняет func в пуле потоков; одинаковые одновременные запросы объединяются"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._inflight.pop(key, None)
+                                     if self._inflight.get(key) is done else None)
+            METRICS.inc('service_queries')
+        else:
+            METRICS.inc('service_coalesced')
+        # shield: отмена одного ожидающего не отменяет общий запрос
+        return await asyncio.shield(future)
+
+    # --- Обработчики (выполняются в потоках пула) ---
+
+    def _limit(self, params, default=None):
+        try:
+            limit = int(params['limit']) if 'limit' in params else default
+        except ValueError:
+            raise RequestError(400, "limit must be an integer")
+        if limit is not None and limit < 0:
+            raise RequestError(400, "limit must not be negative")
+        return limit
+
+    def _health(self, params):
+        return {'status': 'ok' if self._thread_db().ping() else 'unavailable'}
+
+    def _metrics(self, params):
+        metrics = METRICS.snapshot()
+        metrics['workers'] = self.workers
+        metrics['inflight'] = len(self._inflight)
+        return metrics
+
+    def _prometheus_metrics(self):
+        return (METRICS.to_prometheus() +
+                "# TYPE employee_service_workers gauge\n"
+                f"employee_service_workers {self.workers}\n"
+                "# TYPE employee_service_inflight gauge\n"
+                f"employee_service_inflight {len(self._inflight)}\n").encode('utf-8')
+
+    def _stats(self, params):
+        return self._thread_db().stats_summary()
+
+    def _males_f(self, params):
+        employees, execution_time = self._thread_db().get_males_with_f_surname()
+        return {
+            'count': len(employees),
+            'execution_time': execution_time,
+            'employees': [_employee_dict(emp) for emp in employees],
+        }
+
+    def _search(self, params):
+        gender = params.get('gender')
+        if gender:
+            gender = normalize_gender(gender, abbreviations=True)
+            if gender is None:
+                raise RequestError(400, "gender must be 'Male' or 'Female'")
+        try:
+            filters = {
+                'surname_prefix': params.get('prefix'),
+                'gender': gender,
+                'born_from': params.get('born_from'),
+                'born_to': params.get('born_to'),
+                'age_min': int(params['age_min']) if 'age_min' in params else None,
+                'age_max': int(params['age_max']) if 'age_max' in params else None,
+            }
+        except ValueError:
+            raise RequestError(400, "age_min and age_max must be integers")
+        limit = min(self._limit(params, self.max_limit), self.max_limit)
+        employees = [_employee_dict(emp) for emp in self._thread_db().search(limit=limit, **filters)]
+        return {'count': len(employees), 'employees': employees}
+
+    def _name(self, params):
+        if not params.get('q'):
+            raise RequestError(400, "q is required")
+        limit = min(self._limit(params, self.max_limit), self.max_limit)
+        employees = [_employee_dict(emp) for emp in self._thread_db().search_name(params['q'], limit=limit)]
+        return {'count': len(employees), 'employees': employees}
+
+    def _employees_page(self, after, offset, limit):
+        """Одна страница списка сотрудников в виде строк NDJSON.
+
+        Строки читаются через cached_rows, а не iter_employees_sorted: ошибка
+        sqlite3.Error должна дойти до _stream_employees, а не выглядеть как
+        последняя (короткая) страница.
+        """
+        db = self._thread_db()
+        if after is not None and not isinstance(after, tuple):
+            after = (after, None)
+        lines = []
+        last_key = after
+        for full_name, birth_date, gender in db.cached_rows(*db.sorted_page_query(after, limit, offset)):
+            lines.append(_encode({'full_name': full_name, 'birth_date': birth_date, 'gender': gender}))
+            last_key = (full_name, birth_date)
+        data = ('\n'.join(lines) + '\n').encode('utf-8') if lines else b''
+        return data, len(lines), last_key
+
+    # --- HTTP ---
+
+    @staticmethod
+    async def _send(writer, status, body, content_type='application/json', keep_alive=True):
+        payload = _encode(body).encode('utf-8') if content_type == 'application/json' else body
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def _stream_employees(self, writer, params, keep_alive):
+        """Потоковая выдача /employees: страницы пишутся по мере чтения (chunked)"""
+        try:
+            limit = self._limit(params)
+            offset = int(params.get('offset', 0))
+        except ValueError:
+            raise RequestError(400, "offset must be an integer")
+        after = params.get('after')
+        if after and '|' in after:
+            after = tuple(after.split('|', 1))
+
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: application/x-ndjson; charset=utf-8\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+        )
+        remaining = limit
+        try:
+            while remaining is None or remaining > 0:
+                page_limit = self.page_size if remaining is None else min(self.page_size, remaining)
+                key = ('employees', after, offset, page_limit)
+                data, count, after = await self.run_query(key, self._employees_page, after, offset, page_limit)
+                offset = 0
+                if data:
+                    writer.write(f"{len(data):X}\r\n".encode('latin-1') + data + b"\r\n")
+                    # drain() приостанавливает выдачу, пока клиент не прочитает данные
+                    await writer.drain()
+                if remaining is not None:
+                    remaining -= count
+                if count < page_limit:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            # Статус 200 уже отправлен: ответ 500 попал бы в тело. Обрыв
+            # соединения без завершающего фрагмента сообщает клиенту о сбое
+            METRICS.inc('service_errors')
+            print(f"Error streaming employees: {e}")
+            writer.transport.abort()
+            raise ResponseAborted() from e
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _read_request(self, reader):
+        """Читает строку запроса и заголовки; None - клиент закрыл соединение"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise RequestError(400, "Request header too large")
+        lines = head.decode('latin-1').split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            raise RequestError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        length = headers.get('content-length', '0')
+        # int() принимает знак, пробелы и цифры Unicode - допускаются только цифры ASCII
+        if not (length.isascii() and length.isdigit()):
+            raise RequestError(400, "Invalid Content-Length")
+        length = int(length)
+        if length:
+            await reader.readexactly(length)
+        return parts[0], parts[1], parts[2], headers
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, version, headers = request
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                    METRICS.inc('service_requests')
+
+                    if method != 'GET':
+                        raise RequestError(405, "Only GET is supported")
+                    url = urlsplit(target)
+                    params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                    if url.path == '/employees':
+                        await self._stream_employees(writer, params, keep_alive)
+                    elif url.path == '/metrics' and params.get('format') == 'prometheus':
+                        # Формат экспозиции Prometheus 0.0.4; снимок реестра дешев и не идет в пул
+                        await self._send(writer, 200, self._prometheus_metrics(),
+                                         content_type='text/plain; version=0.0.4', keep_alive=keep_alive)
+                    elif url.path in self.routes:
+                        key = (url.path, tuple(sorted(params.items())))
+                        result = await self.run_query(key, self.routes[url.path], params)
+                        await self._send(writer, 200, result, keep_alive=keep_alive)
+                    else:
+                        raise RequestError(404, f"Unknown path {url.path}")
+                except RequestError as e:
+                    METRICS.inc('service_errors')
+                    await self._send(writer, e.status, {'error': str(e)}, keep_alive=keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError, ResponseAborted):
+                    break
+                except Exception as e:
+                    METRICS.inc('service_errors')
+                    print(f"Error handling request: {e}")
+                    await self._send(writer, 500, {'error': str(e)}, keep_alive=False)
+                    break
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=None, port=None, socket_path=None, ready=None):
+        """Запускает сервер и обслуживает запросы до отмены задачи"""
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='employee-db')
+        try:
+            if socket_path:
+                server = await asyncio.start_unix_server(self.handle_connection, path=socket_path,
+                                                         limit=MAX_HEADER_BYTES)
+                address = socket_path
+            else:
+                server = await asyncio.start_server(self.handle_connection,
+                                                    host or DatabaseConfig.SERVICE_HOST,
+                                                    port or DatabaseConfig.SERVICE_PORT,
+                                                    limit=MAX_HEADER_BYTES)
+                address = "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+            print(f"Employee service listening on {address} ({self.workers} database threads)")
+            if ready:
+                ready.set()
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=True)
+            for db in self._databases:
+                db.close()
+            self._databases = []
+
+    def run(self, host=None, port=None, socket_path=None):
+        """Блокирующий запуск сервиса (остановка - Ctrl+C)"""
+        start_time = time.perf_counter()
+        try:
+            asyncio.run(self.serve(host, port, socket_path))
+        except KeyboardInterrupt:
+            pass
+        print(f"Employee service stopped after {time.perf_counter() - start_time:.0f} seconds, "
+              f"{METRICS.counters.get('service_requests', 0):,} requests, "
+              f"{METRICS.counters.get('service_coalesced', 0):,} coalesced")
@@ -0,0 +1,305 @@
+import heapq
+import os
+import queue
+import sqlite3
+import time
+import zlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from config import DatabaseConfig
+from database import EmployeeDatabase
+from employee import Employee
+
+PARTITIONS = ('hash', 'initial')
+
+# Процессы запускаются через spawn: дочерний процесс не наследует открытые
+# в родителе соединения SQLite (их нельзя использовать после fork)
+_context = get_context('spawn')
+
+# Соединения процесса пула координатора: по одному на файл шарда
+_worker_databases = {}
+
+
+def shard_paths(count=None, directory=None, template=None) -> list:
+    """Пути файлов шардов"""
+    count = count or DatabaseConfig.SHARD_COUNT
+    template = template or DatabaseConfig.SHARD_PATH_TEMPLATE
+    return [os.path.join(directory or '', template.format(index=index)) for index in range(count)]
+
+
+class ShardRouter:
+    """Выбор шарда для сотрудника.
+
+    hash - crc32 от (ФИО, дата рождения) по модулю числа шардов: равномерное
+    распределение, но запросы по префиксу фамилии идут во все шарды.
+    initial - диапазоны первой буквы ФИО (A-Z делится на равные части):
+    шарды упорядочены, запросы по префиксу фамилии идут в один шард, но
+    распределение зависит от частоты фамилий.
+    """
+
+    def __init__(self, count, partition='hash'):
+        if partition not in PARTITIONS:
+            raise ValueError(f"partition must be one of: {', '.join(PARTITIONS)}")
+        self.count = count
+        self.partition = partition
+        # Нижние границы шардов 1..count-1 по первой букве
+        self.boundaries = [chr(ord('A') + 26 * index // count) for index in range(1, count)]
+
+    def shard_for(self, full_name, birth_date) -> int:
+        if self.partition == 'initial':
+            return bisect_right(self.boundaries, full_name[:1])
+        return zlib.crc32(f"{full_name}\x1f{birth_date}".encode('utf-8')) % self.count
+
+    def split(self, rows) -> list:
+        """Раскладывает порцию кортежей (full_name, birth_date, gender) по шардам"""
+        parts = [[] for _ in range(self.count)]
+        appends = [part.append for part in parts]
+        if self.partition == 'initial':
+            boundaries = self.boundaries
+            for row in rows:
+                appends[bisect_right(boundaries, row[0][:1])](row)
+        else:
+            crc32 = zlib.crc32
+            count = self.count
+            for row in rows:
+                appends[crc32(f"{row[0]}\x1f{row[1]}".encode('utf-8')) % count](row)
+        return parts
+
+    def shards_for_prefix(self, prefix) -> list:
+        """Шарды, в которых могут быть ФИО с заданным префиксом"""
+        if self.partition == 'initial' and prefix:
+            return [bisect_right(self.boundaries, prefix[:1])]
+        return list(range(self.count))
+
+
+# --- Функции процессов (выполняются в пуле координатора или загрузчиках) ---
+
+def _shard_db(path):
+    db = _worker_databases.get(path)
+    if db is None:
+        db = _worker_databases[path] = EmployeeDatabase(path, read_only=True)
+    return db
+
+
+def _males_f(path):
+    employees, execution_time = _shard_db(path).get_males_with_f_surname(use_cache=False)
+    return [(emp.full_name, emp.birth_date, emp.gender) for emp in employees], execution_time
+
+
+def _sorted_page(path, after, limit):
+    return _shard_db(path).sorted_page(after, limit)
+
+
+def _count(path):
+    return _shard_db(path).count_employees()
+
+
+def _load_shard(path, chunks, results, options):
+    """Загрузчик одного шарда: пишет порции из очереди до None"""
+    finished = []
+
+    def read_chunks():
+        yield from iter(chunks.get, None)
+        finished.append(True)
+
+    db = EmployeeDatabase(path)
+    stats = {}
+    try:
+        ok = db.bulk_load_chunks(read_chunks(), stats=stats, **options)
+        # После ошибки очередь дочитывается, чтобы координатор не заблокировался
+        if not finished:
+            for _ in iter(chunks.get, None):
+                pass
+        results.put((path, ok, stats))
+    finally:
+        db.close()
+        DatabaseConfig.close_pools()
+
+
+class ShardedDatabase:
+    """Координатор набора файлов SQLite с одной схемой employees.
+
+    Запись: порции раскладываются по шардам (ShardRouter) и пишутся
+    параллельно - у каждого шарда свой процесс-загрузчик и своя очередь.
+    Чтение: запрос рассылается в пул процессов, у каждого процесса по
+    соединению на шард; результаты объединяются, упорядоченный список -
+    k-way слиянием (heapq.merge) постраничных keyset-выборок шардов.
+    """
+
+    LAYOUT_TABLE = 'shard_layout'
+
+    def __init__(self, paths=None, partition=None, workers=None, page_size=None):
+        self.paths = paths or shard_paths()
+        self.router = ShardRouter(len(self.paths), partition or DatabaseConfig.SHARD_PARTITION)
+        self.workers = workers or DatabaseConfig.SHARD_WORKERS or min(len(self.paths), os.cpu_count() or 1)
+        self.page_size = page_size or DatabaseConfig.SHARD_PAGE_SIZE
+        self.executor = None
+
+    def _pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_context)
+        return self.executor
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    # --- Схема и раскладка ---
+
+    def create_tables(self) -> bool:
+        """Создает таблицу employees в каждом шарде и записывает раскладку"""
+        for index, path in enumerate(self.paths):
+            db = EmployeeDatabase(path)
+            try:
+                if not db.is_connected() or not db.create_table():
+                    return False
+                db.connection.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.LAYOUT_TABLE} (
+                        shard_index INTEGER NOT NULL,
+                        shard_count INTEGER NOT NULL,
+                        partition TEXT NOT NULL
+                    )
+                """)
+                db.connection.execute(f"DELETE FROM {self.LAYOUT_TABLE}")
+                db.connection.execute(f"INSERT INTO {self.LAYOUT_TABLE} VALUES (?, ?, ?)",
+                                      (index, self.router.count, self.router.partition))
+                db.connection.commit()
+            finally:
+                db.close()
+        return True
+
+    def check_layout(self) -> list:
+        """Ошибки раскладки: отсутствующие файлы, другое число шардов или разбиение"""
+        errors = []
+        for index, path in enumerate(self.paths):
+            if not os.path.exists(path):
+                errors.append(f"{path}: file not found")
+                continue
+            db = EmployeeDatabase(path, read_only=True)
+            try:
+                if not db.is_connected():
+                    errors.append(f"{path}: cannot open")
+                    continue
+                row = db.connection.execute(f"SELECT * FROM {self.LAYOUT_TABLE}").fetchone()
+            except sqlite3.Error as e:
+                errors.append(f"{path}: {e}")
+                continue
+            finally:
+                db.close()
+            expected = (index, self.router.count, self.router.partition)
+            if row is None or tuple(row) != expected:
+                errors.append(f"{path}: layout {tuple(row) if row else None}, expected {expected}")
+        return errors
+
+    # --- Запись ---
+
+    def _put(self, chunks, item, process):
+        """Кладет порцию в очередь загрузчика, пока он жив"""
+        while True:
+            try:
+                chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not process.is_alive():
+                    raise RuntimeError(f"Shard loader {process.name} exited unexpectedly")
+
+    def bulk_load(self, chunks, dedup=False, upsert=False, queue_size=4) -> dict:
+        """Параллельная загрузка порций во все шарды.
+
+        Возвращает сводку: rows/inserted/updated/duplicates по всем шардам,
+        время загрузки и счетчики каждого шарда.
+        """
+        options = {'dedup': dedup, 'upsert': upsert}
+        results = _context.Queue()
+        queues = []
+        processes = []
+        start_time = time.perf_counter()
+        for index, path in enumerate(self.paths):
+            shard_queue = _context.Queue(maxsize=queue_size)
+            process = _context.Process(target=_load_shard, args=(path, shard_queue, results, options),
+                                       name=f"shard-{index}")
+            process.start()
+            queues.append(shard_queue)
+            processes.append(process)
+
+        try:
+            for chunk in chunks:
+                for index, part in enumerate(self.router.split(chunk)):
+                    if part:
+                        self._put(queues[index], part, processes[index])
+        except RuntimeError as e:
+            print(f"Error in sharded load: {e}")
+        finally:
+            for shard_queue, process in zip(queues, processes):
+                if process.is_alive():
+                    self._put(shard_queue, None, process)
+
+        # Итоги загрузчиков; аварийно завершившийся загрузчик итога не присылает
+        shards = {}
+        while len(shards) < len(processes):
+            try:
+                path, ok, stats = results.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            shards[path] = dict(stats, ok=ok)
+        for process in processes:
+            process.join()
+
+        summary = {name: sum(stats.get(name, 0) for stats in shards.values())
+                   for name in ('rows', 'inserted', 'updated', 'duplicates')}
+        summary['ok'] = len(shards) == len(self.paths) and all(stats['ok'] for stats in shards.values())
+        summary['load_time'] = time.perf_counter() - start_time
+        summary['shards'] = shards
+        return summary
+
+    # --- Чтение ---
+
+    def counts(self) -> list:
+        """Число записей в каждом шарде"""
+        return list(self._pool().map(_count, self.paths))
+
+    def get_males_with_f_surname(self) -> tuple:
+        """Мужчины с фамилией на F из всех (или только подходящих) шардов"""
+        start_time = time.perf_counter()
+        paths = [self.paths[index] for index in self.router.shards_for_prefix('F')]
+        employees = []
+        for rows, _ in self._pool().map(_males_f, paths):
+            employees.extend(Employee(*row) for row in rows)
+        return employees, time.perf_counter() - start_time
+
+    def _shard_pages(self, path, page_size, future):
+        """Строки одного шарда по порядку; следующая страница запрашивается заранее"""
+        pool = self._pool()
+        while True:
+            rows = future.result()
+            if len(rows) == page_size:
+                future = pool.submit(_sorted_page, path, tuple(rows[-1][:2]), page_size)
+            yield from rows
+            if len(rows) < page_size:
+                return
+
+    def iter_employees_sorted(self, limit=None):
+        """Все сотрудники по порядку (ФИО, дата рождения): k-way слияние шардов.
+
+        Ключ (ФИО, дата рождения) уникален и живет ровно в одном шарде, поэтому
+        кортежи строк сравниваются без отдельной функции ключа. Ошибка чтения
+        любого шарда (sqlite3.Error) прерывает слияние и передается вызывающему.
+        """
+        # Как EmployeeDatabase.iter_employees_sorted: limit <= 0 - пустой результат
+        # (страница LIMIT 0 пуста, и следующий ключ взять неоткуда)
+        if limit is not None and limit <= 0:
+            return
+        page_size = self.page_size if limit is None else min(self.page_size, limit)
+        # Первые страницы всех шардов запрашиваются одновременно
+        futures = [self._pool().submit(_sorted_page, path, None, page_size) for path in self.paths]
+        merged = heapq.merge(*(self._shard_pages(path, page_size, future)
+                               for path, future in zip(self.paths, futures)))
+        for count, row in enumerate(merged):
+            if limit is not None and count >= limit:
+                break
+            yield Employee(*row)
@@ -0,0 +1,225 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from config import DatabaseConfig
+from database import EmployeeDatabase
+from metrics import METRICS, InstrumentedConnection
+
+# Номера копий: каждая копия - отдельная БД в памяти со своим именем
+_copy_numbers = itertools.count(1)
+
+
+class SharedSnapshot:
+    """Копия файла БД в памяти, общая для всех соединений процесса.
+
+    Копия - именованная БД в памяти с общим кэшем
+    (file:...?mode=memory&cache=shared): соединения потоков открываются к
+    одной копии, и страницы хранятся в памяти один раз, а не в каждом
+    потоке. Соединение с файлом (source) нужно только для backup и
+    PRAGMA data_version: не чаще раза в check_interval секунд файл
+    проверяется, и при изменении новая копия строится одним потоком под
+    новым именем. Соединения переключаются на нее при следующем обращении,
+    старая копия освобождается SQLite, когда закрыто последнее соединение
+    с ней. Один экземпляр на файл: acquire/release со счетчиком
+    пользователей, после release последнего пользователя копия удаляется.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path, check_interval):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self.users = 0
+        self.pool = DatabaseConfig.get_pool(db_path, read_only=True)
+        self.source = self.pool.acquire()
+        self.uri = None
+        self.source_version = None
+        self.generation = 0
+        self.reloads = 0
+        self.load_time = 0.0
+        # Соединение, удерживающее текущую копию (БД в памяти живет, пока к ней открыто соединение)
+        self._anchor = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, db_path=None, check_interval=None):
+        """Общая копия файла db_path (создается при первом обращении)"""
+        db_path = db_path or DatabaseConfig.DB_PATH
+        key = os.path.abspath(db_path)
+        with cls._instances_lock:
+            shared = cls._instances.get(key)
+            if shared is None:
+                interval = DatabaseConfig.SNAPSHOT_CHECK_INTERVAL if check_interval is None else check_interval
+                shared = cls._instances[key] = cls(db_path, interval)
+            shared.users += 1
+        return shared
+
+    def release(self):
+        """Отказ от копии; после последнего пользователя копия и source закрываются"""
+        with self._instances_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            key = os.path.abspath(self.db_path)
+            if self._instances.get(key) is self:
+                del self._instances[key]
+        with self._lock:
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+            self.pool.release(self.source)
+            self.source = None
+
+    def _reload(self) -> bool:
+        """Строит новую копию под новым именем и делает ее текущей (под self._lock)"""
+        uri = f"file:employee-snapshot-{os.getpid()}-{next(_copy_numbers)}?mode=memory&cache=shared"
+        anchor = None
+        try:
+            start_time = time.perf_counter()
+            version = self.source.execute("PRAGMA data_version").fetchone()[0]
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            # Одна транзакция чтения - согласованный снимок
+            self.source.backup(anchor)
+        except sqlite3.Error as e:
+            print(f"Error loading snapshot: {e}")
+            if anchor is not None:
+                anchor.close()
+            return False
+        self.load_time = time.perf_counter() - start_time
+
+        # Соединения, еще открытые к старой копии, удерживают ее до переключения
+        if self._anchor is not None:
+            self._anchor.close()
+        self._anchor = anchor
+        self.uri = uri
+        self.source_version = version
+        self.generation += 1
+        self.reloads += 1
+        METRICS.inc('snapshot_loads')
+        METRICS.observe('snapshot_load', self.load_time)
+        return True
+
+    def refresh(self) -> bool:
+        """Строит копию, если ее нет или файл изменился; True - построена новая копия"""
+        if self._anchor is not None and time.monotonic() < self._next_check:
+            return False
+        with self._lock:
+            # Проверку мог уже выполнить другой поток
+            if self.source is None or (self._anchor is not None and time.monotonic() < self._next_check):
+                return False
+            self._next_check = time.monotonic() + self.check_interval
+            if self._anchor is None:
+                return self._reload()
+            try:
+                version = self.source.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Error checking snapshot version: {e}")
+                return False
+            if version == self.source_version:
+                return False
+            return self._reload()
+
+    def connect(self) -> tuple:
+        """Новое соединение с текущей копией (только чтение) и номер копии"""
+        # Под блокировкой: копия не может быть подменена и освобождена до подключения
+        with self._lock:
+            if self._anchor is None:
+                return None, self.generation
+            conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False, factory=InstrumentedConnection)
+            generation = self.generation
+        conn.row_factory = sqlite3.Row
+        for name, value in DatabaseConfig.CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.execute("PRAGMA query_only = ON")
+        return conn, generation
+
+    def snapshot_bytes(self) -> int:
+        """Размер копии в памяти"""
+        with self._lock:
+            if self._anchor is None:
+                return 0
+            page_count = self._anchor.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._anchor.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+
+class SnapshotDatabase(EmployeeDatabase):
+    """EmployeeDatabase, читающая из общей копии БД в памяти (SharedSnapshot).
+
+    Все пути чтения EmployeeDatabase работают с соединением к копии (без
+    обращений к диску и без блокировок файла); копия доступна только для
+    чтения (PRAGMA query_only). Экземпляры в разных потоках (например,
+    потоки сервиса) используют одну копию на процесс: у каждого свое
+    соединение, но данные в памяти хранятся один раз. После перестроения
+    копии экземпляр переключается на новую при следующем обращении -
+    запросы видят либо старые, либо новые данные.
+    """
+
+    def __init__(self, db_path=None, check_interval=None):
+        self._snapshot = None
+        self.source = None
+        self.generation = 0
+        self.shared = SharedSnapshot.acquire(db_path, check_interval)
+        # Соединение из пула (только чтение) становится source, см. setter connection;
+        # первое обращение к connection (is_connected) строит копию и подключается к ней
+        super().__init__(db_path, read_only=True)
+
+    @property
+    def connection(self):
+        shared = self.shared
+        if shared is None:
+            return self.source
+        shared.refresh()
+        if shared.generation != self.generation:
+            self._switch()
+        return self._snapshot if self._snapshot is not None else self.source
+
+    @connection.setter
+    def connection(self, conn):
+        self.source = conn
+
+    @property
+    def load_time(self) -> float:
+        return self.shared.load_time if self.shared else 0.0
+
+    @property
+    def reloads(self) -> int:
+        return self.shared.reloads if self.shared else 0
+
+    def _switch(self):
+        """Переключается на текущую копию"""
+        try:
+            snapshot, generation = self.shared.connect()
+        except sqlite3.Error as e:
+            print(f"Error opening snapshot: {e}")
+            return
+        if snapshot is None:
+            return
+        # Старое соединение не закрывается явно: курсоры, открытые на нем
+        # (потоковые генераторы), держат ссылку на соединение и дочитывают
+        # старую копию сколько угодно переключений спустя. Соединение
+        # закрывается, когда освобождается последняя ссылка на него, а вместе
+        # с ним SQLite освобождает и старую копию.
+        self._snapshot = snapshot
+        if self.generation:
+            self.invalidate_cache()
+        self.generation = generation
+
+    def snapshot_bytes(self) -> int:
+        """Размер копии в памяти"""
+        return self.shared.snapshot_bytes() if self.shared else 0
+
+    def close(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        if self.shared is not None:
+            self.shared.release()
+            self.shared = None
+        # Без копии connection возвращает source, и он возвращается в пул
+        super().close()
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import DatabaseConfig  # noqa: E402
+
+# Схема и индексы исходной версии: create_table с индексами по отдельным
+# столбцам и режим 6 с индексом-выражением idx_gender_surname
+BASELINE_SCHEMA = [
+    """
+    CREATE TABLE employees (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        full_name TEXT NOT NULL,
+        birth_date TEXT NOT NULL,
+        gender TEXT NOT NULL CHECK (gender IN ('Male', 'Female')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(full_name, birth_date)
+    )
+    """,
+    "CREATE INDEX idx_full_name ON employees (full_name)",
+    "CREATE INDEX idx_gender ON employees (gender)",
+    "CREATE INDEX idx_birth_date ON employees (birth_date)",
+    "CREATE INDEX idx_gender_surname ON employees (gender, substr(full_name, 1, 1))",
+    "CREATE INDEX idx_full_name_birth_date ON employees (full_name, birth_date)",
+    "CREATE INDEX idx_gender_full_name ON employees (gender, full_name)",
+]
+
+SAMPLE_ROWS = [
+    ('Fisher John Edward', '1969-05-29', 'Male'),
+    ('Fox Anna Petrovna', '1990-02-14', 'Female'),
+    ('Smith John Alexander', '1990-05-15', 'Male'),
+    ('Brown Mary Ann', '1985-11-30', 'Female'),
+    ('Garcia Luis Miguel', '1978-07-04', 'Male'),
+]
+
+
+@pytest.fixture(autouse=True)
+def close_pools():
+    yield
+    DatabaseConfig.close_pools()
+
+
+@pytest.fixture
+def baseline_path(tmp_path):
+    """Файл БД в том виде, в каком его оставляли режимы 1 и 6 исходной версии"""
+    path = str(tmp_path / 'employees.db')
+    conn = sqlite3.connect(path)
+    for sql in BASELINE_SCHEMA:
+        conn.execute(sql)
+    conn.executemany("INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)", SAMPLE_ROWS)
+    conn.commit()
+    conn.close()
+    return path
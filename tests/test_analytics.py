@@ -0,0 +1,50 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from analytics import EMPTY_INITIAL, EmployeeColumns  # noqa: E402
+from database import EmployeeDatabase  # noqa: E402
+
+
+@pytest.fixture
+def columns(baseline_path):
+    conn = sqlite3.connect(baseline_path)
+    conn.executemany("INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
+                     [('', '1990-01-01', 'Female'), ('Nobody Known', 'not a date', 'Male'),
+                      ('Future Kid', '2020-06-02', 'Male')])
+    conn.commit()
+    conn.close()
+    db = EmployeeDatabase(baseline_path)
+    yield EmployeeColumns.load(db)
+    db.close()
+
+
+def test_empty_name_is_loaded(columns):
+    assert len(columns) == 8
+    initials = columns.initial_counts()
+    assert initials[EMPTY_INITIAL] == 1
+    assert '\0' not in initials
+    assert initials['F'] == 3
+
+
+def test_aggregates(columns):
+    assert columns.gender_counts() == {'Female': 3, 'Male': 5}
+    ages = columns.ages(date(2020, 6, 1))
+    assert (ages == -1).sum() == 2
+    months = columns.birth_months_by_gender()
+    assert sum(months['Female']) + sum(months['Male']) == 7
+    assert months['excluded'] == {'invalid_date': 1}
+
+
+def test_age_histogram_reports_excluded_rows(columns):
+    histogram = columns.age_by_gender(date(2020, 6, 1))
+    assert sum(histogram['Female']) + sum(histogram['Male']) == 6
+    assert histogram['excluded'] == {'invalid_date': 1, 'future_date': 1}
+    # На следующий день родившийся входит в гистограмму с возрастом 0
+    histogram = columns.age_by_gender(date(2020, 6, 2))
+    assert histogram['buckets'][0] == (0, 9)
+    assert histogram['Male'][0] == 1
+    assert histogram['excluded'] == {'invalid_date': 1, 'future_date': 0}
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from benchmark import QueryBenchmark, SnapshotBenchmark, _percentile, _summary
+
+
+def test_percentile_interpolates():
+    values = [4, 1, 3, 2]
+    assert _percentile(values, 0) == 1
+    assert _percentile(values, 50) == 2.5
+    assert _percentile(values, 100) == 4
+    assert _percentile([], 95) == 0.0
+    assert _summary([2.0]) == {'min': 2.0, 'mean': 2.0, 'p50': 2.0, 'p95': 2.0, 'p99': 2.0, 'max': 2.0}
+
+
+@pytest.fixture
+def report(tmp_path):
+    benchmark = QueryBenchmark(sizes=(500,), repeat=2, warmup=1, data_dir=str(tmp_path), seed=1)
+    return benchmark.run()
+
+
+def test_every_query_is_measured_cold_and_warm(report):
+    results = report['results']
+    queries = {result['query'] for result in results}
+    assert {'sorted_listing', 'males_f_surname', 'table_count'} <= queries
+    assert len(results) == 2 * len(queries)
+    for result in results:
+        assert set(result['phases']) == set(QueryBenchmark.PHASES)
+        assert result['phases']['total']['p50'] >= result['phases']['execute']['p50']
+    listing = next(result for result in results if result['query'] == 'sorted_listing')
+    assert listing['rows'] == 600
+
+
+def test_report_is_saved_as_json(report, tmp_path):
+    path = tmp_path / 'bench.json'
+    QueryBenchmark.save(report, str(path))
+    assert json.loads(path.read_text())['meta']['repeat'] == 2
+
+
+def test_snapshot_benchmark_measures_concurrent_readers(tmp_path):
+    db_path = QueryBenchmark(data_dir=str(tmp_path), seed=1).prepare_database(500)
+    report = SnapshotBenchmark(db_path, repeat=2, warmup=1, threads=(1, 3)).run()
+    assert [item['threads'] for item in report['concurrent']] == [1, 3]
+    for item in report['concurrent']:
+        assert item['disk_qps'] > 0 and item['snapshot_qps'] > 0
+        assert item['snapshot']['p95'] >= item['snapshot']['p50']
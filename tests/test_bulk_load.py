@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+from indexes import IndexAdvisor
+
+NEW_ROWS = [
+    ('Lee Ann Mary', '2001-03-04', 'Female'),
+    ('Kim Yu Na', '1995-06-07', 'Female'),
+    ('Park Min Ho', '1988-10-10', 'Male'),
+]
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    assert IndexAdvisor(db).apply()
+    yield db
+    db.close()
+
+
+def rows(db):
+    return sorted(tuple(row) for row in db.connection.execute("SELECT full_name, birth_date, gender FROM employees"))
+
+
+def test_chunks_are_loaded_with_counts(db):
+    stats = {}
+    assert db.bulk_load_chunks(iter([NEW_ROWS[:2], NEW_ROWS[2:] + SAMPLE_ROWS[:1]]), stats=stats)
+    assert stats == {'rows': 4, 'inserted': 3, 'updated': 0, 'duplicates': 1}
+    assert rows(db) == sorted(SAMPLE_ROWS + NEW_ROWS)
+
+
+def test_dedup_spans_chunks(db):
+    stats = {}
+    chunks = [NEW_ROWS[:1], NEW_ROWS[:1] + NEW_ROWS[1:2]]
+    assert db.bulk_load_chunks(iter(chunks), dedup=True, stats=stats)
+    # Повтор из предыдущей порции отброшен в памяти и тоже учтен как duplicates
+    assert stats == {'rows': 3, 'inserted': 2, 'updated': 0, 'duplicates': 1}
+
+
+def test_upsert_counts_updates(db):
+    stats = {}
+    changed = ('Fox Anna Petrovna', '1990-02-14', 'Male')
+    unchanged = SAMPLE_ROWS[0]
+    assert db.bulk_load_chunks(iter([[changed, unchanged, NEW_ROWS[0]]]), upsert=True, stats=stats)
+    assert stats == {'rows': 3, 'inserted': 1, 'updated': 1, 'duplicates': 1}
+    assert changed in rows(db)
+
+
+@pytest.mark.parametrize('drop_indexes', [True, False])
+def test_indexes_are_kept_or_rebuilt(db, drop_indexes):
+    before = IndexAdvisor(db).existing_indexes()
+    assert db.bulk_load_chunks(iter([NEW_ROWS]), drop_indexes=drop_indexes)
+    assert IndexAdvisor(db).existing_indexes() == before
+
+
+def test_failed_chunk_keeps_committed_chunks_and_indexes(db):
+    before = IndexAdvisor(db).existing_indexes()
+
+    def chunks():
+        yield NEW_ROWS[:1]
+        yield [NEW_ROWS[1], ('Broken Row', '2000-01-01')]
+
+    # Ошибка во второй порции: она откатывается целиком, первая уже зафиксирована
+    assert not db.bulk_load_chunks(chunks(), drop_indexes=True)
+    assert NEW_ROWS[0] in rows(db)
+    assert len(rows(db)) == len(SAMPLE_ROWS) + 1
+    assert IndexAdvisor(db).existing_indexes() == before
+    assert not db.connection.in_transaction
+    with pytest.raises(sqlite3.IntegrityError):
+        db.connection.execute("INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
+                              SAMPLE_ROWS[0])
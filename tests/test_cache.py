@@ -0,0 +1,75 @@
+import json
+import pickle
+import sqlite3
+
+import pytest
+
+from cache import QueryCache
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+
+QUERY = "SELECT full_name, birth_date, gender FROM employees ORDER BY full_name"
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    yield db
+    db.close()
+
+
+def test_repeated_query_is_served_from_cache(db):
+    first = list(db.cached_rows(QUERY))
+    assert list(db.cached_rows(QUERY)) == first == sorted(SAMPLE_ROWS)
+    assert db.cache.hits == 1
+    assert db.cache.misses == 1
+
+
+def test_own_write_invalidates_cache(db):
+    list(db.cached_rows(QUERY))
+    assert db.bulk_insert_employees([('Lee Ann Mary', '2001-03-04', 'Female')])
+    assert len(list(db.cached_rows(QUERY))) == len(SAMPLE_ROWS) + 1
+    assert db.cache.invalidations == 1
+
+
+def test_write_from_other_connection_invalidates_cache(db, baseline_path):
+    list(db.cached_rows(QUERY))
+    # data_version меняется после фиксации транзакции другим соединением
+    conn = sqlite3.connect(baseline_path)
+    conn.execute("DELETE FROM employees WHERE full_name = 'Fox Anna Petrovna'")
+    conn.commit()
+    conn.close()
+    assert len(list(db.cached_rows(QUERY))) == len(SAMPLE_ROWS) - 1
+    assert db.cache.invalidations == 1
+
+
+def test_result_over_limit_is_not_collected(db, monkeypatch):
+    monkeypatch.setattr(db.cache, 'max_bytes', QueryCache.estimate_size(SAMPLE_ROWS[:2]))
+    put_calls = []
+    monkeypatch.setattr(db.cache, 'put', lambda *args: put_calls.append(args))
+    assert len(list(db.cached_rows(QUERY, batch_size=2))) == len(SAMPLE_ROWS)
+    # Накопление прекращено на второй порции - результат в кэш не передается
+    assert put_calls == []
+
+
+def test_cache_file_is_json_and_round_trips(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    cache = QueryCache(1024 * 1024, path)
+    key = QueryCache.make_key(QUERY, ('F', 10))
+    cache.put(key, 'v1', [('Fox Anna Petrovna', '1990-02-14', 'Female')])
+    assert cache.save(7, 'v1')
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['version'] == 7
+
+    loaded = QueryCache(1024 * 1024, path)
+    assert loaded.load(7, 'v2') == 1
+    assert loaded.get(key, 'v2') == [('Fox Anna Petrovna', '1990-02-14', 'Female')]
+    # Файл другой версии БД не загружается
+    assert QueryCache(1024 * 1024, path).load(8, 'v2') == 0
+
+
+def test_pickle_file_is_rejected(tmp_path, capsys):
+    path = tmp_path / 'cache.bin'
+    path.write_bytes(pickle.dumps((7, [])))
+    assert QueryCache(1024 * 1024, str(path)).load(7, 'v1') == 0
+    assert 'Error loading query cache' in capsys.readouterr().out
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, SAMPLE_ROWS
+from database import EmployeeDatabase
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    yield db
+    db.close()
+
+
+def run_main(cwd, *args, stdin=None):
+    result = subprocess.run([sys.executable, f"{ROOT}/main.py", *args], cwd=cwd, input=stdin,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'Traceback' not in result.stderr
+    return result.stdout
+
+
+def test_bulk_insert_counts(db):
+    stats = {}
+    rows = [
+        ('Lee Ann Mary', '2001-03-04', 'Female'),
+        ('Lee Ann Mary', '2001-03-04', 'Female'),
+        SAMPLE_ROWS[0],
+        ('Bad Date Row', '2001-02-30', 'Male'),
+    ]
+    assert db.bulk_insert_employees(rows, stats=stats)
+    assert stats == {'rows': 3, 'inserted': 1, 'updated': 0, 'duplicates': 2, 'rejected': 1}
+
+
+@pytest.mark.parametrize('probe', [False, True])
+def test_bulk_upsert_counts(db, probe):
+    stats = {}
+    rows = [('Fox Anna Petrovna', '1990-02-14', 'Male'), SAMPLE_ROWS[0], ('Lee Ann Mary', '2001-03-04', 'Female')]
+    assert db.bulk_insert_employees(rows, upsert=True, probe=probe, stats=stats)
+    assert stats == {'rows': 3, 'inserted': 1, 'updated': 1, 'duplicates': 1, 'rejected': 0}
+
+
+def test_mode_2_batch_from_stdin(baseline_path, tmp_path):
+    stdin = ("full_name,birth_date,gender\n"
+             "\"Doe, John\",1990-01-01,m\n"
+             "Lee Ann Mary,2001-03-04,жен\n"
+             "Lee Ann Mary,2001-03-04,Female\n"
+             "Fisher John Edward,1969-05-29,Male\n"
+             "Bad Gender,1990-01-01,x\n"
+             "too,few\n")
+    stdout = run_main(tmp_path, '2', '-', stdin=stdin)
+    assert 'Read 6 employees: inserted 2, updated 0, duplicates 2, rejected 2' in stdout
+
+    stdout = run_main(tmp_path, '2', '-', '--upsert', 'yes', stdin="\"Doe, John\",1990-01-01,f\n")
+    assert 'Read 1 employees: inserted 0, updated 1, duplicates 0, rejected 0' in stdout
+
+
+def test_help_mode_loads_no_database_modules(tmp_path):
+    code = ("import sys; sys.argv = ['main.py', 'help']; import main; main.main(); "
+            "print(sorted(name for name in ('sqlite3', 'database', 'config', 'generator') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True,
+                            timeout=60, env=dict(os.environ, PYTHONPATH=ROOT))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
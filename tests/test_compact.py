@@ -0,0 +1,38 @@
+import pytest
+
+from compact import CompactEmployeeDatabase, database_size
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+
+# Имя без отчества и фамилия - префикс другой фамилии
+EXTRA_ROWS = [
+    ('Fox Anna', '1980-01-01', 'Female'),
+    ('Foxworth Ivan Petrovich', '1960-02-29', 'Male'),
+    ('Fox Anna Petrovna', '1999-12-31', 'Female'),
+]
+ROWS = sorted(SAMPLE_ROWS + EXTRA_ROWS)
+
+
+@pytest.fixture
+def compact(baseline_path, tmp_path):
+    db = EmployeeDatabase(baseline_path)
+    assert db.bulk_insert_employees(EXTRA_ROWS)
+    db.close()
+    compact = CompactEmployeeDatabase(str(tmp_path / 'compact.db'))
+    assert compact.migrate_from(baseline_path, chunk_size=3)
+    yield compact
+    compact.close()
+
+
+def test_sorted_listing_matches_source_order(compact):
+    assert [emp.to_tuple() for emp in compact.iter_employees_sorted(batch_size=2)] == ROWS
+
+
+def test_males_with_f_surname(compact):
+    employees, _ = compact.get_males_with_f_surname()
+    assert sorted(emp.to_tuple() for emp in employees) == [
+        row for row in ROWS if row[0].startswith('F') and row[2] == 'Male']
+
+
+def test_compact_file_is_smaller(compact, baseline_path):
+    assert database_size(compact.db_path)['used_bytes'] <= database_size(baseline_path)['used_bytes']
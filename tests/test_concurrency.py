@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+
+import pytest
+
+import generator
+from config import DatabaseConfig
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+
+READERS = 4
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'employees.db')
+
+
+@pytest.fixture
+def db(db_path):
+    db = EmployeeDatabase(db_path)
+    db.create_table()
+    db.bulk_insert_employees(SAMPLE_ROWS)
+    yield db
+    db.close()
+
+
+def read_in_threads(db_path, sql, repeat=1):
+    """Выполняет sql в READERS потоках на соединениях только для чтения; [(ответы, ошибка)]"""
+    results = [None] * READERS
+
+    def reader(index):
+        try:
+            conn = DatabaseConfig.create_connection(db_path, read_only=True)
+            # Без ожидания: блокировка писателем сразу дает "database is locked"
+            conn.execute("PRAGMA busy_timeout = 0")
+            try:
+                results[index] = ([conn.execute(sql).fetchall() for _ in range(repeat)], None)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            results[index] = (None, str(e))
+
+    threads = [threading.Thread(target=reader, args=(index,)) for index in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return results
+
+
+def test_database_uses_wal(db):
+    assert db.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+
+def test_readers_finish_while_write_transaction_is_open(db, db_path):
+    cursor = db.connection.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute(db.INSERT_QUERY, ('Fox Ivan Ivanovich', '1980-01-01', 'Male'))
+    try:
+        results = read_in_threads(db_path, "SELECT COUNT(*) FROM employees", repeat=10)
+        assert db.connection.in_transaction
+    finally:
+        db.connection.commit()
+
+    for answers, error in results:
+        assert error is None
+        # Незафиксированная строка писателя не видна
+        assert [rows[0][0] for rows in answers] == [len(SAMPLE_ROWS)] * 10
+
+
+def test_readers_keep_indexes_during_bulk_load(db, db_path):
+    data = generator.TestDataGenerator(record_count=20000, f_surname_count=10, seed=1, chunk_size=2000)
+    during_load = []
+
+    def chunks():
+        for index, chunk in enumerate(data.iter_chunks()):
+            if index == 3:
+                # Загрузка идет: предыдущие порции зафиксированы, индексы на месте
+                during_load.append(read_in_threads(db_path, "EXPLAIN QUERY PLAN " + db.MALES_F_SURNAME_QUERY))
+                during_load.append(read_in_threads(db_path, db.MALES_F_SURNAME_QUERY))
+            yield chunk
+
+    assert db.bulk_load_chunks(chunks())
+
+    plans, answers = during_load
+    for (plan,), error in plans:
+        assert error is None
+        # Объявленный индекс, а не только индекс UNIQUE
+        assert any(name in row['detail'] for row in plan for name in EmployeeDatabase.INDEXES)
+    for result, error in answers:
+        assert error is None
+        assert result[0]
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+import pytest
+
+from config import DatabaseConfig
+from database import EmployeeDatabase
+
+
+def test_pool_reuses_released_connection(baseline_path):
+    pool = DatabaseConfig.get_pool(baseline_path)
+    assert DatabaseConfig.get_pool(baseline_path) is pool
+    first = EmployeeDatabase(baseline_path)
+    conn = first.connection
+    first.close()
+    second = EmployeeDatabase(baseline_path)
+    try:
+        assert second.connection is conn
+        assert second.ping()
+    finally:
+        second.close()
+
+
+def test_open_transaction_is_not_handed_to_next_owner(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    db.connection.execute("DELETE FROM employees")
+    assert db.connection.in_transaction
+    db.close()
+    db = EmployeeDatabase(baseline_path)
+    try:
+        assert not db.connection.in_transaction
+        assert db.count_employees() == 5
+    finally:
+        db.close()
+
+
+def test_pool_keeps_at_most_size_idle_connections(baseline_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, 'POOL_SIZE', 2)
+    pool = DatabaseConfig.get_pool(baseline_path)
+    connections = [pool.acquire() for _ in range(3)]
+    for conn in connections:
+        pool.release(conn)
+    # Третье соединение закрыто при возврате
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[2].execute("SELECT 1")
+    assert {id(pool.acquire()), id(pool.acquire())} == {id(conn) for conn in connections[:2]}
+
+
+def test_read_only_connection_rejects_writes(baseline_path):
+    db = EmployeeDatabase(baseline_path, read_only=True)
+    try:
+        assert db.count_employees() == 5
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            db.connection.execute("DELETE FROM employees")
+    finally:
+        db.close()
+
+
+def test_thread_connections_are_per_thread(baseline_path):
+    pool = DatabaseConfig.get_pool(baseline_path, read_only=True)
+    seen = []
+
+    def reader():
+        conn = pool.thread_connection()
+        assert pool.thread_connection() is conn
+        seen.append((id(conn), conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]))
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({conn_id for conn_id, _ in seen}) == 3
+    assert [count for _, count in seen] == [5] * 3
+
+
+def test_connection_pragmas_are_applied(baseline_path):
+    conn = DatabaseConfig.create_connection(baseline_path)
+    try:
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == DatabaseConfig.CONNECTION_PRAGMAS['cache_size']
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    finally:
+        conn.close()
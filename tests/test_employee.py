@@ -0,0 +1,59 @@
+from datetime import date
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+from employee import Employee, EmployeeBatch, age_on, calculate_ages
+
+TODAY = date(2024, 5, 15)
+
+
+def test_age_on_birthday_boundary():
+    assert age_on('1990-05-15', TODAY) == 34
+    assert age_on('1990-05-16', TODAY) == 33
+    assert age_on('2000-02-29', date(2024, 2, 28)) == 23
+
+
+def test_calculate_ages_matches_age_on():
+    dates = ['1990-05-15', '1969-05-29', '1990-05-15', '2000-12-31']
+    assert calculate_ages(dates, TODAY) == [age_on(value, TODAY) for value in dates]
+
+
+def test_calculate_ages_memo_and_invalid_dates(capsys):
+    memo = {}
+    assert calculate_ages(['1990-05-15', 'bad', 'bad'], TODAY, memo) == [34, 0, 0]
+    assert memo == {'1990-05-15': 34, 'bad': 0}
+    # Ошибка печатается один раз на дату
+    assert capsys.readouterr().out.count('Error calculating age') == 1
+
+
+def test_employee_calculate_age():
+    assert Employee('Smith John Alexander', '1990-05-15', 'Male').calculate_age(TODAY) == 34
+
+
+def test_batch_columns():
+    batch = EmployeeBatch.from_rows(SAMPLE_ROWS[:2])
+    batch.extend(SAMPLE_ROWS[2:])
+    batch.extend([])
+    assert len(batch) == 5
+    assert batch.full_names == [row[0] for row in SAMPLE_ROWS]
+    assert list(batch.genders) == [1, 0, 1, 0, 1]
+    employee = batch[1]
+    assert (employee.full_name, employee.birth_date, employee.gender) == SAMPLE_ROWS[1]
+    assert [emp.gender for emp in batch[3:]] == ['Female', 'Male']
+    assert batch.ages(TODAY) == calculate_ages([row[1] for row in SAMPLE_ROWS], TODAY)
+
+
+def test_batch_shares_equal_dates():
+    batch = EmployeeBatch.from_rows([('A B C', ''.join(['1990-', '01-01']), 'Male'),
+                                     ('D E F', ''.join(['1990-0', '1-01']), 'Female')])
+    assert batch.birth_dates[0] is batch.birth_dates[1]
+
+
+def test_get_all_employees_sorted_returns_batch(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    try:
+        batch = db.get_all_employees_sorted(chunk_size=2)
+    finally:
+        db.close()
+    assert isinstance(batch, EmployeeBatch)
+    assert [(emp.full_name, emp.birth_date, emp.gender) for emp in batch] == sorted(SAMPLE_ROWS)
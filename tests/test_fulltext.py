@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    assert db.create_fulltext_index()
+    yield db
+    db.close()
+
+
+def names(db, query, **kwargs):
+    return sorted(emp.full_name for emp in db.search_name(query, **kwargs))
+
+
+@pytest.mark.parametrize('query', ['ohn', 'John', 'ary An', 'Petrovna', 'xyz', '100%', 'a_b', 'Fo'])
+def test_fulltext_matches_like_scan(db, query):
+    expected = sorted(row[0] for row in SAMPLE_ROWS if query in row[0])
+    assert names(db, query) == expected
+    assert names(db, query, use_fulltext=False) == expected
+
+
+def test_fulltext_query_uses_index(db):
+    sql, params = db.build_name_query('ohn Al')
+    assert db.FTS_TABLE in sql
+    assert params == ('"ohn Al"',)
+    # Короче трех символов trigram не ищет - запрос идет просмотром LIKE
+    sql, params = db.build_name_query('Fo')
+    assert 'LIKE' in sql
+
+
+def test_triggers_keep_index_in_sync(db):
+    assert db.bulk_insert_employees([('Ohnson Lee Mary', '2001-03-04', 'Female')])
+    assert names(db, 'ohns') == ['Ohnson Lee Mary']
+    db.connection.execute("UPDATE employees SET full_name = 'Brown Mary Beth' WHERE full_name = 'Brown Mary Ann'")
+    db.connection.execute("DELETE FROM employees WHERE full_name = 'Ohnson Lee Mary'")
+    db.connection.commit()
+    assert names(db, 'ohns') == []
+    assert names(db, 'Mary B') == ['Brown Mary Beth']
+    assert names(db, 'Mary Ann') == []
+
+
+def test_bulk_load_rebuilds_index(db):
+    assert db.bulk_load_chunks(iter([[('Quinn Ohnny Lee', '1999-01-01', 'Male')]]), drop_indexes=True)
+    assert set(db.FTS_TRIGGERS) <= {row[0] for row in db.connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert names(db, 'Ohnny') == ['Quinn Ohnny Lee']
+
+
+def test_limit(db):
+    assert len(names(db, 'o', limit=2)) == 2
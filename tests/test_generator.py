@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+import generator
+
+
+def make(**kwargs):
+    options = dict(record_count=1000, f_surname_count=25, seed=7, chunk_size=300)
+    options.update(kwargs)
+    return generator.TestDataGenerator(**options)
+
+
+def flatten(chunks):
+    return [row for chunk in chunks for row in chunk]
+
+
+def test_chunks_cover_requested_counts():
+    data = make()
+    chunks = list(data.iter_chunks())
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100, 25]
+    special = chunks[-1]
+    assert all(row[0].startswith('F') and row[2] == 'Male' for row in special)
+
+
+def test_same_seed_gives_same_rows():
+    assert flatten(make().iter_chunks()) == flatten(make().iter_chunks())
+    assert flatten(make().iter_chunks()) != flatten(make(seed=8).iter_chunks())
+
+
+def test_chunk_is_independent_of_generation_order():
+    data = make()
+    specs = data.chunk_specs()
+    in_order = [data.generate_chunk(spec) for spec in specs]
+    assert [make().generate_chunk(spec) for spec in reversed(specs)] == in_order[::-1]
+
+
+def test_genders_alternate_across_chunks():
+    rows = flatten(make(chunk_size=7, f_surname_count=0).iter_chunks())
+    assert [row[2] for row in rows] == ['Male', 'Female'] * 500
+
+
+def test_dates_stay_in_range():
+    rows = flatten(make(start_date=date(2000, 1, 1), end_date=date(2000, 1, 31)).iter_chunks())
+    assert {row[1][:8] for row in rows} == {'2000-01-'}
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_parallel_chunks_match_sequential(workers):
+    data = make()
+    assert list(data.iter_chunks_parallel(workers=workers, queue_size=2)) == list(data.iter_chunks())
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from database import EmployeeDatabase
+from indexes import EXPRESSION, IndexAdvisor
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    yield db
+    db.close()
+
+
+def index_names(db):
+    return set(IndexAdvisor(db).existing_indexes())
+
+
+def test_expression_columns_are_marked(db):
+    indexes = IndexAdvisor(db).existing_indexes()
+    assert indexes['idx_gender_surname']['columns'] == ('gender', EXPRESSION)
+
+
+def test_expression_index_is_not_redundant(db):
+    indexes = IndexAdvisor(db).existing_indexes()
+    assert IndexAdvisor.redundant_with('idx_gender_surname', indexes) is None
+    # Столбцы (gender) - префикс других индексов, в том числе с выражением
+    assert IndexAdvisor.redundant_with('idx_gender', indexes) is not None
+
+
+@pytest.mark.parametrize('measure', [False, True])
+def test_status_on_baseline_database(db, measure):
+    report = {item['name']: item for item in IndexAdvisor(db, sample_size=100).status(measure=measure)}
+    expression = report['idx_gender_surname']
+    assert expression['state'] == 'extra'
+    assert expression['write_cost_us'] is None
+    if measure:
+        assert report['idx_birth_date']['write_cost_us'] is not None
+
+
+def test_apply_on_baseline_database(db):
+    assert IndexAdvisor(db).apply()
+    names = index_names(db)
+    assert set(EmployeeDatabase.INDEXES) <= names
+    assert 'idx_gender_surname' not in names
+    assert 'idx_gender' not in names
+
+
+def test_apply_rolls_back_on_error(db):
+    before = index_names(db)
+    db.INDEXES = dict(EmployeeDatabase.INDEXES, idx_broken=('no_such_column',))
+    assert not IndexAdvisor(db).apply()
+    assert index_names(db) == before
+
+
+def test_mode_6_on_baseline_database(baseline_path, tmp_path):
+    result = subprocess.run([sys.executable, f"{ROOT}/main.py", '6'], cwd=tmp_path,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'Traceback' not in result.stderr
+    assert 'Dropped index: idx_gender_surname (gender, <expr>)' in result.stdout
+
+
+def test_covering_index_overlaps_unique_constraint(db):
+    assert IndexAdvisor(db).apply()
+    report = {item['name']: item for item in IndexAdvisor(db).status(measure=False)}
+    constraint = next(name for name, item in report.items() if item['constraint'])
+    # Столбцы ограничения (full_name, birth_date) - префикс покрывающего индекса
+    assert report[EmployeeDatabase.COVERING_INDEX]['overlaps_with'] == [constraint]
+    assert report[constraint]['overlaps_with'] == [EmployeeDatabase.COVERING_INDEX]
+    assert report['idx_gender_name_covering']['overlaps_with'] == []
+    assert report[EmployeeDatabase.COVERING_INDEX]['state'] == 'ok'
@@ -0,0 +1,94 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, SAMPLE_ROWS
+from database import EmployeeDatabase
+
+# Однофамильцы с одинаковым ФИО: порядок внутри имени - по дате рождения
+NAMESAKES = [
+    ('Fox Anna Petrovna', '1975-08-01', 'Female'),
+    ('Fox Anna Petrovna', '2000-12-24', 'Female'),
+]
+ROWS = sorted(SAMPLE_ROWS + NAMESAKES)
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    assert db.bulk_insert_employees(NAMESAKES)
+    yield db
+    db.close()
+
+
+def listing(db, **kwargs):
+    return [emp.to_tuple() for emp in db.iter_employees_sorted(use_cache=False, **kwargs)]
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 100])
+def test_pages_cover_table_in_order(db, page_size):
+    assert listing(db, page_size=page_size) == ROWS
+
+
+@pytest.mark.parametrize('offset, limit', [(0, 4), (1, 3), (3, 5), (6, 10), (7, 1)])
+def test_offset_applies_once_and_limit_spans_pages(db, offset, limit):
+    assert listing(db, offset=offset, limit=limit, page_size=2) == ROWS[offset:offset + limit]
+
+
+def test_limit_zero_is_empty(db):
+    assert listing(db, limit=0) == []
+
+
+def test_after_name_skips_all_namesakes(db):
+    start = ROWS.index(('Garcia Luis Miguel', '1978-07-04', 'Male'))
+    assert listing(db, after='Fox Anna Petrovna', page_size=1) == ROWS[start:]
+
+
+def test_after_key_continues_within_name(db):
+    start = ROWS.index(('Fox Anna Petrovna', '1990-02-14', 'Female'))
+    assert listing(db, after=('Fox Anna Petrovna', '1975-08-01'), page_size=2) == ROWS[start:]
+
+
+def test_second_page_uses_key_not_offset(db):
+    sql, params = db.sorted_page_query(('Fox Anna Petrovna', '1975-08-01'), 2)
+    assert '(full_name, birth_date) > (?, ?)' in sql
+    assert params[-1] == 0
+
+
+def test_mode_3_after_option(db, baseline_path, tmp_path):
+    result = subprocess.run([sys.executable, f"{ROOT}/main.py", '3', '--after', 'Fox Anna Petrovna|1990-02-14',
+                             '--limit', '2'], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    start = ROWS.index(('Fox Anna Petrovna', '2000-12-24', 'Female'))
+    for full_name, birth_date, _ in ROWS[start:start + 2]:
+        assert f"{full_name:<40} {birth_date}" in result.stdout
+    assert 'Total employees: 2' in result.stdout
+
+
+def test_listing_reads_covering_index_in_order(db):
+    from indexes import IndexAdvisor
+
+    assert IndexAdvisor(db).apply()
+    sql, params = db.sorted_page_query(('Fox Anna Petrovna', '1975-08-01'), 100)
+    plan = ' '.join(db.explain_query_plan(sql, params))
+    assert f"USING COVERING INDEX {db.COVERING_INDEX}" in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_listing_pragmas_are_restored(db):
+    from config import DatabaseConfig
+
+    before = {name: db.connection.execute(f"PRAGMA {name}").fetchone()[0] for name in DatabaseConfig.LISTING_PRAGMAS}
+    with db.temporary_pragmas(DatabaseConfig.LISTING_PRAGMAS):
+        assert db.connection.execute("PRAGMA cache_size").fetchone()[0] == DatabaseConfig.LISTING_PRAGMAS['cache_size']
+        assert listing(db, page_size=2) == ROWS
+    after = {name: db.connection.execute(f"PRAGMA {name}").fetchone()[0] for name in DatabaseConfig.LISTING_PRAGMAS}
+    assert after == before
+
+
+def test_unbounded_listing_is_not_cached(db):
+    list(db.iter_employees_sorted(use_cache=False))
+    assert db.cache.bytes == 0
+    list(db.iter_employees_sorted(limit=2))
+    assert db.cache.bytes > 0
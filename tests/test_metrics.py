@@ -0,0 +1,86 @@
+import io
+import json
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from metrics import LATENCY_BUCKETS, METRICS, InstrumentedConnection, MetricsRegistry, SlowStatementLog, timed
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def test_histogram_buckets_and_prometheus_text():
+    registry = MetricsRegistry()
+    registry.inc('rows_read', 3)
+    registry.observe('query', 0.0002)
+    registry.observe('query', 20.0)
+    snapshot = registry.snapshot()
+    assert snapshot['counters'] == {'rows_read': 3}
+    buckets = snapshot['operations']['query']['buckets']
+    assert buckets[str(LATENCY_BUCKETS[0])] == 1 and buckets['+Inf'] == 1
+    text = registry.to_prometheus()
+    assert 'employee_rows_read_total 3' in text
+    # Корзины Prometheus накопительные
+    assert 'employee_operation_seconds_bucket{operation="query",le="10.0"} 1' in text
+    assert 'employee_operation_seconds_bucket{operation="query",le="+Inf"} 2' in text
+    assert 'employee_operation_seconds_count{operation="query"} 2' in text
+
+
+def test_timed_measures_functions_and_generators():
+    @timed
+    def compute():
+        return 1
+
+    @timed
+    def stream():
+        yield from range(3)
+
+    assert compute() == 1
+    rows = stream()
+    assert METRICS.snapshot()['operations']['compute']['count'] == 1
+    assert 'stream' not in METRICS.snapshot()['operations']
+    assert list(rows) == [0, 1, 2]
+    assert METRICS.snapshot()['operations']['stream']['count'] == 1
+
+
+def test_commits_are_counted(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'm.db'), factory=InstrumentedConnection)
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    # Фиксация без открытой транзакции не учитывается
+    conn.commit()
+    conn.close()
+    assert METRICS.snapshot()['counters']['commits'] == 1
+
+
+def test_slow_statement_is_reported_once():
+    output = io.StringIO()
+    conn = sqlite3.connect(':memory:')
+    SlowStatementLog(0.0, steps=1000, output=output).attach(conn)
+    conn.execute("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000) "
+                 "SELECT COUNT(*) FROM n").fetchone()
+    conn.close()
+    assert output.getvalue().count('Slow statement') == 1
+    assert METRICS.snapshot()['counters']['slow_statements'] == 1
+
+
+@pytest.mark.parametrize('name', ['metrics.json', 'metrics.prom'])
+def test_metrics_output_option(baseline_path, tmp_path, name):
+    result = subprocess.run([sys.executable, f"{ROOT}/main.py", '5', '--metrics-output', name],
+                            cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    content = (tmp_path / name).read_text()
+    if name.endswith('.json'):
+        assert json.loads(content)['operations']['get_males_with_f_surname']['count'] >= 1
+    else:
+        assert 'employee_operation_seconds_count{operation="get_males_with_f_surname"}' in content
@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+from employee import age_on
+from indexes import IndexAdvisor
+
+# Мужчины на F, женщина на F и мужчина на G (граница диапазона 'F' <= ФИО < 'G')
+EXTRA_ROWS = [
+    ('Fuller James Daniel', '2001-01-01', 'Male'),
+    ('Fiona Grey Ann', '1999-09-09', 'Female'),
+    ('G Adams Lee', '1980-03-03', 'Male'),
+]
+ROWS = SAMPLE_ROWS + EXTRA_ROWS
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    assert db.bulk_insert_employees(EXTRA_ROWS)
+    assert IndexAdvisor(db).apply()
+    yield db
+    db.close()
+
+
+def test_males_with_f_surname(db):
+    employees, execution_time = db.get_males_with_f_surname(use_cache=False)
+    expected = [row for row in ROWS if row[0].startswith('F') and row[2] == 'Male']
+    assert sorted(emp.to_tuple() for emp in employees) == sorted(expected)
+    assert execution_time >= 0
+
+
+def test_males_with_f_surname_is_an_index_range_search(db):
+    plan = ' '.join(db.explain_query_plan(db.MALES_F_SURNAME_QUERY))
+    assert plan.startswith('SEARCH')
+    assert 'full_name>? AND full_name<?' in plan
+
+
+def search(db, **filters):
+    return [emp.to_tuple() for emp in db.search(**filters)]
+
+
+def test_search_filters_are_combined(db):
+    assert search(db, surname_prefix='F') == sorted(row for row in ROWS if row[0].startswith('F'))
+    assert search(db, surname_prefix='F', gender='Female') == [('Fiona Grey Ann', '1999-09-09', 'Female'),
+                                                                ('Fox Anna Petrovna', '1990-02-14', 'Female')]
+    assert search(db, born_from='1985-01-01', born_to='1990-05-15') == [
+        ('Brown Mary Ann', '1985-11-30', 'Female'),
+        ('Fox Anna Petrovna', '1990-02-14', 'Female'),
+        ('Smith John Alexander', '1990-05-15', 'Male'),
+    ]
+    assert search(db, gender='Male', limit=2) == sorted(row for row in ROWS if row[2] == 'Male')[:2]
+
+
+def test_age_range_matches_age_on(db):
+    today = date.today()
+    ages = {row: age_on(row[1], today) for row in ROWS}
+    low, high = sorted(ages.values())[2], sorted(ages.values())[-3]
+    expected = sorted(row for row, age in ages.items() if low <= age <= high)
+    assert search(db, age_min=low, age_max=high) == expected
+
+
+def test_search_stats(db):
+    stats = {}
+    assert len(search(db, gender='Female', stats=stats)) == stats['rows'] == 3
+    assert stats['total_time'] >= stats['execute_time'] >= 0
+
+
+@pytest.mark.parametrize('filters', [
+    {'surname_prefix': 'Sm'},
+    {'gender': 'Male'},
+    {'gender': 'Male', 'surname_prefix': 'F'},
+])
+def test_name_and_gender_filters_search_recommended_index(db, filters):
+    # Выбор индекса для диапазонов дат зависит от статистики ANALYZE, поэтому
+    # проверяются только фильтры, которые покрывающие индексы отдают по порядку
+    sql, params = db.build_search_query(**filters)
+    name, _ = db.recommend_search_index(**filters)
+    plan = ' '.join(db.explain_query_plan(sql, params))
+    assert plan.startswith(f"SEARCH employees USING COVERING INDEX {name}")
+    assert 'TEMP B-TREE' not in plan
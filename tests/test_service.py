@@ -0,0 +1,109 @@
+import asyncio
+import json
+import socket
+import sqlite3
+import threading
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from service import EmployeeService
+
+
+@pytest.fixture
+def service(baseline_path, tmp_path):
+    service = EmployeeService(db_path=baseline_path, workers=2, page_size=2)
+    socket_path = str(tmp_path / 'service.sock')
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    task = loop.create_task(service.serve(socket_path=socket_path, ready=ready))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert ready.wait(10)
+    yield service, socket_path
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(10)
+    loop.close()
+
+
+def send(socket_path, raw):
+    """Отправляет сырой запрос и читает ответ до закрытия соединения"""
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        sock.sendall(raw)
+        chunks = []
+        while True:
+            try:
+                data = sock.recv(65536)
+            except ConnectionResetError:
+                break
+            if not data:
+                break
+            chunks.append(data)
+    return b''.join(chunks)
+
+
+def get(socket_path, target, headers=''):
+    return send(socket_path, f"GET {target} HTTP/1.1\r\nHost: x\r\n{headers}Connection: close\r\n\r\n".encode())
+
+
+def dechunk(body):
+    """Тело chunked-ответа; None - нет завершающего фрагмента"""
+    data = b''
+    while body:
+        size, _, rest = body.partition(b'\r\n')
+        size = int(size, 16)
+        if size == 0:
+            return data
+        data += rest[:size]
+        body = rest[size + 2:]
+    return None
+
+
+def test_health(service):
+    _, socket_path = service
+    response = get(socket_path, '/health')
+    assert response.startswith(b'HTTP/1.1 200 OK')
+    assert json.loads(response.split(b'\r\n\r\n', 1)[1]) == {'status': 'ok'}
+
+
+def test_employees_stream_is_complete_and_sorted(service):
+    _, socket_path = service
+    head, body = get(socket_path, '/employees?offset=1&limit=3').split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    records = [json.loads(line) for line in dechunk(body).decode().splitlines()]
+    assert [record['full_name'] for record in records] == [row[0] for row in sorted(SAMPLE_ROWS)[1:4]]
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', '+5', '', '１２'])
+def test_invalid_content_length_is_bad_request(service, length):
+    _, socket_path = service
+    response = get(socket_path, '/health', f"Content-Length: {length}\r\n")
+    assert response.startswith(b'HTTP/1.1 400 Bad Request')
+    assert b'Invalid Content-Length' in response
+
+
+def test_error_after_headers_aborts_stream(service):
+    service, socket_path = service
+    pages = service._employees_page
+
+    def failing_page(after, offset, limit):
+        if after is not None:
+            raise sqlite3.OperationalError("disk I/O error")
+        return pages(after, offset, limit)
+
+    service._employees_page = failing_page
+    head, body = get(socket_path, '/employees').split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    # Первая страница отправлена, затем соединение оборвано без завершающего фрагмента
+    assert b'HTTP/1.1 500' not in body
+    assert dechunk(body) is None
+    assert body.count(b'full_name') == 2
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+from sharding import ShardedDatabase, shard_paths
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    sharded = ShardedDatabase(shard_paths(2, str(tmp_path)), 'hash', workers=1, page_size=2)
+    yield sharded
+    sharded.close()
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_sorted_listing_with_non_positive_limit(sharded, limit):
+    assert list(sharded.iter_employees_sorted(limit=limit)) == []
+    # Запросы к шардам не отправляются
+    assert sharded.executor is None
+
+
+def test_sorted_listing_merges_shards(sharded):
+    assert sharded.create_tables()
+    assert sharded.bulk_load([SAMPLE_ROWS])['ok']
+    expected = sorted(SAMPLE_ROWS)
+    listing = [(emp.full_name, emp.birth_date, emp.gender) for emp in sharded.iter_employees_sorted()]
+    assert listing == expected
+    limited = [emp.full_name for emp in sharded.iter_employees_sorted(limit=3)]
+    assert limited == [row[0] for row in expected[:3]]
+
+
+def test_failing_shard_aborts_sorted_listing(sharded):
+    assert sharded.create_tables()
+    assert sharded.bulk_load([SAMPLE_ROWS])['ok']
+    conn = sqlite3.connect(sharded.paths[1])
+    conn.execute("DROP TABLE employees")
+    conn.close()
+    # Ошибка шарда не должна выглядеть как исчерпанный шард
+    with pytest.raises(sqlite3.Error):
+        list(sharded.iter_employees_sorted())
+
+
+def test_sorted_page_raises_on_error(tmp_path):
+    db = EmployeeDatabase(str(tmp_path / 'empty.db'))
+    try:
+        with pytest.raises(sqlite3.Error):
+            db.sorted_page()
+    finally:
+        db.close()
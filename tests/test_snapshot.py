@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+
+import pytest
+
+from snapshot import SharedSnapshot, SnapshotDatabase
+
+
+@pytest.fixture
+def snapshots(baseline_path):
+    databases = []
+    threads = [threading.Thread(target=lambda: databases.append(SnapshotDatabase(baseline_path, check_interval=0)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    yield databases
+    for db in databases:
+        db.close()
+
+
+def count(db):
+    return db.connection.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+
+def test_threads_share_one_copy(snapshots):
+    assert len({id(db.shared) for db in snapshots}) == 1
+    assert snapshots[0].reloads == 1
+    assert [count(db) for db in snapshots] == [5] * 4
+
+
+def test_reload_is_seen_by_all_threads(snapshots, baseline_path):
+    conn = sqlite3.connect(baseline_path)
+    conn.execute("INSERT INTO employees (full_name, birth_date, gender) VALUES ('Lee Ann Mary', '2001-03-04', 'Female')")
+    conn.commit()
+    conn.close()
+    assert [count(db) for db in snapshots] == [6] * 4
+    assert snapshots[0].reloads == 2
+
+
+def test_copy_is_released_with_last_user(baseline_path):
+    first = SnapshotDatabase(baseline_path)
+    second = SnapshotDatabase(baseline_path)
+    first.close()
+    assert count(second) == 5
+    second.close()
+    assert SharedSnapshot._instances == {}
+
+
+def insert(path, *rows):
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_stream_survives_two_rebuilds(baseline_path):
+    db = SnapshotDatabase(baseline_path, check_interval=0)
+    try:
+        stream = db.cached_rows("SELECT full_name FROM employees ORDER BY full_name", use_cache=False, batch_size=1)
+        first = next(stream)
+        insert(baseline_path, ('Lee Ann Mary', '2001-03-04', 'Female'))
+        assert count(db) == 6
+        insert(baseline_path, ('Lee Bob Ivanovich', '1999-12-31', 'Male'))
+        assert count(db) == 7
+        assert db.reloads == 3
+        # Поток дочитывает копию, на которой начался
+        assert len([first, *stream]) == 5
+    finally:
+        db.close()
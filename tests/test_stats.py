@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    assert db.create_stats()
+    yield db
+    db.close()
+
+
+def test_stats_are_filled_from_table(db):
+    stats = db.get_stats()
+    assert stats['total'] == {'': 5}
+    assert stats['gender'] == {'Male': 3, 'Female': 2}
+    assert stats['initial'] == {'F': 2, 'S': 1, 'B': 1, 'G': 1}
+    assert db.check_stats() == []
+
+
+def test_triggers_follow_insert_update_delete(db):
+    assert db.bulk_insert_employees([('Lee Ann Mary', '2001-03-04', 'Female'), SAMPLE_ROWS[0]])
+    db.connection.execute("UPDATE employees SET gender = 'Female', full_name = 'Abbott Anna Maria' "
+                          "WHERE full_name = 'Garcia Luis Miguel'")
+    db.connection.execute("DELETE FROM employees WHERE full_name = 'Fox Anna Petrovna'")
+    db.connection.commit()
+    stats = db.get_stats()
+    assert stats['total'] == {'': 5}
+    assert stats['gender'] == {'Male': 2, 'Female': 3}
+    assert stats['initial'] == {'A': 1, 'B': 1, 'F': 1, 'L': 1, 'S': 1}
+    assert db.check_stats() == []
+
+
+def test_upsert_and_bulk_load_keep_stats(db):
+    assert db.bulk_load_chunks(iter([[('Fox Anna Petrovna', '1990-02-14', 'Male')]]), upsert=True)
+    assert db.bulk_load_chunks(iter([[('Zed Ivan Ivanovich', '1970-01-01', 'Male')]]), drop_indexes=True)
+    assert db.get_stats()['gender'] == {'Male': 5, 'Female': 1}
+    assert db.check_stats() == []
+
+
+def test_check_reports_drift(db):
+    db.connection.execute("UPDATE employee_stats SET count = 7 WHERE dimension = 'gender' AND key = 'Male'")
+    db.connection.commit()
+    assert db.check_stats() == [('gender', 'Male', 7, 3)]
+
+
+def test_summary_from_counters(db):
+    summary = db.stats_summary(today=date(2020, 6, 1))
+    assert summary['total'] == 5
+    assert summary['birth_decade'] == {1960: 1, 1970: 1, 1980: 1, 1990: 2}
+    assert summary['age'] == {30: 3, 40: 1, 50: 1}
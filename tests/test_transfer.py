@@ -0,0 +1,83 @@
+import csv
+import json
+
+import pytest
+
+from conftest import SAMPLE_ROWS
+from database import EmployeeDatabase
+from transfer import EmployeeExporter, EmployeeImporter
+
+
+@pytest.fixture
+def db(baseline_path):
+    db = EmployeeDatabase(baseline_path)
+    yield db
+    db.close()
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_csv_rejects_keep_fields(db, tmp_path):
+    source = str(tmp_path / 'employees.csv')
+    rejects = str(tmp_path / 'rejects.csv')
+    write_csv(source, [
+        ('full_name', 'birth_date', 'gender', 'note'),
+        ('Lee Ann Mary', '2001-03-04', 'Female', ''),
+        ('Doe, John "JD"', '1990-13-01', 'Male', 'a,b'),
+        ('Kim Yu Na', '1995-06-07', 'other', 'line\nbreak'),
+    ])
+    importer = EmployeeImporter(db, chunk_size=2, rejects_path=rejects)
+    assert importer.import_file(source)
+    assert (importer.read_count, importer.rejected_count) == (3, 2)
+    assert importer.load_stats['inserted'] == 1
+
+    header, *rows = read_csv(rejects)
+    assert header == ['line', 'reason', 'full_name', 'birth_date', 'gender', 'note']
+    # Запятые, кавычки и переводы строк в полях сохраняются
+    assert [row[2:] for row in rows] == [['Doe, John "JD"', '1990-13-01', 'Male', 'a,b'],
+                                         ['Kim Yu Na', '1995-06-07', 'other', 'line\nbreak']]
+    assert [row[0] for row in rows] == ['3', '4']
+
+
+def test_fixed_rejects_file_can_be_imported(db, tmp_path):
+    source = str(tmp_path / 'employees.csv')
+    rejects = str(tmp_path / 'rejects.csv')
+    write_csv(source, [('gender', 'full_name', 'birth_date'), ('m', 'Doe, John', '1990-01-01')])
+    EmployeeImporter(db, rejects_path=rejects).import_file(source)
+
+    header, row = read_csv(rejects)
+    row[header.index('gender')] = 'Male'
+    write_csv(source, [header, row])
+    importer = EmployeeImporter(db, rejects_path=str(tmp_path / 'again.csv'))
+    assert importer.import_file(source)
+    assert importer.rejected_count == 0
+    assert db.count_employees() == len(SAMPLE_ROWS) + 1
+
+
+def test_jsonl_rejects_keep_original_line(db, tmp_path):
+    source = tmp_path / 'employees.jsonl'
+    rejects = str(tmp_path / 'rejects.csv')
+    bad = '{"full_name": "Kim Yu Na", "birth_date": "1995-02-30", "gender": "Female"}'
+    source.write_text('\n'.join([
+        json.dumps({'full_name': 'Lee Ann Mary', 'birth_date': '2001-03-04', 'gender': 'Female'}),
+        bad,
+        'not json',
+    ]) + '\n', encoding='utf-8')
+    importer = EmployeeImporter(db, rejects_path=rejects)
+    assert importer.import_file(str(source))
+    assert importer.rejected_count == 2
+    assert [row[2] for row in read_csv(rejects)] == ['record', bad, 'not json']
+
+
+def test_export_round_trip(db, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    assert EmployeeExporter(db, chunk_size=2, order='name').export_file(path)
+    assert [tuple(row) for row in read_csv(path)] == [('full_name', 'birth_date', 'gender'), *sorted(SAMPLE_ROWS)]
@@ -0,0 +1,53 @@
+import pytest
+
+from validation import ERROR_MESSAGES, is_valid_date, normalize_gender, validate_row, validate_rows
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('Male', 'Male'), ('FEMALE', 'Female'), ('мужской', 'Male'), ('Женский', 'Female'),
+    ('m', None), ('жен', None), (' Male', None), ('', None), (None, None),
+])
+def test_normalize_gender_baseline_keys(value, expected):
+    assert normalize_gender(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('m', 'Male'), ('F', 'Female'), ('муж', 'Male'), ('x', None)])
+def test_normalize_gender_abbreviations(value, expected):
+    assert normalize_gender(value, abbreviations=True) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1990-05-15', True), ('2000-02-29', True), ('1900-02-29', False),
+    ('1990-5-15', False), ('1990-05-15 ', False), ('١٩٩٠-٠٥-١٥', False),
+])
+def test_is_valid_date(value, expected):
+    assert is_valid_date(value) is expected
+
+
+def test_validate_rows_keeps_values_and_normalizes_gender():
+    valid, errors = validate_rows([(' Smith John ', '1990-05-15', 'male'), ('Fox Anna', '1990-02-14', 'Female')])
+    assert errors == []
+    # ФИО сохраняется как есть, как в исходной версии
+    assert valid == [(' Smith John ', '1990-05-15', 'Male'), ('Fox Anna', '1990-02-14', 'Female')]
+
+
+def test_validate_rows_reports_errors_with_indexes():
+    rows = [('A B C', '1990-01-01', 'Male'), ('   ', '1990-01-01', 'Male'), ('A B C', '1990-13-01', 'Male'),
+            ('A B C', '1990-01-02', 'm'), ('only two', 'fields'), None, ('A B C', None, 'Male')]
+    valid, errors = validate_rows(rows, start=10)
+    assert len(valid) == 1
+    assert [(error.index, error.field) for error in errors] == [
+        (11, 'full_name'), (12, 'birth_date'), (13, 'gender'), (14, 'record'), (15, 'record'), (16, 'birth_date'),
+    ]
+    assert errors[2].message == ERROR_MESSAGES['gender'] == "Gender must be 'male' or 'female'"
+
+
+def test_validate_rows_rechecks_invalid_dates():
+    _, errors = validate_rows([('A', '1990-02-30', 'Male'), ('B', '1990-02-30', 'Male')])
+    assert [error.field for error in errors] == ['birth_date', 'birth_date']
+
+
+def test_validate_row():
+    assert validate_row('Fox Anna', '1990-02-14', 'женский') == (('Fox Anna', '1990-02-14', 'Female'), [])
+    record, errors = validate_row('', '1990-02-14', 'Female')
+    assert record is None and errors[0].message == "Full name cannot be empty"
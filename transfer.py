@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+
+from validation import validate_rows
+
+FIELDS = ('full_name', 'birth_date', 'gender')
+FORMATS = ('csv', 'jsonl')
+
+# Буфер файлового ввода-вывода
+BUFFER_SIZE = 1024 * 1024
+
+
+def detect_format(path, fmt=None):
+    """Определяет формат файла по явному значению или расширению"""
+    if fmt:
+        return fmt.lower()
+    extension = os.path.splitext(path)[1].lower()
+    return 'jsonl' if extension in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+
+class EmployeeImporter:
+    """Потоковый импорт сотрудников из CSV/JSONL.
+
+    Файл читается построчно, строки проверяются порциями, корректные
+    вставляются через EmployeeDatabase.bulk_load_chunks (транзакция на
+    порцию), отклоненные записываются в отдельный CSV-файл с номером строки
+    и причиной (файл создается при первой отклоненной строке). Записи CSV
+    сохраняются полями под заголовком исходного файла (исправленный файл
+    можно импортировать снова), строки JSONL - исходной строкой в столбце record.
+    upsert - повторная загрузка: у существующих сотрудников обновляется пол.
+    """
+
+    def __init__(self, db, chunk_size=50000, rejects_path=None, drop_indexes=False, upsert=False):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path
+        self.drop_indexes = drop_indexes
+        self.upsert = upsert
+        self.read_count = 0
+        self.rejected_count = 0
+        self.load_stats = {}
+        self._rejects_file = None
+        self._rejects_writer = None
+        self._header = None
+
+    def _read_csv(self, f):
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        self._header = header
+        positions = [header.index(field) if field in header else None for field in FIELDS]
+        for line_number, record in enumerate(reader, start=2):
+            values = tuple(record[i] if i is not None and i < len(record) else None for i in positions)
+            yield line_number, values, record
+
+    def _read_jsonl(self, f):
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                # Некорректная строка JSON отклоняется при проверке порции
+                yield line_number, None, line.rstrip('\n')
+                continue
+            yield line_number, tuple(record.get(field) for field in FIELDS), line.rstrip('\n')
+
+    def _chunks(self, records):
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.chunk_size:
+                yield from self._flush(batch)
+                batch = []
+        if batch:
+            yield from self._flush(batch)
+
+    def _rejects(self):
+        """Writer файла отклоненных строк (открывается при первом обращении)"""
+        if self._rejects_writer is None:
+            self._rejects_file = open(self.rejects_path, 'w', encoding='utf-8', newline='')
+            self._rejects_writer = csv.writer(self._rejects_file)
+            self._rejects_writer.writerow(['line', 'reason', *(self._header or ['record'])])
+        return self._rejects_writer
+
+    def _flush(self, batch):
+        """Проверяет порцию общим validate_rows и записывает отклоненные строки"""
+        self.read_count += len(batch)
+        valid, errors = validate_rows(values for _, values, _ in batch)
+        self.rejected_count += len(errors)
+        if errors and self.rejects_path:
+            rows = []
+            for error in errors:
+                line_number, _, raw = batch[error.index]
+                # Поля записи CSV - отдельными столбцами (csv.writer экранирует запятые и кавычки)
+                rows.append((line_number, error.message, raw) if isinstance(raw, str)
+                            else (line_number, error.message, *raw))
+            self._rejects().writerows(rows)
+        if valid:
+            yield valid
+
+    def import_file(self, path, fmt=None) -> bool:
+        fmt = detect_format(path, fmt)
+        if fmt not in FORMATS:
+            print(f"Error: Unsupported format '{fmt}'")
+            return False
+
+        start_time = time.perf_counter()
+        try:
+            with open(path, 'r', encoding='utf-8', newline='', buffering=BUFFER_SIZE) as f:
+                records = self._read_csv(f) if fmt == 'csv' else self._read_jsonl(f)
+                ok = self.db.bulk_load_chunks(self._chunks(records),
+                                              drop_indexes=self.drop_indexes, upsert=self.upsert,
+                                              stats=self.load_stats)
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            # Порции, прочитанные до ошибки, уже зафиксированы
+            print(f"Error reading import file after {self.read_count:,} records: {e}")
+            return False
+        finally:
+            if self._rejects_file:
+                self._rejects_file.close()
+                self._rejects_file = self._rejects_writer = None
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Read {self.read_count:,} records in {elapsed:.2f} seconds, rejected {self.rejected_count:,}")
+        if self.rejected_count and self.rejects_path:
+            print(f"Rejected records written to {self.rejects_path}")
+        return ok
+
+
+class EmployeeExporter:
+    """Потоковый экспорт таблицы сотрудников в CSV/JSONL с буферизованной записью"""
+
+    def __init__(self, db, chunk_size=10000, order='id'):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.order = order
+
+    def export_file(self, path, fmt=None) -> bool:
+        fmt = detect_format(path, fmt)
+        if fmt not in FORMATS:
+            print(f"Error: Unsupported format '{fmt}'")
+            return False
+
+        if not self.db.is_connected():
+            print("Error: No database connection")
+            return False
+
+        start_time = time.perf_counter()
+        count = 0
+        opened = False
+        try:
+            with open(path, 'w', encoding='utf-8', newline='', buffering=BUFFER_SIZE) as f:
+                opened = True
+                if fmt == 'csv':
+                    writer = csv.writer(f)
+                    writer.writerow(FIELDS)
+                    for rows in self.db.iter_row_chunks(self.chunk_size, self.order):
+                        writer.writerows(rows)
+                        count += len(rows)
+                else:
+                    dumps = json.JSONEncoder(ensure_ascii=False).encode
+                    for rows in self.db.iter_row_chunks(self.chunk_size, self.order):
+                        buffer = io.StringIO()
+                        for full_name, birth_date, gender in rows:
+                            buffer.write(dumps({'full_name': full_name, 'birth_date': birth_date,
+                                                'gender': gender}))
+                            buffer.write('\n')
+                        f.write(buffer.getvalue())
+                        count += len(rows)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error exporting employees after {count:,} rows: {e}")
+            # Неполный файл удаляется, чтобы его не приняли за выгрузку
+            if opened:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return False
+
+        elapsed = time.perf_counter() - start_time
+        rate = count / elapsed if elapsed > 0 else 0
+        print(f"Exported {count:,} employees to {path} in {elapsed:.2f} seconds ({rate:,.0f} rows/sec)")
+        return True
@@ -0,0 +1,98 @@
+import re
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+# Обозначения пола -> значение в БД, как в Employee.validate исходной версии:
+# без учета регистра (str.lower) и без обрезки пробелов
+GENDERS = {'male': 'Male', 'female': 'Female', 'мужской': 'Male', 'женский': 'Female'}
+# Сокращения, которые принимал только ввод режима 2 и интерактивного меню
+GENDER_ABBREVIATIONS = dict(GENDERS, **{'m': 'Male', 'муж': 'Male', 'f': 'Female', 'жен': 'Female'})
+# Быстрый путь проверки: значения, уже записанные в БД, без вызова lower()
+_EXACT_GENDERS = dict(GENDERS, Male='Male', Female='Female')
+
+# re.ASCII: \d - только цифры 0-9 (без арабско-индийских и других цифр Unicode)
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}', re.ASCII)
+
+ValidationError = namedtuple('ValidationError', ['index', 'field', 'message'])
+
+ERROR_MESSAGES = {
+    'record': "Malformed record",
+    'full_name': "Full name cannot be empty",
+    'birth_date': "Invalid birth date format. Use YYYY-MM-DD",
+    'gender': "Gender must be 'male' or 'female'",
+}
+
+
+def normalize_gender(value, abbreviations=False):
+    """Приводит пол к 'Male'/'Female' или возвращает None.
+
+    abbreviations - принимать также m/f и муж/жен (ввод режима 2).
+    """
+    if not isinstance(value, str):
+        return None
+    return (GENDER_ABBREVIATIONS if abbreviations else GENDERS).get(value.lower())
+
+
+@lru_cache(maxsize=65536)
+def is_valid_date(value) -> bool:
+    """Проверяет дату YYYY-MM-DD (формат - регулярным выражением, календарь - date)"""
+    if not _DATE_RE.fullmatch(value):
+        return False
+    try:
+        date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        return True
+    except ValueError:
+        return False
+
+
+def validate_rows(rows, start=0):
+    """Проверяет и нормализует порцию строк (full_name, birth_date, gender).
+
+    Возвращает список корректных кортежей с нормализованным полом и список
+    ValidationError(index, field, message) для отклоненных строк; index -
+    номер строки в порции, начиная со start. ФИО и дата сохраняются как
+    есть. Ничего не печатает.
+    """
+    valid = []
+    errors = []
+    append = valid.append
+    exact_genders = _EXACT_GENDERS
+    valid_date = is_valid_date
+    # Различных дат мало: дата, уже признанная корректной, проверяется по множеству
+    known_dates = set()
+    for index, row in enumerate(rows, start):
+        try:
+            full_name, birth_date, gender = row
+        except (TypeError, ValueError):
+            errors.append(ValidationError(index, 'record', ERROR_MESSAGES['record']))
+            continue
+
+        # isspace() вместо strip(): пустое ФИО без создания новой строки
+        if not full_name or not isinstance(full_name, str) or full_name.isspace():
+            errors.append(ValidationError(index, 'full_name', ERROR_MESSAGES['full_name']))
+            continue
+        try:
+            known = birth_date in known_dates
+        except TypeError:
+            known = False
+        if not known:
+            if not isinstance(birth_date, str) or not valid_date(birth_date):
+                errors.append(ValidationError(index, 'birth_date', ERROR_MESSAGES['birth_date']))
+                continue
+            known_dates.add(birth_date)
+        try:
+            normalized = exact_genders[gender]
+        except (KeyError, TypeError):
+            normalized = normalize_gender(gender)
+            if normalized is None:
+                errors.append(ValidationError(index, 'gender', ERROR_MESSAGES['gender']))
+                continue
+        append((full_name, birth_date, normalized))
+    return valid, errors
+
+
+def validate_row(full_name, birth_date, gender):
+    """Проверяет одну запись: возвращает (нормализованный кортеж или None, ошибки)"""
+    valid, errors = validate_rows([(full_name, birth_date, gender)])
+    return (valid[0] if valid else None), errors